@@ -0,0 +1,245 @@
+"""
+Admission Control
+=================
+
+Bounds how much work the server accepts at once, so a burst from many agents
+queues briefly or is turned away quickly instead of making every call slow.
+
+Every tools/call and resources/read request passes through:
+
+    global limit    At most MCP_MAX_CONCURRENT_CALLS requests run at once
+    tool limit      Optional per tool: @mcp.tool(max_concurrency=2, max_queue=8)
+
+A request that finds its limit full waits in a bounded FIFO queue. If the
+queue is already full, or the request is still waiting when its queue
+deadline passes, it is rejected at once with an MCP error (code SERVER_BUSY)
+that the client can retry later.
+
+Configuration (environment, inherited by --workers processes):
+    MCP_MAX_CONCURRENT_CALLS   Global running limit (default 64, 0 = unlimited)
+    MCP_MAX_QUEUED_CALLS       Global queue length (default 256)
+    MCP_QUEUE_TIMEOUT          Seconds a request may wait in a queue (default 10)
+
+In-flight and queued counts are exported in /metrics, and /ready answers 503
+while the global queue is full, for load balancers and autoscalers.
+"""
+
+import asyncio
+import contextvars
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData
+
+from metrics import metrics
+
+# JSON-RPC reserves -32000..-32099 for implementation-defined server errors
+SERVER_BUSY = -32029
+
+DEFAULT_MAX_CONCURRENT = 64
+DEFAULT_MAX_QUEUE = 256
+DEFAULT_QUEUE_TIMEOUT = 10.0
+
+metrics.describe("mcp_admission_rejected_total", "counter",
+                 "Requests rejected by admission control (reason: queue_full, queue_timeout)")
+
+
+def _busy(limiter: "Limiter", reason: str, detail: str) -> McpError:
+    metrics.inc("mcp_admission_rejected_total", {**limiter.labels, "reason": reason})
+    return McpError(ErrorData(code=SERVER_BUSY, message=f"Server busy: {detail}",
+                              data={**limiter.labels, "reason": reason}))
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO wait queue (event-loop only)"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float | None):
+        self.name = name
+        self.labels = {"scope": "global"} if name == "global" else {"scope": "tool", "name": name}
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """True while new requests would be rejected"""
+        return self.max_concurrent > 0 and self.queued >= self.max_queue
+
+    async def acquire(self, deadline: float | None = None) -> None:
+        """Take a slot, waiting in the queue until `deadline` (loop time) if needed
+
+        Raises:
+            McpError: SERVER_BUSY when the queue is full or the deadline passes
+        """
+        if self.max_concurrent <= 0 or (self.in_flight < self.max_concurrent and not self._waiters):
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise _busy(self, "queue_full", f"{self.name} queue is full ({self.max_queue} waiting)")
+
+        loop = asyncio.get_running_loop()
+        if self.queue_timeout is not None:
+            own_deadline = loop.time() + self.queue_timeout
+            deadline = own_deadline if deadline is None else min(deadline, own_deadline)
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        try:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            self._forget(waiter)
+            raise _busy(self, "queue_timeout", f"waited too long for a {self.name} slot") from None
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # the slot was handed over just as we were cancelled
+            else:
+                self._forget(waiter)
+            raise
+
+    def release(self) -> None:
+        """Give the slot to the next waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # in_flight stays the same: the slot moves on
+                return
+        self.in_flight -= 1
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class Ticket:
+    """The slots held by one admitted request
+
+    Released when the request finishes, unless work it started must keep the
+    slots (see hold_until).
+    """
+
+    def __init__(self, limiters: list[Limiter]):
+        self._limiters = limiters
+        self._holds = 1
+
+    def hold_until(self, future: asyncio.Future) -> None:
+        """Keep the slots until `future` is done, even if the request ends first
+
+        Used for work that cannot be interrupted (e.g. a process-pool job whose
+        caller timed out), so the limit reflects what is really running.
+        """
+        self._holds += 1
+        future.add_done_callback(lambda _: self._drop())
+
+    def _drop(self) -> None:
+        self._holds -= 1
+        if self._holds == 0:
+            for limiter in reversed(self._limiters):
+                limiter.release()
+
+
+current_ticket: contextvars.ContextVar[Ticket | None] = contextvars.ContextVar("admission_ticket", default=None)
+
+
+class AdmissionController:
+    """The global limiter plus optional per-tool limiters"""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float | None = DEFAULT_QUEUE_TIMEOUT,
+    ):
+        self.global_limiter = Limiter("global", max_concurrent, max_queue, queue_timeout)
+        self.tool_limiters: dict[str, Limiter] = {}
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.environ.get("MCP_MAX_CONCURRENT_CALLS", DEFAULT_MAX_CONCURRENT)),
+            max_queue=int(os.environ.get("MCP_MAX_QUEUED_CALLS", DEFAULT_MAX_QUEUE)),
+            queue_timeout=float(os.environ.get("MCP_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+        )
+
+    def limit_tool(self, name: str, max_concurrency: int, max_queue: int | None = None,
+                   queue_timeout: float | None = None) -> None:
+        """Add a per-tool limit (queue defaults to 4x the concurrency)"""
+        self.tool_limiters[name] = Limiter(
+            name,
+            max_concurrency,
+            max_queue if max_queue is not None else 4 * max_concurrency,
+            queue_timeout if queue_timeout is not None else self.global_limiter.queue_timeout,
+        )
+
+    @asynccontextmanager
+    async def admit(self, tool: str | None = None) -> AsyncIterator[Ticket]:
+        """Hold a global (and tool) slot for the duration of the block
+
+        The tool slot is taken first, so a request queued behind a busy tool
+        does not hold one of the global slots other tools need meanwhile.
+
+        Raises:
+            McpError: SERVER_BUSY if the request cannot be admitted in time
+        """
+        limiters = [self.global_limiter]
+        if tool in self.tool_limiters:
+            limiters.insert(0, self.tool_limiters[tool])
+        loop = asyncio.get_running_loop()
+        timeout = self.global_limiter.queue_timeout
+        deadline = None if timeout is None else loop.time() + timeout
+
+        acquired: list[Limiter] = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire(deadline)
+                acquired.append(limiter)
+        except BaseException:
+            for limiter in reversed(acquired):
+                limiter.release()
+            raise
+
+        ticket = Ticket(acquired)
+        token = current_ticket.set(ticket)
+        try:
+            yield ticket
+        finally:
+            current_ticket.reset(token)
+            ticket._drop()
+
+    def snapshot(self) -> dict:
+        """Current limits, running and queued counts (for /ready)"""
+        def describe(limiter: Limiter) -> dict:
+            return {
+                "max_concurrent": limiter.max_concurrent,
+                "in_flight": limiter.in_flight,
+                "max_queue": limiter.max_queue,
+                "queued": limiter.queued,
+            }
+
+        return {
+            "ready": not self.global_limiter.saturated,
+            "global": describe(self.global_limiter),
+            "tools": {name: describe(limiter) for name, limiter in self.tool_limiters.items()},
+        }
+
+    def register_metrics(self) -> None:
+        """Export in-flight and queue-depth gauges through the metrics registry"""
+        def series(attribute: str):
+            def gauge() -> dict:
+                limiters = [self.global_limiter, *self.tool_limiters.values()]
+                return {tuple(sorted(limiter.labels.items())): getattr(limiter, attribute) for limiter in limiters}
+            return gauge
+
+        metrics.gauge_callback("mcp_admission_in_flight", "Requests holding an admission slot", series("in_flight"))
+        metrics.gauge_callback("mcp_admission_queue_depth", "Requests waiting for an admission slot", series("queued"))
@@ -0,0 +1,138 @@
+"""
+Benchmark: Per-Request Bearer Auth Overhead
+===========================================
+
+Two measurements of what JWT bearer validation (jwt_auth.py) costs:
+
+1. The verifier alone, in this process:
+       no cache   every request verifies the token's RSA signature
+       cached     repeat requests with the same token hit the validated-token LRU
+
+2. End to end: sequential tool calls against server.py without auth and
+   with auth, using tokens from dev_issuer.py (started as a local stand-in
+   issuer). The difference is the auth overhead a real agent sees.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_auth.py
+    python benchmarks/bench_auth.py --verifications 20000 --calls 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+import jwt
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+from dev_issuer import DEFAULT_AUDIENCE, DevIssuer  # noqa: E402
+from jwt_auth import JWKSCache, JWTVerifier  # noqa: E402
+
+ISSUER_SCRIPT = os.path.join(os.path.dirname(SERVER_SCRIPT), "dev_issuer.py")
+
+
+async def bench_verifier(verifications: int) -> dict[str, float]:
+    """Mean seconds per verify_token() call, without and with the token cache"""
+    issuer = DevIssuer("http://issuer.test")
+    keys = JWKSCache(f"{issuer.issuer}/.well-known/jwks.json")
+    keys.keys = {key.key_id: key for key in jwt.PyJWKSet.from_dict(issuer.jwks()).keys}  # no HTTP here
+    token = issuer.issue()
+
+    results = {}
+    for mode, cache_size in (("no cache", 0), ("cached", 1024)):
+        verifier = JWTVerifier(keys, issuer=issuer.issuer, audience=DEFAULT_AUDIENCE, cache_size=cache_size)
+        assert await verifier.verify_token(token) is not None
+        start = time.perf_counter()
+        for _ in range(verifications):
+            await verifier.verify_token(token)
+        results[mode] = (time.perf_counter() - start) / verifications
+    return results
+
+
+async def _call_latencies(url: str, calls: int, token: str | None) -> list[float]:
+    headers = {"Authorization": f"Bearer {token}"} if token else None
+    async with streamablehttp_client(url, headers=headers) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(min(calls, 200)):  # warm-up
+                await session.call_tool("add", {"a": -i - 1, "b": 0})
+            latencies = []
+            for i in range(calls):
+                start = time.perf_counter()
+                await session.call_tool("add", {"a": i, "b": 1})
+                latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def bench_end_to_end(calls: int, port: int, issuer_port: int) -> dict[str, list[float]]:
+    """Per-call latencies against a server without and with auth"""
+    issuer_url = f"http://127.0.0.1:{issuer_port}"
+    issuer = subprocess.Popen([sys.executable, ISSUER_SCRIPT, "--port", str(issuer_port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(issuer_port)
+        token = httpx.post(f"{issuer_url}/token", data={"audience": DEFAULT_AUDIENCE}).json()["access_token"]
+        results = {}
+        for mode, auth_env in (("no auth", {}),
+                               ("auth", {"MCP_AUTH_ISSUER": issuer_url, "MCP_AUTH_AUDIENCE": DEFAULT_AUDIENCE})):
+            server = subprocess.Popen(
+                [sys.executable, SERVER_SCRIPT, "--port", str(port), "--host", "127.0.0.1"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                env={**os.environ, "MCP_LOG_LEVEL": "WARNING", "MCP_PLUGIN_POLL_INTERVAL": "0", **auth_env},
+            )
+            try:
+                _wait_for_port(port)
+                print(f"⏱️  {mode}: {calls} calls...", flush=True)
+                results[mode] = asyncio.run(
+                    _call_latencies(f"http://127.0.0.1:{port}/mcp", calls, token if auth_env else None))
+            finally:
+                server.terminate()
+                server.wait(timeout=15)
+        return results
+    finally:
+        issuer.terminate()
+        issuer.wait(timeout=15)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the per-request cost of JWT bearer auth")
+    parser.add_argument("--verifications", type=int, default=5000, help="verify_token() calls per mode")
+    parser.add_argument("--calls", type=int, default=1000, help="Tool calls per server (end to end)")
+    parser.add_argument("--port", type=int, default=8185, help="Port for the server under test")
+    parser.add_argument("--issuer-port", type=int, default=9185, help="Port for the stand-in issuer")
+    args = parser.parse_args()
+
+    verifier = asyncio.run(bench_verifier(args.verifications))
+    end_to_end = bench_end_to_end(args.calls, args.port, args.issuer_port)
+
+    print("=" * 60)
+    print(f"Token verification ({args.verifications} calls, RS256)")
+    print("=" * 60)
+    for mode, seconds in verifier.items():
+        print(f"{mode:<12}{seconds * 1e6:>10.1f} µs per request")
+    print(f"Cache speedup: {verifier['no cache'] / verifier['cached']:.0f}x")
+
+    print("\n" + "=" * 60)
+    print(f"End to end ({args.calls} sequential add calls)")
+    print("=" * 60)
+    print(f"{'server':<12}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}")
+    for mode, latencies in end_to_end.items():
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{mode:<12}{statistics.mean(latencies) * 1e6:>12.1f}{latencies[len(latencies) // 2] * 1e6:>12.1f}"
+              f"{p99 * 1e6:>12.1f}")
+    overhead = statistics.mean(end_to_end["auth"]) - statistics.mean(end_to_end["no auth"])
+    print(f"Auth overhead per call: {overhead * 1e6:+.1f} µs")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark: Sequential vs Concurrent Independent Tool Calls
+==========================================================
+
+Starts server.py with a plugin tool that waits like a slow downstream API
+(`slow_lookup`, 200 ms by default), then makes N independent calls to it:
+
+    sequential   await session.call_tool() one call at a time
+    fan-out      fan_out.call_tools(): all calls sent at once over one session
+    agent        a ChatAgent whose model asks for all N tools in one turn
+                 (a scripted stand-in for the model, so no Azure is needed)
+
+Sequential takes about N x the call time; fan-out and the agent should take
+about one call time. Also checks that results come back in request order
+and that one failing call does not affect the others.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_fan_out.py
+    python benchmarks/bench_fan_out.py --calls 16 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterable, MutableSequence
+from typing import Any
+
+from agent_framework import (
+    BaseChatClient,
+    ChatAgent,
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    FunctionCallContent,
+    MCPStreamableHTTPTool,
+    use_function_invocation,
+)
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+from fan_out import call_tools  # noqa: E402
+
+PLUGIN = '''
+import asyncio
+
+
+def register(mcp):
+    @mcp.tool()
+    async def slow_lookup(key: str, seconds: float) -> str:
+        """Look up a key in a slow downstream service"""
+        if key == "missing":
+            raise KeyError(key)
+        await asyncio.sleep(seconds)
+        return key.upper()
+'''
+
+
+@use_function_invocation
+class ScriptedChatClient(BaseChatClient):
+    """Stand-in model: first asks for every call in `calls` at once, then answers"""
+
+    def __init__(self, calls: list[tuple[str, dict[str, Any]]], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.calls = calls
+
+    async def _inner_get_response(self, *, messages: MutableSequence[ChatMessage], chat_options: ChatOptions,
+                                  **kwargs: Any) -> ChatResponse:
+        if messages[-1].role.value == "tool":
+            return ChatResponse(messages=[ChatMessage(role="assistant", text="done")])
+        contents = [FunctionCallContent(call_id=f"call-{i}", name=name, arguments=arguments)
+                    for i, (name, arguments) in enumerate(self.calls)]
+        return ChatResponse(messages=[ChatMessage(role="assistant", contents=contents)])
+
+    async def _inner_get_streaming_response(self, *, messages: MutableSequence[ChatMessage],
+                                            chat_options: ChatOptions, **kwargs: Any
+                                            ) -> AsyncIterable[ChatResponseUpdate]:
+        response = await self._inner_get_response(messages=messages, chat_options=chat_options)
+        for message in response.messages:
+            yield ChatResponseUpdate(role=message.role, contents=message.contents)
+
+
+async def run(url: str, calls: int, delay: float) -> dict[str, Any]:
+    batch = [("slow_lookup", {"key": f"key-{i}", "seconds": delay}) for i in range(calls)]
+    results: dict[str, Any] = {}
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            start = time.perf_counter()
+            for name, arguments in batch:
+                await session.call_tool(name, arguments)
+            results["sequential"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            answers = await call_tools(session, batch)
+            results["fan-out"] = time.perf_counter() - start
+            results["ordered"] = [answer.structuredContent["result"] for answer in answers] == \
+                [f"KEY-{i}" for i in range(calls)]
+
+            # One call fails, the others must still return their results
+            mixed = await call_tools(session, [batch[0], ("slow_lookup", {"key": "missing", "seconds": 0}),
+                                               ("no_such_tool", {}), batch[1]])
+            results["isolated"] = (not mixed[0].isError and mixed[1].isError and mixed[2].isError
+                                   and not mixed[3].isError)
+
+    async with MCPStreamableHTTPTool(name="calc", url=url, load_prompts=False) as mcp_tool:
+        agent = ChatAgent(chat_client=ScriptedChatClient(batch), tools=mcp_tool, allow_multiple_tool_calls=True)
+        start = time.perf_counter()
+        await agent.run("Look up every key")
+        results["agent"] = time.perf_counter() - start
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare sequential and concurrent independent tool calls")
+    parser.add_argument("--calls", type=int, default=8, help="Independent calls per batch")
+    parser.add_argument("--delay", type=float, default=0.2, help="Seconds each call takes on the server")
+    parser.add_argument("--port", type=int, default=8188, help="Port for the server under test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as plugin_dir:
+        with open(os.path.join(plugin_dir, "slow_lookup.py"), "w") as plugin:
+            plugin.write(PLUGIN)
+        server = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "--port", str(args.port), "--host", "127.0.0.1"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "MCP_LOG_LEVEL": "WARNING", "MCP_PLUGIN_DIR": plugin_dir},
+        )
+        try:
+            _wait_for_port(args.port)
+            print(f"⏱️  {args.calls} calls of {args.delay:.2f}s each...", flush=True)
+            results = asyncio.run(run(f"http://127.0.0.1:{args.port}/mcp", args.calls, args.delay))
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+
+    print("=" * 60)
+    print(f"{args.calls} independent calls, {args.delay * 1e3:.0f} ms each")
+    print("=" * 60)
+    for mode in ("sequential", "fan-out", "agent"):
+        print(f"{mode:<12}{results[mode]:>8.2f}s  ({results[mode] / args.delay:.1f}x one call)")
+    print("✅ Results in request order" if results["ordered"] else "⚠️  Results out of order")
+    print("✅ Failed calls did not affect the others" if results["isolated"]
+          else "⚠️  A failing call affected the others")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: Reading a Large File Resource
+========================================
+
+Writes a large order export (CSV, 256 MB by default) to a temporary folder,
+starts server.py serving that folder (MCP_DATA_DIR), and reads the whole
+file through MCP, one page at a time, following the page cursors.
+
+Reports read throughput and the server's resident memory (RSS) while it
+streams the file. Because pages are copied out of a memory-mapped file, RSS
+should stay flat no matter how large the file is.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_large_resources.py
+    python benchmarks/bench_large_resources.py --size-mb 2048 --page-kb 256
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+
+PRODUCTS = ["TrailMaster X4 Tent", "Alpine Explorer Tent", "SkyView 2-Person Tent", "CozyNights Sleeping Bag"]
+
+
+def write_export(path: str, size_mb: int) -> int:
+    """Write a CSV order export of about `size_mb` MB; returns its row count"""
+    target = size_mb * 2**20
+    rows = 0
+    with open(path, "w") as export:
+        export.write("order_id,order_date,customer_id,product,quantity,total\n")
+        while export.tell() < target:
+            lines = []
+            for _ in range(10_000):
+                rows += 1
+                quantity = random.randint(1, 4)
+                lines.append(f"ORD-{rows:09d},2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d},"
+                             f"CUST-{random.randint(1, 9999):04d},{random.choice(PRODUCTS)},"
+                             f"{quantity},{quantity * 125.5:.2f}\n")
+            export.write("".join(lines))
+    return rows
+
+
+async def _rss(client: httpx.AsyncClient, base_url: str) -> int:
+    report = (await client.get(f"{base_url}/sessions", params={"limit": 0})).json()
+    return report["resident_memory_bytes"]
+
+
+async def read_all(base_url: str, name: str, samples: int) -> dict:
+    """Page through data://<name>, sampling server RSS along the way"""
+    async with httpx.AsyncClient(timeout=30) as client:
+        rss = [await _rss(client, base_url)]
+        async with streamablehttp_client(f"{base_url}/mcp") as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                first = (await session.read_resource(f"data://{name}")).contents[0]
+                size = first.meta["size"]
+                sample_every = max(1, size // first.meta["length"] // samples)
+
+                start = time.perf_counter()
+                pages, rows, content = 1, first.text.count("\n"), first
+                while content.meta["nextCursor"]:
+                    uri = f"data://{name}?cursor={content.meta['nextCursor']}"
+                    content = (await session.read_resource(uri)).contents[0]
+                    pages += 1
+                    rows += content.text.count("\n")
+                    if pages % sample_every == 0:
+                        rss.append(await _rss(client, base_url))
+                elapsed = time.perf_counter() - start
+        rss.append(await _rss(client, base_url))
+    return {"size": size, "pages": pages, "rows": rows, "seconds": elapsed, "rss": rss}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read a large file resource page by page and watch server memory")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the generated CSV export")
+    parser.add_argument("--page-kb", type=int, default=64, help="Server page size (MCP_RESOURCE_PAGE_SIZE)")
+    parser.add_argument("--samples", type=int, default=10, help="RSS samples while reading")
+    parser.add_argument("--port", type=int, default=8184, help="Port for the server under test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        name = "orders_export.csv"
+        print(f"📝 Writing a {args.size_mb} MB order export...", flush=True)
+        total_rows = write_export(os.path.join(directory, name), args.size_mb)
+
+        server = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "--port", str(args.port), "--host", "127.0.0.1"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={
+                **os.environ,
+                "MCP_LOG_LEVEL": "WARNING",
+                "MCP_DATA_DIR": directory,
+                "MCP_RESOURCE_PAGE_SIZE": str(args.page_kb * 1024),
+            },
+        )
+        try:
+            _wait_for_port(args.port)
+            print(f"📖 Reading data://{name} in {args.page_kb} KB pages...", flush=True)
+            result = asyncio.run(read_all(f"http://127.0.0.1:{args.port}", name, args.samples))
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+
+    rss_mb = [value / 2**20 for value in result["rss"]]
+    print("=" * 60)
+    print(f"File: {result['size'] / 2**20:.0f} MB, {total_rows:,} rows + header")
+    print(f"Read: {result['pages']:,} pages, {result['rows']:,} lines in {result['seconds']:.1f}s "
+          f"({result['size'] / 2**20 / result['seconds']:.1f} MB/s)")
+    print(f"Server RSS (MB): {' -> '.join(f'{value:.0f}' for value in rss_mb)}")
+    print(f"RSS growth: {rss_mb[-1] - rss_mb[0]:+.1f} MB, peak {max(rss_mb) - rss_mb[0]:+.1f} MB "
+          f"over {result['size'] / 2**20:.0f} MB read")
+    if result["rows"] != total_rows + 1:
+        print(f"⚠️  Expected {total_rows + 1:,} lines - pages lost or split rows")
+    else:
+        print("✅ Every row arrived exactly once, no page split a row")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
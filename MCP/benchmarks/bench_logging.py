@@ -0,0 +1,132 @@
+"""
+Benchmark: Per-Call Logging Overhead
+====================================
+
+Measures how much time logging adds to each MCP tool call. Tools are called
+in-process through FastMCP (no HTTP), so the numbers isolate the tool path:
+
+    off     - call log disabled (MCP_LOG_LEVEL=OFF equivalent)
+    queue   - structured call log: record + enqueue, written by a background thread
+    sampled - structured call log with 10% sampling
+    print   - the old behaviour: five synchronous print() calls per tool call
+
+By default the log goes to a slow sink - every write blocks for --sink-delay
+seconds, like a terminal or pipe that is not being read fast enough - which
+is the case the call log is for: print() makes every call wait for it, the
+call log does not (and drops what the sink cannot take, see "dropped").
+--stream devnull shows the bare cost of each mode instead.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --calls 20000 --sink-delay 0.005
+    python benchmarks/bench_logging.py --stream devnull
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import time
+from typing import TextIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from call_log import call_log  # noqa: E402
+import server  # noqa: E402
+
+
+class SlowSink:
+    """A stream whose every write blocks, like a terminal or pipe that lags behind"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _open_stream(name: str, sink_delay: float) -> TextIO:
+    if name == "slow":
+        return SlowSink(sink_delay)
+    return open(os.devnull, "w") if name == "devnull" else getattr(sys, name)
+
+
+def _legacy_print_add(a: int, b: int) -> int:
+    """The add tool as it was before the call log: blocking prints per call"""
+    print('-'*50)
+    print(f"Add tool being used for sum of:")
+    print(a)
+    print('+')
+    print(b)
+    print('-'*50)
+    return a + b
+
+
+async def _time_calls(calls: int, legacy: bool) -> list[float]:
+    """Call the add tool `calls` times and return per-call latencies in seconds"""
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        if legacy:
+            # Same FastMCP path, plus the print()s the old tool did
+            await server.mcp.call_tool("add", {"a": i, "b": 1})
+            _legacy_print_add(i, 1)
+        else:
+            await server.mcp.call_tool("add", {"a": i, "b": 1})
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(calls: int, stream_name: str, sink_delay: float) -> None:
+    stream = _open_stream(stream_name, sink_delay)
+    modes = {
+        "off": dict(level="OFF", sample_rate=1.0),
+        "queue": dict(level="INFO", sample_rate=1.0),
+        "sampled": dict(level="INFO", sample_rate=0.1),
+        "print": dict(level="OFF", sample_rate=1.0),
+    }
+
+    results = {}
+    dropped = {}
+    for mode, settings in modes.items():
+        call_log.configure(stream=stream, **settings)
+        call_log.dropped = 0
+        redirect = contextlib.redirect_stdout(stream) if mode == "print" else contextlib.nullcontext()
+        with redirect:
+            await _time_calls(min(calls, 500), legacy=mode == "print")  # warm-up
+            latencies = await _time_calls(calls, legacy=mode == "print")
+        dropped[mode] = call_log.dropped
+        call_log.stop()  # flush the queue before the next mode
+        results[mode] = latencies
+
+    baseline = statistics.mean(results["off"])
+    print("=" * 70)
+    sink = f"slow, {sink_delay * 1e3:g} ms per write" if stream_name == "slow" else stream_name
+    print(f"Logging overhead per call ({calls} calls, stream={sink})")
+    print("=" * 70)
+    print(f"{'mode':<10}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}{'overhead (µs)':>16}{'dropped':>10}")
+    for mode, latencies in results.items():
+        ordered = sorted(latencies)
+        mean = statistics.mean(ordered)
+        p50 = ordered[len(ordered) // 2]
+        p99 = ordered[int(len(ordered) * 0.99) - 1]
+        print(f"{mode:<10}{mean * 1e6:>12.1f}{p50 * 1e6:>12.1f}{p99 * 1e6:>12.1f}"
+              f"{(mean - baseline) * 1e6:>16.1f}{dropped[mode]:>10}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure per-call logging overhead")
+    parser.add_argument("--calls", type=int, default=5000, help="Tool calls per mode")
+    parser.add_argument("--stream", choices=["slow", "devnull", "stdout", "stderr"], default="slow",
+                        help="Where log output goes (slow: a sink that blocks on every write)")
+    parser.add_argument("--sink-delay", type=float, default=0.0002,
+                        help="Seconds each write to the slow sink blocks")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.stream, args.sink_delay))
@@ -0,0 +1,138 @@
+"""
+Benchmark: Agent Startup With and Without the Tool Schema Cache
+===============================================================
+
+Starts server.py and measures how long an agent's MCP tool takes to become
+ready (connect + initialize + tool discovery), repeated several times:
+
+    no cache   MCPStreamableHTTPTool: lists the tools on every start
+    cold       CachedMCPStreamableHTTPTool with an empty cache (lists and saves)
+    warm       CachedMCPStreamableHTTPTool with the cache filled: the schema
+               hash matches, so no tools/list is sent
+
+Then checks revalidation: a tool plugin is dropped into the server's plugin
+folder while the warm tool is connected, and the tool's functions and the
+cache must pick up the new tool without reconnecting.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_schema_cache.py
+    python benchmarks/bench_schema_cache.py --starts 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from agent_framework import MCPStreamableHTTPTool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+from schema_cache import CachedMCPStreamableHTTPTool, SchemaCache  # noqa: E402
+
+PLUGIN = '''
+def register(mcp):
+    @mcp.tool()
+    def square(x: float) -> float:
+        """Square a number"""
+        return x * x
+'''
+
+
+async def startup_times(make_tool, starts: int) -> list[float]:
+    """Seconds from creating the tool until its functions are ready, per start"""
+    times = []
+    for _ in range(starts):
+        tool = make_tool()
+        start = time.perf_counter()
+        await tool.connect()
+        times.append(time.perf_counter() - start)
+        assert tool.functions, "no tools loaded"
+        await tool.close()
+    return times
+
+
+async def check_revalidation(url: str, cache: SchemaCache, plugin_dir: str) -> bool:
+    """True if a hot-loaded plugin reaches the connected tool and the cache"""
+    tool = CachedMCPStreamableHTTPTool(name="calc", url=url, schema_cache=cache)
+    await tool.connect()
+    try:
+        with open(os.path.join(plugin_dir, "square_plugin.py"), "w") as plugin:
+            plugin.write(PLUGIN)
+        for _ in range(100):  # the server polls its plugin folder
+            await asyncio.sleep(0.1)
+            if any(function.name == "square" for function in tool.functions):
+                break
+        cached = [entry["name"] for entry in (cache.get(url) or {}).get("tools", [])]
+        return any(function.name == "square" for function in tool.functions) and "square" in cached
+    finally:
+        await tool.close()
+
+
+async def run(url: str, starts: int, cache_path: str, plugin_dir: str) -> tuple[dict[str, list[float]], bool]:
+    cache = SchemaCache(cache_path)
+    results = {"no cache": await startup_times(lambda: MCPStreamableHTTPTool(name="calc", url=url), starts)}
+
+    cold = []
+    for _ in range(starts):
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+        cold += await startup_times(lambda: CachedMCPStreamableHTTPTool(name="calc", url=url, schema_cache=cache), 1)
+    results["cold"] = cold
+
+    warm_tool = lambda: CachedMCPStreamableHTTPTool(name="calc", url=url, schema_cache=cache)  # noqa: E731
+    probe = warm_tool()
+    await probe.connect()
+    assert probe.schemas_from == "cache", f"warm start listed tools ({probe.schemas_from})"
+    await probe.close()
+    results["warm"] = await startup_times(warm_tool, starts)
+
+    return results, await check_revalidation(url, cache, plugin_dir)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare agent tool startup with and without the schema cache")
+    parser.add_argument("--starts", type=int, default=20, help="Tool starts per mode")
+    parser.add_argument("--port", type=int, default=8186, help="Port for the server under test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        plugin_dir = os.path.join(directory, "plugins")
+        os.makedirs(plugin_dir)
+        server = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "--port", str(args.port), "--host", "127.0.0.1"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "MCP_LOG_LEVEL": "WARNING", "MCP_PLUGIN_DIR": plugin_dir,
+                 "MCP_PLUGIN_POLL_INTERVAL": "0.2"},
+        )
+        try:
+            _wait_for_port(args.port)
+            print(f"⏱️  {args.starts} starts per mode...", flush=True)
+            results, revalidated = asyncio.run(run(f"http://127.0.0.1:{args.port}/mcp", args.starts,
+                                                   os.path.join(directory, "schemas.json"), plugin_dir))
+        finally:
+            server.terminate()
+            server.wait(timeout=15)
+
+    print("=" * 60)
+    print(f"Tool startup ({args.starts} starts per mode)")
+    print("=" * 60)
+    print(f"{'mode':<12}{'mean (ms)':>12}{'p50 (ms)':>12}{'max (ms)':>12}")
+    for mode, times in results.items():
+        print(f"{mode:<12}{statistics.mean(times) * 1e3:>12.2f}{statistics.median(times) * 1e3:>12.2f}"
+              f"{max(times) * 1e3:>12.2f}")
+    saved = statistics.mean(results["no cache"]) - statistics.mean(results["warm"])
+    print(f"Saved per warm start: {saved * 1e3:.2f} ms")
+    print("✅ Plugin picked up by the connected tool and the cache" if revalidated
+          else "⚠️  Plugin did not reach the connected tool or the cache")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: Many Agents, Pooled vs Separate MCP Sessions
+=======================================================
+
+Simulates one process hosting many agents (50 by default), each with an
+MCP tool for the same server.py, in two ways:
+
+    separate   one MCPStreamableHTTPTool per agent (a session each)
+    pooled     one PooledMCPTool per agent, all sharing one pooled session
+
+For each, all agents connect, then make tool calls concurrently. Reports
+connect time, call throughput, and how many sessions the server has open
+(from /sessions) and its memory.
+
+Finally checks reconnection: the server is restarted under the pooled
+agents, and their next calls must succeed on a new session.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_session_pool.py
+    python benchmarks/bench_session_pool.py --agents 200 --calls 20
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+from agent_framework import MCPStreamableHTTPTool
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+from session_pool import MCPSessionPool, PooledMCPTool  # noqa: E402
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--port", str(port), "--host", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "MCP_LOG_LEVEL": "WARNING", "MCP_PLUGIN_POLL_INTERVAL": "0"},
+    )
+    _wait_for_port(port)
+    return server
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    server.wait(timeout=15)
+
+
+async def run_agents(tools: list, calls: int, base_url: str) -> dict:
+    """Connect every agent's tool, call tools from all of them at once, then close"""
+    start = time.perf_counter()
+    for tool in tools:  # agents usually start one after another
+        await tool.connect()
+    connected = time.perf_counter() - start
+
+    async def agent(tool, index: int) -> None:
+        add = next(function for function in tool.functions if function.name == "add")
+        for i in range(calls):
+            await add.invoke(a=index, b=i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(agent(tool, index) for index, tool in enumerate(tools)))
+    elapsed = time.perf_counter() - start
+
+    async with httpx.AsyncClient() as client:
+        report = (await client.get(f"{base_url}/sessions", params={"limit": 0})).json()
+    for tool in reversed(tools):  # each tool's connection is scoped to this task: close in reverse
+        await tool.close()
+    return {
+        "connect": connected,
+        "calls_per_second": len(tools) * calls / elapsed,
+        "sessions": report["open_sessions"],
+        "rss": report["resident_memory_bytes"],
+    }
+
+
+async def check_reconnect(url: str, port: int, server: subprocess.Popen, agents: int) -> tuple[bool, subprocess.Popen]:
+    """Restart the server under pooled agents; True if their calls work again"""
+    pool = MCPSessionPool(keepalive=1, max_backoff=2, linger=0)
+    tools = [PooledMCPTool(name=f"agent-{i}", url=url, pool=pool) for i in range(agents)]
+    for tool in tools:
+        await tool.connect()
+    stop_server(server)
+    server = start_server(port)
+    try:
+        results = await asyncio.gather(*(tool.call_tool("add", a=1, b=2) for tool in tools), return_exceptions=True)
+        if any(isinstance(result, Exception) for result in results):
+            # Calls in flight when the server went away fail once; the next ones must work
+            await asyncio.sleep(3)
+            results = await asyncio.gather(*(tool.call_tool("add", a=1, b=2) for tool in tools),
+                                           return_exceptions=True)
+        ok = not any(isinstance(result, Exception) for result in results)
+        print(f"   reconnects: {pool.stats()[0]['reconnects']}", flush=True)
+    finally:
+        for tool in tools:
+            await tool.close()
+        await pool.close()
+    return ok, server
+
+
+async def run(agents: int, calls: int, port: int, server: subprocess.Popen) -> tuple[dict, bool, subprocess.Popen]:
+    base_url = f"http://127.0.0.1:{port}"
+    url = f"{base_url}/mcp"
+    results = {}
+
+    print(f"⏱️  separate: {agents} agents x {calls} calls...", flush=True)
+    results["separate"] = await run_agents(
+        [MCPStreamableHTTPTool(name=f"agent-{i}", url=url, load_prompts=False) for i in range(agents)],
+        calls, base_url)
+    await asyncio.sleep(1)  # let the server finish closing those sessions
+
+    print(f"⏱️  pooled: {agents} agents x {calls} calls...", flush=True)
+    pool = MCPSessionPool(linger=0)
+    results["pooled"] = await run_agents(
+        [PooledMCPTool(name=f"agent-{i}", url=url, pool=pool, load_prompts=False) for i in range(agents)],
+        calls, base_url)
+    await pool.close()
+
+    print("🔄 Restarting the server under pooled agents...", flush=True)
+    reconnected, server = await check_reconnect(url, port, server, min(agents, 10))
+    return results, reconnected, server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare many agents on separate vs pooled MCP sessions")
+    parser.add_argument("--agents", type=int, default=50, help="Agents (MCP tools) in the process")
+    parser.add_argument("--calls", type=int, default=10, help="Tool calls per agent")
+    parser.add_argument("--port", type=int, default=8187, help="Port for the server under test")
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    try:
+        results, reconnected, server = asyncio.run(run(args.agents, args.calls, args.port, server))
+    finally:
+        stop_server(server)
+
+    print("=" * 60)
+    print(f"{args.agents} agents, {args.calls} concurrent calls each")
+    print("=" * 60)
+    print(f"{'mode':<10}{'connect (s)':>12}{'calls/s':>10}{'sessions':>10}{'RSS (MB)':>10}")
+    for mode, result in results.items():
+        print(f"{mode:<10}{result['connect']:>12.2f}{result['calls_per_second']:>10.0f}"
+              f"{result['sessions']:>10}{result['rss'] / 2**20:>10.0f}")
+    print("✅ Pooled agents reconnected after a server restart" if reconnected
+          else "⚠️  Pooled agents did not recover after a server restart")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: Per-Call Latency by Transport
+========================================
+
+Measures how long one MCP tool call takes, end to end through a real
+ClientSession, over each way an agent can reach the server:
+
+    http       streamable HTTP to server.py on localhost (TCP loopback)
+    stdio      server.py --transport stdio, started as a child process
+    inprocess  the server object mounted in this process (inprocess.py)
+
+The same tool (add, with fresh arguments each call so the result cache never
+answers) is called sequentially, so the numbers are pure per-call latency.
+
+Usage (from the MCP folder):
+    python benchmarks/bench_transports.py
+    python benchmarks/bench_transports.py --calls 5000 --transports http inprocess
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Keep the call log quiet in every server, including the in-process one
+os.environ.setdefault("MCP_LOG_LEVEL", "WARNING")
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+
+TRANSPORTS = ["http", "stdio", "inprocess"]
+
+
+@asynccontextmanager
+async def _connect(transport: str, port: int):
+    """Yield (read, write) streams for one client of the given transport"""
+    if transport == "http":
+        async with streamablehttp_client(f"http://127.0.0.1:{port}/mcp") as (read, write, _):
+            yield read, write
+    elif transport == "stdio":
+        params = StdioServerParameters(
+            command=sys.executable,
+            args=[SERVER_SCRIPT, "--transport", "stdio"],
+            env={**os.environ, "MCP_PLUGIN_POLL_INTERVAL": "0"},
+        )
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(params, errlog=devnull) as streams:
+                yield streams
+    else:
+        from inprocess import inprocess_client
+        import server
+
+        async with inprocess_client(server.mcp) as streams:
+            yield streams
+
+
+async def measure(transport: str, calls: int, port: int) -> dict:
+    """Connect, then time `calls` sequential tool calls"""
+    start = time.perf_counter()
+    async with _connect(transport, port) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            connect = time.perf_counter() - start
+
+            for i in range(min(calls, 200)):  # warm-up
+                await session.call_tool("add", {"a": -i - 1, "b": 0})
+            latencies = []
+            for i in range(calls):
+                start = time.perf_counter()
+                result = await session.call_tool("add", {"a": i, "b": 1})
+                latencies.append(time.perf_counter() - start)
+                if result.isError:
+                    raise RuntimeError(f"{transport}: add failed: {result.content}")
+    return {"connect": connect, "latencies": sorted(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare MCP tool-call latency across transports")
+    parser.add_argument("--calls", type=int, default=2000, help="Tool calls per transport")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=TRANSPORTS)
+    parser.add_argument("--port", type=int, default=8183, help="Port for the HTTP server under test")
+    args = parser.parse_args()
+
+    server = None
+    if "http" in args.transports:
+        server = subprocess.Popen(
+            [sys.executable, SERVER_SCRIPT, "--port", str(args.port), "--host", "127.0.0.1"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, "MCP_PLUGIN_POLL_INTERVAL": "0"},
+        )
+    try:
+        if server is not None:
+            _wait_for_port(args.port)
+        results = {}
+        for transport in args.transports:
+            print(f"⏱️  {transport}: {args.calls} calls...", flush=True)
+            results[transport] = asyncio.run(measure(transport, args.calls, args.port))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=15)
+
+    baseline = statistics.mean(results["http"]["latencies"]) if "http" in results else None
+    print("=" * 72)
+    print(f"Per-call latency by transport ({args.calls} sequential add calls)")
+    print("=" * 72)
+    print(f"{'transport':<11}{'connect (ms)':>14}{'mean (µs)':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}"
+          f"{'vs http':>11}")
+    for transport, result in results.items():
+        latencies = result["latencies"]
+        mean = statistics.mean(latencies)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        speedup = f"{baseline / mean:.1f}x" if baseline else "-"
+        print(f"{transport:<11}{result['connect'] * 1e3:>14.1f}{mean * 1e6:>12.1f}{p50 * 1e6:>12.1f}"
+              f"{p99 * 1e6:>12.1f}{speedup:>11}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
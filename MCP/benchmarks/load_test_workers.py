@@ -0,0 +1,142 @@
+"""
+Load Test: Throughput vs. Worker Processes
+==========================================
+
+Starts server.py with 1, 2, 4, ... worker processes and drives it with
+concurrent MCP client sessions, reporting tool calls per second for each
+worker count. With a CPU-bound call mix, throughput should grow with the
+number of workers until it reaches the number of cores.
+
+The load itself is generated by several client processes so that the
+client side does not become the bottleneck.
+
+Usage (from the MCP folder):
+    python benchmarks/load_test_workers.py
+    python benchmarks/load_test_workers.py --workers 1 2 4 8 --duration 20 --payload 5000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "server.py")
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    """Block until something accepts connections on localhost:port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise TimeoutError(f"Server did not start on port {port}")
+
+
+async def _session_loop(url: str, deadline: float, payload: int) -> tuple[int, int]:
+    """One client session calling batch_reduce until the deadline"""
+    calls = errors = 0
+    values = [random.random() for _ in range(payload)]
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            while time.monotonic() < deadline:
+                result = await session.call_tool("batch_reduce", {"values": values, "operation": "sum"})
+                calls += 1
+                errors += bool(result.isError)
+    return calls, errors
+
+
+def _client_process(url: str, sessions: int, duration: float, payload: int, results) -> None:
+    """Client process: run `sessions` concurrent sessions and report totals"""
+
+    async def main():
+        deadline = time.monotonic() + duration
+        counts = await asyncio.gather(
+            *(_session_loop(url, deadline, payload) for _ in range(sessions))
+        )
+        results.put((sum(c for c, _ in counts), sum(e for _, e in counts)))
+
+    asyncio.run(main())
+
+
+def run_level(workers: int, port: int, args) -> dict:
+    """Start the server with `workers` processes, load it, and stop it"""
+    server = subprocess.Popen(
+        # --stateless so the 1-worker baseline uses the same session mode as N workers
+        [sys.executable, SERVER_SCRIPT, "--workers", str(workers), "--stateless",
+         "--port", str(port), "--host", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "MCP_LOG_LEVEL": "WARNING"},
+    )
+    try:
+        _wait_for_port(port)
+        time.sleep(1.0)  # let every worker finish importing
+        url = f"http://127.0.0.1:{port}/mcp"
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(
+                target=_client_process,
+                args=(url, args.sessions, args.duration, args.payload, results),
+            )
+            for _ in range(args.client_procs)
+        ]
+        start = time.monotonic()
+        for proc in clients:
+            proc.start()
+        totals = [results.get() for _ in clients]
+        for proc in clients:
+            proc.join()
+        elapsed = time.monotonic() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+
+    calls = sum(c for c, _ in totals)
+    errors = sum(e for _, e in totals)
+    return {"workers": workers, "calls": calls, "errors": errors, "calls_per_sec": calls / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure MCP server throughput per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to test")
+    parser.add_argument("--port", type=int, default=8181, help="Port for the server under test")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per level")
+    parser.add_argument("--client-procs", type=int, default=max(2, (os.cpu_count() or 2) // 2),
+                        help="Load generator processes")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions per client process")
+    parser.add_argument("--payload", type=int, default=2000, help="Numbers sent per batch_reduce call")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"MCP Server Load Test ({os.cpu_count()} CPU cores)")
+    print(f"{args.client_procs} client process(es) x {args.sessions} session(s), "
+          f"{args.payload} numbers per call, {args.duration:.0f}s per level")
+    print("=" * 60)
+
+    rows = []
+    for workers in args.workers:
+        print(f"⏳ Testing {workers} worker(s)...")
+        rows.append(run_level(workers, args.port, args))
+
+    baseline = rows[0]["calls_per_sec"] or 1.0
+    print("\n" + "=" * 60)
+    print(f"{'workers':>8}{'calls':>10}{'errors':>8}{'calls/s':>12}{'speedup':>10}")
+    for row in rows:
+        print(f"{row['workers']:>8}{row['calls']:>10}{row['errors']:>8}"
+              f"{row['calls_per_sec']:>12.1f}{row['calls_per_sec'] / baseline:>9.2f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Soak Test: Session Churn vs. Server Memory
+==========================================
+
+Starts server.py and opens and closes many MCP sessions (10,000 by default).
+Some clients close properly (HTTP DELETE). Others just disappear, the way a
+crashed agent does, and leave their session to the server's idle timeout and
+LRU eviction (see session_manager.py).
+
+Every few hundred cycles the server's /sessions report is sampled, showing
+open sessions and resident memory (RSS). With the session limits working,
+memory levels off after warm-up instead of growing with every client that
+has ever connected.
+
+Usage (from the MCP folder):
+    python benchmarks/soak_sessions.py
+    python benchmarks/soak_sessions.py --cycles 20000 --abandon 0.5 --max-sessions 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.load_test_workers import SERVER_SCRIPT, _wait_for_port  # noqa: E402
+
+
+async def _one_cycle(url: str, abandon: bool) -> bool:
+    """Connect, initialize, make one call, and leave (closing properly or not)"""
+    try:
+        async with streamablehttp_client(url, terminate_on_close=not abandon) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                result = await session.call_tool("add", {"a": random.randint(0, 99), "b": 1})
+                return not result.isError
+    except Exception:
+        return False
+
+
+async def _sample(client: httpx.AsyncClient, base_url: str) -> dict:
+    """Open sessions, RSS and close reasons from the server"""
+    report = (await client.get(f"{base_url}/sessions", params={"limit": 0})).json()
+    closed = {}
+    for line in (await client.get(f"{base_url}/metrics")).text.splitlines():
+        if line.startswith("mcp_sessions_closed_total{"):
+            reason = line.split('reason="', 1)[1].split('"', 1)[0]
+            closed[reason] = int(float(line.rsplit(" ", 1)[1]))
+    return {"open": report["open_sessions"], "rss": report["resident_memory_bytes"], "closed": closed}
+
+
+def _print_sample(cycles: int, sample: dict, failures: int) -> None:
+    closed = ", ".join(f"{reason}={count}" for reason, count in sorted(sample["closed"].items())) or "-"
+    print(f"{cycles:>8}{sample['open']:>8}{sample['rss'] / 2**20:>11.1f}{failures:>8}   {closed}")
+
+
+async def soak(args) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    url = f"{base_url}/mcp"
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = 0
+
+    async def cycle() -> None:
+        nonlocal failures
+        async with semaphore:
+            ok = await _one_cycle(url, random.random() < args.abandon)
+            failures += not ok
+
+    samples = []
+    async with httpx.AsyncClient(timeout=30) as client:
+        print(f"{'cycles':>8}{'open':>8}{'RSS (MB)':>11}{'errors':>8}   sessions closed by reason")
+        samples.append((0, await _sample(client, base_url)))
+        _print_sample(0, samples[-1][1], failures)
+        done = 0
+        while done < args.cycles:
+            batch = min(args.sample_every, args.cycles - done)
+            await asyncio.gather(*(cycle() for _ in range(batch)))
+            done += batch
+            samples.append((done, await _sample(client, base_url)))
+            _print_sample(done, samples[-1][1], failures)
+
+        print(f"\n⏳ Waiting {args.idle_timeout + 2:.0f}s for abandoned sessions to time out...")
+        await asyncio.sleep(args.idle_timeout + 2)
+        final = await _sample(client, base_url)
+        _print_sample(done, final, failures)
+
+    # Compare memory after warm-up with memory at the end
+    warm = samples[min(len(samples) - 1, max(1, len(samples) // 5))]
+    growth = (final["rss"] - warm[1]["rss"]) / 2**20
+    per_1k = growth / max(1, done - warm[0]) * 1000
+    print("\n" + "=" * 60)
+    print(f"RSS after warm-up ({warm[0]} cycles): {warm[1]['rss'] / 2**20:.1f} MB")
+    print(f"RSS at the end ({done} cycles):       {final['rss'] / 2**20:.1f} MB")
+    print(f"Growth: {growth:+.1f} MB ({per_1k:+.2f} MB per 1,000 cycles)")
+    print(f"Open sessions at the end: {final['open']}")
+    if abs(growth) <= args.tolerance_mb:
+        print(f"✅ Memory is flat (within {args.tolerance_mb:g} MB)")
+    else:
+        print(f"⚠️  Memory grew by more than {args.tolerance_mb:g} MB")
+    print("=" * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak test MCP session churn against server memory")
+    parser.add_argument("--cycles", type=int, default=10_000, help="Connect/disconnect cycles")
+    parser.add_argument("--concurrency", type=int, default=20, help="Cycles running at once")
+    parser.add_argument("--abandon", type=float, default=0.3,
+                        help="Fraction of clients that disappear without closing their session")
+    parser.add_argument("--max-sessions", type=int, default=200, help="Server session cap (MCP_MAX_SESSIONS)")
+    parser.add_argument("--idle-timeout", type=float, default=10.0,
+                        help="Server idle timeout in seconds (MCP_SESSION_IDLE_TIMEOUT)")
+    parser.add_argument("--sample-every", type=int, default=500, help="Cycles between memory samples")
+    parser.add_argument("--tolerance-mb", type=float, default=10.0, help="Allowed RSS growth after warm-up")
+    parser.add_argument("--port", type=int, default=8182, help="Port for the server under test")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MCP Session Soak Test")
+    print(f"{args.cycles} cycles, {args.concurrency} at a time, {args.abandon:.0%} abandoned")
+    print(f"Server: max {args.max_sessions} sessions, idle timeout {args.idle_timeout:g}s")
+    print("=" * 60)
+
+    server = subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT, "--port", str(args.port), "--host", "127.0.0.1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={
+            **os.environ,
+            "MCP_LOG_LEVEL": "WARNING",
+            "MCP_MAX_SESSIONS": str(args.max_sessions),
+            "MCP_SESSION_IDLE_TIMEOUT": str(args.idle_timeout),
+        },
+    )
+    try:
+        _wait_for_port(args.port)
+        asyncio.run(soak(args))
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Call Logging
+============
+
+Non-blocking, structured logging for MCP tool and resource calls.
+
+The tools used to print() five or more lines per call. Those writes happen on
+the event-loop thread, so under load they add latency to every session and
+lines from concurrent calls interleave. Here a call produces ONE structured
+record instead:
+
+1. It is appended to a bounded ring buffer of recent calls (cheap, always on)
+2. If it passes the level and sampling checks, it is put on a queue
+3. A background writer thread formats it and writes it to the stream
+
+Only step 3 touches stdout/stderr, and it never runs on the event loop.
+The queue is bounded: if the stream cannot keep up (a blocked pipe, a slow
+terminal), new records are dropped and counted in mcp_call_log_dropped_total
+instead of piling up in memory. The ring buffer still gets every call.
+
+Configuration (environment variables, or call configure()):
+    MCP_LOG_LEVEL        DEBUG / INFO / WARNING / ERROR / OFF   (default INFO)
+    MCP_LOG_SAMPLE_RATE  Fraction of successful calls to log   (default 1.0)
+    MCP_LOG_FORMAT       text or json                           (default text)
+    MCP_LOG_STREAM       stdout or stderr                       (default stdout)
+    MCP_LOG_RECENT_CALLS Size of the recent-calls ring buffer   (default 200)
+    MCP_LOG_QUEUE_SIZE   Records waiting to be written, at most (default 10000)
+
+Failed calls are always logged (at WARNING) regardless of sampling, as long
+as the queue has room.
+"""
+
+import atexit
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, TextIO
+
+from mcp.server.fastmcp import Context
+
+from metrics import metrics
+
+MAX_VALUE_LENGTH = 200
+MAX_RETAINED_ITEMS = 10
+MAX_RETAINED_DEPTH = 3
+DEFAULT_MAX_QUEUED = 10000
+_STOP = object()
+
+metrics.describe("mcp_call_log_dropped_total", "counter",
+                 "Call records dropped because the log stream could not keep up")
+
+
+def _short(value: Any) -> Any:
+    """Keep logged values small - long lists and strings are truncated"""
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > MAX_VALUE_LENGTH:
+        return text[:MAX_VALUE_LENGTH] + "..."
+    return text
+
+
+def _retained(value: Any, depth: int = 0) -> Any:
+    """What the recent-calls buffer keeps of an argument or result: long
+    text/bytes and long lists/dicts are cut right away (cheap slices of the
+    first few items), so the buffer never pins large payloads such as
+    resource pages or batch-tool inputs in memory"""
+    if isinstance(value, (str, bytes)) and len(value) > MAX_VALUE_LENGTH:
+        return value[:MAX_VALUE_LENGTH] + ("..." if isinstance(value, str) else b"...")
+    if isinstance(value, (list, tuple, dict)):
+        if depth >= MAX_RETAINED_DEPTH:
+            return f"<{type(value).__name__} of {len(value)} items>"
+        if isinstance(value, dict):
+            kept: Any = {key: _retained(item, depth + 1)
+                         for key, item in itertools.islice(value.items(), MAX_RETAINED_ITEMS)}
+            if len(value) > MAX_RETAINED_ITEMS:
+                kept["..."] = f"{len(value) - MAX_RETAINED_ITEMS} more"
+            return kept
+        kept = [_retained(item, depth + 1) for item in value[:MAX_RETAINED_ITEMS]]
+        if len(value) > MAX_RETAINED_ITEMS:
+            kept.append(f"... {len(value) - MAX_RETAINED_ITEMS} more")
+        return tuple(kept) if isinstance(value, tuple) else kept
+    return value
+
+
+def _render(call: dict[str, Any]) -> dict[str, Any]:
+    """Copy of a raw call record with arguments/result shortened for output"""
+    return {
+        **call,
+        "arguments": {key: _short(value) for key, value in call["arguments"].items()},
+        "result": _short(call["result"]),
+    }
+
+
+def format_call(call: dict[str, Any], fmt: str = "text") -> str:
+    """Format one call record as a text line or a JSON line"""
+    call = _render(call)
+    if fmt == "json":
+        return json.dumps(call, default=str)
+    arguments = " ".join(f"{key}={value}" for key, value in call["arguments"].items())
+    outcome = f"-> {call['result']}" if call["status"] == "ok" else f"!! {call['error']}"
+    return (
+        f"{time.strftime('%H:%M:%S', time.localtime(call['timestamp']))} "
+        f"{call['level']:<7} [{call['kind']}:{call['name']}] {arguments} "
+        f"{outcome} ({call['duration_ms']:.3f} ms)"
+    )
+
+
+class CallLog:
+    """Queue-backed call logger with levels, sampling and a recent-calls buffer
+
+    The calling thread only builds a small dict and puts it on a queue; the
+    writer thread formats and writes records in batches.
+    """
+
+    def __init__(
+        self,
+        level: str = "INFO",
+        sample_rate: float = 1.0,
+        fmt: str = "text",
+        stream: TextIO | None = None,
+        capacity: int = 200,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+    ):
+        self.recent: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self.max_queued = max_queued
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._level = logging.INFO
+        self.sample_rate = 1.0
+        self.fmt = fmt
+        self.stream = stream or sys.stdout
+        self.configure(level=level, sample_rate=sample_rate)
+
+    def configure(
+        self,
+        level: str | None = None,
+        sample_rate: float | None = None,
+        fmt: str | None = None,
+        stream: TextIO | None = None,
+    ) -> None:
+        """Change logging settings at runtime"""
+        if level is not None:
+            level = level.upper()
+            self._level = logging.CRITICAL + 1 if level == "OFF" else logging.getLevelName(level)
+            if not isinstance(self._level, int):
+                raise ValueError(f"Unknown log level: {level}")
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            self.sample_rate = sample_rate
+        if fmt is not None:
+            self.fmt = fmt
+        if stream is not None:
+            # Drain what was queued for the old stream before switching
+            self.stop()
+            self.stream = stream
+
+    def start(self) -> None:
+        """Start the background writer thread (idempotent)"""
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_loop, name="call-log-writer", daemon=True)
+            self._writer.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        with self._lock:
+            if self._writer is None:
+                return
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    def _write_loop(self) -> None:
+        """Writer thread: block for a record, then drain and write in one batch"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            lines = [format_call(item, self.fmt) for item in batch if item is not _STOP]
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    pass  # stream closed (e.g. at interpreter exit)
+            if stop:
+                return
+
+    def record(
+        self,
+        kind: str,
+        name: str,
+        arguments: dict[str, Any],
+        duration: float,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record one finished call
+
+        Args:
+            kind: "tool" or "resource"
+            name: Tool name or resource URI template
+            arguments: Arguments the call was made with
+            duration: Wall time of the call in seconds
+            result: Return value (successful calls)
+            error: Raised exception (failed calls)
+        """
+        level = logging.INFO if error is None else logging.WARNING
+        call = {
+            "timestamp": time.time(),
+            "level": "INFO" if error is None else "WARNING",
+            "kind": kind,
+            "name": name,
+            "arguments": {key: _retained(value) for key, value in arguments.items()},
+            "status": "ok" if error is None else "error",
+            "result": _retained(result),
+            "error": None if error is None else f"{type(error).__name__}: {error}",
+            "duration_ms": duration * 1000,
+        }
+        self.recent.append(call)
+
+        if level < self._level:
+            return
+        if error is None and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        if self._queue.qsize() >= self.max_queued:
+            # The stream is not keeping up: drop the record rather than grow without bound
+            self.dropped += 1
+            metrics.inc("mcp_call_log_dropped_total")
+            return
+        if self._writer is None:
+            self.start()
+        self._queue.put(call)
+
+    def recent_calls(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return the most recent calls (newest last), ready for JSON output"""
+        calls = list(self.recent)
+        if limit:
+            calls = calls[-limit:]
+        return [_render(call) for call in calls]
+
+
+call_log = CallLog(
+    level=os.environ.get("MCP_LOG_LEVEL", "INFO"),
+    sample_rate=float(os.environ.get("MCP_LOG_SAMPLE_RATE", "1.0")),
+    fmt=os.environ.get("MCP_LOG_FORMAT", "text"),
+    stream=sys.stderr if os.environ.get("MCP_LOG_STREAM") == "stderr" else sys.stdout,
+    capacity=int(os.environ.get("MCP_LOG_RECENT_CALLS", "200")),
+    max_queued=int(os.environ.get("MCP_LOG_QUEUE_SIZE", DEFAULT_MAX_QUEUED)),
+)
+atexit.register(call_log.stop)
+
+
+def _call_arguments(fn: Callable, args: tuple, kwargs: dict) -> dict[str, Any]:
+    """Name the arguments of a call, leaving out the FastMCP Context"""
+    if args:
+        kwargs = inspect.signature(fn).bind_partial(*args, **kwargs).arguments
+    return {key: value for key, value in kwargs.items() if not isinstance(value, Context)}
+
+
+def logged_call(kind: str, name: str | None = None) -> Callable[[Callable], Callable]:
+    """Decorator that records every call of a tool or resource in call_log
+
+    Place it BELOW @mcp.tool() / @mcp.resource() so FastMCP registers the
+    logged wrapper. Works for both sync and async functions.
+
+    Args:
+        kind: "tool" or "resource"
+        name: Name to log under (defaults to the function name)
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        call_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as exc:
+                    call_log.record(kind, call_name, _call_arguments(fn, args, kwargs),
+                                    time.perf_counter() - start, error=exc)
+                    raise
+                call_log.record(kind, call_name, _call_arguments(fn, args, kwargs),
+                                time.perf_counter() - start, result=result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                call_log.record(kind, call_name, _call_arguments(fn, args, kwargs),
+                                time.perf_counter() - start, error=exc)
+                raise
+            call_log.record(kind, call_name, _call_arguments(fn, args, kwargs),
+                            time.perf_counter() - start, result=result)
+            return result
+
+        return wrapper
+
+    return decorator
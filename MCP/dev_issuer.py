@@ -0,0 +1,136 @@
+"""
+Development Token Issuer
+========================
+
+A stand-in for a real identity provider (Microsoft Entra ID, ...), so the
+MCP server's bearer authentication (jwt_auth.py) can be tried locally.
+NOT for production: it hands a token to anyone who asks.
+
+    python dev_issuer.py                      # http://127.0.0.1:9000
+
+Endpoints:
+    GET  /.well-known/jwks.json                 Public signing keys (what the MCP server fetches)
+    GET  /.well-known/openid-configuration      Discovery document
+    POST /token                                 New access token, form or JSON fields:
+                                                  subject, audience, scope, expires_in
+    POST /rotate                                New signing key (the old one stays published)
+
+Then start the MCP server against it:
+
+    MCP_AUTH_ISSUER=http://127.0.0.1:9000 MCP_AUTH_AUDIENCE=api://calculator-mcp python server.py
+
+and get a token for a client:
+
+    curl -s -X POST http://127.0.0.1:9000/token -d audience=api://calculator-mcp
+"""
+
+import argparse
+import time
+import uuid
+
+import jwt
+import uvicorn
+from cryptography.hazmat.primitives.asymmetric import rsa
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DEFAULT_AUDIENCE = "api://calculator-mcp"
+DEFAULT_SCOPE = "mcp.tools"
+
+
+class DevIssuer:
+    """RSA signing keys and token minting for one issuer URL"""
+
+    def __init__(self, issuer: str):
+        self.issuer = issuer
+        self.keys: list[tuple[str, rsa.RSAPrivateKey]] = []  # newest last
+        self.rotate()
+
+    def rotate(self) -> str:
+        """Start signing with a new key; returns its key ID"""
+        key_id = uuid.uuid4().hex[:16]
+        self.keys.append((key_id, rsa.generate_private_key(public_exponent=65537, key_size=2048)))
+        del self.keys[:-2]  # publish the current and the previous key
+        return key_id
+
+    def jwks(self) -> dict:
+        keys = []
+        for key_id, private_key in self.keys:
+            jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+            keys.append({**jwk, "kid": key_id, "alg": "RS256", "use": "sig"})
+        return {"keys": keys}
+
+    def issue(self, subject: str = "dev-agent", audience: str = DEFAULT_AUDIENCE,
+              scope: str = DEFAULT_SCOPE, expires_in: int = 3600) -> str:
+        """A signed access token"""
+        key_id, private_key = self.keys[-1]
+        now = int(time.time())
+        claims = {
+            "iss": self.issuer,
+            "sub": subject,
+            "azp": subject,
+            "aud": audience,
+            "scope": scope,
+            "iat": now,
+            "exp": now + expires_in,
+            "jti": uuid.uuid4().hex,
+        }
+        return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": key_id})
+
+    def app(self) -> Starlette:
+        async def jwks(request: Request) -> JSONResponse:
+            return JSONResponse(self.jwks())
+
+        async def discovery(request: Request) -> JSONResponse:
+            return JSONResponse({
+                "issuer": self.issuer,
+                "jwks_uri": f"{self.issuer}/.well-known/jwks.json",
+                "token_endpoint": f"{self.issuer}/token",
+                "id_token_signing_alg_values_supported": ["RS256"],
+            })
+
+        async def token(request: Request) -> JSONResponse:
+            if request.headers.get("content-type", "").startswith("application/json"):
+                fields = await request.json()
+            else:
+                fields = dict(await request.form())
+            expires_in = int(fields.get("expires_in", 3600))
+            access_token = self.issue(
+                subject=fields.get("subject", "dev-agent"),
+                audience=fields.get("audience", DEFAULT_AUDIENCE),
+                scope=fields.get("scope", DEFAULT_SCOPE),
+                expires_in=expires_in,
+            )
+            return JSONResponse({"access_token": access_token, "token_type": "Bearer", "expires_in": expires_in})
+
+        async def rotate(request: Request) -> JSONResponse:
+            return JSONResponse({"kid": self.rotate()})
+
+        return Starlette(routes=[
+            Route("/.well-known/jwks.json", jwks),
+            Route("/.well-known/openid-configuration", discovery),
+            Route("/token", token, methods=["POST"]),
+            Route("/rotate", rotate, methods=["POST"]),
+        ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in token issuer for testing MCP auth")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=9000, help="Port to listen on")
+    args = parser.parse_args()
+
+    issuer = DevIssuer(f"http://{args.host}:{args.port}")
+    print("=" * 60)
+    print("🔑 Development Token Issuer (do not use in production)")
+    print("=" * 60)
+    print(f"Issuer: {issuer.issuer}")
+    print(f"JWKS:   {issuer.issuer}/.well-known/jwks.json")
+    print("\nStart the MCP server with:")
+    print(f"  MCP_AUTH_ISSUER={issuer.issuer} MCP_AUTH_AUDIENCE={DEFAULT_AUDIENCE} python server.py")
+    print("\nGet a token:")
+    print(f"  curl -s -X POST {issuer.issuer}/token -d audience={DEFAULT_AUDIENCE}")
+    print("=" * 60)
+    uvicorn.run(issuer.app(), host=args.host, port=args.port, log_level="warning")
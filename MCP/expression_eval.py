@@ -0,0 +1,224 @@
+"""
+Safe Expression Evaluator
+=========================
+
+Backs the `evaluate` tool in server.py. An arithmetic expression such as
+"(price * qty) - discount" is parsed once into a Python AST, checked against
+a whitelist of node types, and compiled into a tree of small closures.
+Compiled expressions are kept in an LRU cache keyed by the expression text,
+so evaluating the same formula against many variable bindings (or across
+many tool calls) only pays the parsing cost once.
+
+Nothing is ever passed to eval()/exec(): names can only resolve to the
+caller's variables or the constants/functions listed below, and attribute
+access, subscripts, lambdas, comprehensions and calls to anything else are
+rejected at compile time.
+"""
+
+import ast
+import math
+import operator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Mapping
+
+# Limits that keep a single tool call cheap
+MAX_EXPRESSION_LENGTH = 1000
+MAX_RESULT_BITS = 4096
+MAX_ROUND_DIGITS = int(MAX_RESULT_BITS * math.log10(2)) + 1  # Digits of a MAX_RESULT_BITS-bit integer
+COMPILE_CACHE_SIZE = 256
+
+class ExpressionError(ValueError):
+    """Raised when an expression is malformed, unsafe, or cannot be evaluated"""
+
+
+def _int_bits(value: float) -> int:
+    """Size of an integer operand in bits (0 for floats, whose range is fixed)"""
+    return abs(value).bit_length() if isinstance(value, int) else 0
+
+
+def _safe_pow(base: float, exponent: float) -> float:
+    """Power operator with a bound on the size of the result
+
+    The bound is on the result, not the exponent: stacked powers such as
+    (9**999)**999 would otherwise build integers of billions of bits.
+    """
+    if base != 0 and abs(base) != 1 and exponent * math.log2(abs(base)) > MAX_RESULT_BITS:
+        raise ExpressionError(f"{base!r:.40} ** {exponent!r:.40} is too large (limit 2**{MAX_RESULT_BITS})")
+    return operator.pow(base, exponent)
+
+
+def _safe_mul(left: float, right: float) -> float:
+    """Multiplication with the same bound on integer results as **"""
+    if _int_bits(left) + _int_bits(right) > MAX_RESULT_BITS:
+        raise ExpressionError(f"{left!r:.40} * {right!r:.40} is too large (limit 2**{MAX_RESULT_BITS})")
+    return left * right
+
+
+def _bounded_operands(op: Callable[[float, float], float], symbol: str) -> Callable[[float, float], float]:
+    """An operator that refuses integer operands beyond MAX_RESULT_BITS"""
+    def apply(left: float, right: float) -> float:
+        if max(_int_bits(left), _int_bits(right)) > MAX_RESULT_BITS:
+            raise ExpressionError(f"{left!r:.40} {symbol} {right!r:.40} is too large (limit 2**{MAX_RESULT_BITS})")
+        return op(left, right)
+    return apply
+
+
+def _safe_round(number: float, ndigits: int | None = None) -> float:
+    """round() with a bound on ndigits: round(5, -10**7) builds 10**(10**7)"""
+    if ndigits is not None and abs(ndigits) > MAX_ROUND_DIGITS:
+        raise ExpressionError(f"round() digits must be between -{MAX_ROUND_DIGITS} and {MAX_ROUND_DIGITS}")
+    return round(number, ndigits)
+
+
+_BINARY_OPERATORS: dict[type, Callable[[float, float], float]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: _safe_mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: _bounded_operands(operator.floordiv, "//"),
+    ast.Mod: _bounded_operands(operator.mod, "%"),
+}
+
+_UNARY_OPERATORS: dict[type, Callable[[float], float]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+FUNCTIONS: dict[str, Callable[..., float]] = {
+    "abs": abs,
+    "round": _safe_round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+}
+
+CONSTANTS: dict[str, float] = {
+    "pi": math.pi,
+    "e": math.e,
+}
+
+Evaluator = Callable[[Mapping[str, float]], float]
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    """An expression compiled once and reusable against many bindings
+
+    Attributes:
+        expression: The original expression text
+        variables: Names the expression expects the caller to bind
+    """
+
+    expression: str
+    variables: frozenset[str]
+    _evaluator: Evaluator
+
+    def evaluate(self, bindings: Mapping[str, float] | None = None) -> float:
+        """Evaluate the expression with the given variable values
+
+        Args:
+            bindings: Mapping of variable name to value
+
+        Returns:
+            The numeric result
+
+        Raises:
+            ExpressionError: If a variable is unbound or the math fails
+        """
+        bindings = bindings or {}
+        missing = self.variables.difference(bindings)
+        if missing:
+            raise ExpressionError(f"Missing value(s) for variable(s): {', '.join(sorted(missing))}")
+        try:
+            return self._evaluator(bindings)
+        except ExpressionError:
+            raise
+        except (ArithmeticError, ValueError, TypeError) as exc:
+            raise ExpressionError(f"Could not evaluate '{self.expression}': {exc}") from exc
+
+
+def _compile_node(node: ast.AST, variables: set[str]) -> Evaluator:
+    """Turn one whitelisted AST node into a closure, collecting free variables"""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, variables)
+
+    if isinstance(node, ast.Constant):
+        # bool is a subclass of int, but True/False are not numbers here
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Unsupported constant: {node.value!r}")
+        value = node.value
+        return lambda bindings: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda bindings: value
+        if name in FUNCTIONS:
+            raise ExpressionError(f"'{name}' is a function and must be called, e.g. {name}(x)")
+        variables.add(name)
+        return lambda bindings: bindings[name]
+
+    if isinstance(node, ast.BinOp):
+        left = _compile_node(node.left, variables)
+        right = _compile_node(node.right, variables)
+        if isinstance(node.op, ast.Pow):
+            return lambda bindings: _safe_pow(left(bindings), right(bindings))
+        op = _BINARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        return lambda bindings: op(left(bindings), right(bindings))
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, variables)
+        op = _UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator: {type(node.op).__name__}")
+        return lambda bindings: op(operand(bindings))
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ExpressionError(
+                f"Unsupported function call. Allowed functions: {', '.join(sorted(FUNCTIONS))}"
+            )
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        func = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, variables) for arg in node.args]
+        return lambda bindings: func(*(arg(bindings) for arg in args))
+
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression: str) -> CompiledExpression:
+    """Parse, validate and compile an expression (cached by expression text)
+
+    Args:
+        expression: Arithmetic expression, e.g. "a * (b + 2) / sqrt(c)"
+
+    Returns:
+        A CompiledExpression that can be evaluated many times
+
+    Raises:
+        ExpressionError: If the expression is too long, malformed or unsafe
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionError(f"Expression is longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ExpressionError(f"Invalid expression '{expression}': {exc.msg}") from exc
+
+    variables: set[str] = set()
+    evaluator = _compile_node(tree, variables)
+    return CompiledExpression(expression, frozenset(variables), evaluator)
@@ -0,0 +1,69 @@
+"""
+Concurrent Tool Calls (client side)
+===================================
+
+Awaiting call_tool() one call at a time makes a batch of independent calls
+take the SUM of their latencies. MCP sessions can carry many requests at
+once (each is a separate JSON-RPC request with its own ID, and the server
+handles them concurrently), so the batch can take the time of the SLOWEST
+call instead:
+
+    from fan_out import call_tools
+
+    results = await call_tools(session, [
+        ("add", {"a": 5, "b": 3}),
+        ("prime_factors", {"n": 600851475143}),
+        ("evaluate", {"expression": "2 ** 10"}),
+    ])
+
+- Results come back in request order, whatever order the calls finish in.
+- Errors stay with their call: a call that fails (server error, timeout,
+  lost connection) yields its exception in its slot, and the other calls
+  still return their results. Tool errors (result.isError) are returned
+  as normal results, as with call_tool().
+- max_concurrency caps how many calls are in flight at once (the server's
+  admission control queues or rejects what it cannot run anyway).
+
+Agents: when the model asks for several tools in one turn, Agent Framework
+already runs the function calls concurrently, and an MCP tool sends them
+over its one session at the same time. ChatAgent(allow_multiple_tool_calls=True)
+lets the model ask for them together (see get_agent_mi.py).
+"""
+
+import asyncio
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from mcp import ClientSession
+from mcp.types import CallToolResult
+
+
+async def call_tools(
+    session: ClientSession,
+    calls: Sequence[tuple[str, dict[str, Any] | None]],
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+) -> list[CallToolResult | Exception]:
+    """Call several independent tools at once over one session
+
+    Args:
+        session: An initialized client session
+        calls: (tool name, arguments) pairs
+        max_concurrency: Most calls in flight at once (None = all)
+        timeout: Seconds to wait for each call (None = the session's default)
+
+    Returns:
+        One entry per call, in the order of `calls`: the CallToolResult, or
+        the exception the call raised
+    """
+    limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    read_timeout = timedelta(seconds=timeout) if timeout else None
+
+    async def call(name: str, arguments: dict[str, Any] | None) -> CallToolResult:
+        if limit is None:
+            return await session.call_tool(name, arguments, read_timeout_seconds=read_timeout)
+        async with limit:
+            return await session.call_tool(name, arguments, read_timeout_seconds=read_timeout)
+
+    return await asyncio.gather(*(call(name, arguments) for name, arguments in calls), return_exceptions=True)
@@ -0,0 +1,198 @@
+"""
+File-Backed Resources
+=====================
+
+Serves every file in a folder as an MCP resource, however large:
+
+    data://orders-2024.csv
+    data://contoso-tents-datasheet.pdf
+
+A read returns one page of the file, never the whole file. The page's
+`_meta` says where it is in the file and how to get the next one:
+
+    resources/read  data://orders-2024.csv
+        -> rows 1..N         _meta: {"offset": 0, "size": 734003200, "nextCursor": "MTMxMDcy..."}
+    resources/read  data://orders-2024.csv?cursor=MTMxMDcy...
+        -> next rows         _meta: {..., "nextCursor": ...}   (null on the last page)
+
+Files are memory-mapped and only the requested page is copied out, so the
+server's memory stays the same for a 1 KB file and a 10 GB export. Text
+files (CSV, JSON Lines, ...) are cut at line ends, so a page never splits a
+row; other files (PDF, ...) come back as binary blobs.
+
+resources/list is paginated too: with many files it returns a page of
+entries and a nextCursor, as the MCP spec describes.
+
+A cursor belongs to one version of a file: if the file changes between
+pages, the next read fails and the client starts again from the beginning.
+
+Configuration:
+    MCP_DATA_DIR                  Folder to serve (default: data/ next to server.py)
+    MCP_RESOURCE_PAGE_SIZE        Bytes per page (default 65536)
+    MCP_RESOURCE_LIST_PAGE_SIZE   Entries per resources/list page (default 100)
+"""
+
+import base64
+import mimetypes
+import mmap
+import os
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from mcp.types import Resource
+
+DEFAULT_PAGE_SIZE = 64 * 1024
+DEFAULT_LIST_PAGE_SIZE = 100
+
+mimetypes.add_type("text/csv", ".csv")
+mimetypes.add_type("application/jsonl", ".jsonl")
+mimetypes.add_type("text/markdown", ".md")
+
+_TEXT_TYPES = ("application/json", "application/jsonl", "application/xml", "application/x-ndjson")
+
+
+def encode_cursor(*parts: int) -> str:
+    """Opaque cursor from integers (clients must not parse it)"""
+    return base64.urlsafe_b64encode(":".join(map(str, parts)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, count: int) -> list[int]:
+    """Integers back from encode_cursor()
+
+    Raises:
+        ValueError: If the cursor was not made by encode_cursor() with `count` parts
+    """
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = [int(part) for part in text.split(":")]
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    if len(parts) != count or min(parts) < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return parts
+
+
+def is_text(mime_type: str) -> bool:
+    return mime_type.startswith("text/") or mime_type in _TEXT_TYPES
+
+
+class FileResources:
+    """A folder of files served as paginated `<scheme>://<file name>` resources"""
+
+    def __init__(self, directory: str, scheme: str = "data", page_size: int = DEFAULT_PAGE_SIZE,
+                 list_page_size: int = DEFAULT_LIST_PAGE_SIZE):
+        """
+        Args:
+            directory: Folder whose files are served (subfolders are not)
+            scheme: URI scheme of the resources (data://...)
+            page_size: Maximum bytes returned by one read
+            list_page_size: Maximum entries returned by one resources/list
+        """
+        if page_size <= 0 or list_page_size <= 0:
+            raise ValueError("page_size and list_page_size must be positive")
+        self.directory = os.path.abspath(directory)
+        self.scheme = scheme
+        self.page_size = page_size
+        self.list_page_size = list_page_size
+
+    @property
+    def uri_template(self) -> str:
+        return f"{self.scheme}://{{name}}"
+
+    def names(self) -> list[str]:
+        """Files served, sorted by name (hidden files are skipped)"""
+        if not os.path.isdir(self.directory):
+            return []
+        with os.scandir(self.directory) as entries:
+            return sorted(entry.name for entry in entries if entry.is_file() and not entry.name.startswith("."))
+
+    def uri(self, name: str) -> str:
+        return f"{self.scheme}://{quote(name)}"
+
+    def parse_uri(self, uri: str) -> tuple[str, str | None] | None:
+        """(file name, cursor) for one of our URIs, or None if the URI is not ours"""
+        parts = urlsplit(uri)
+        if parts.scheme != self.scheme:
+            return None
+        cursor = parse_qs(parts.query).get("cursor", [None])[0]
+        return unquote(parts.netloc + parts.path), cursor
+
+    def _path(self, name: str) -> str:
+        path = os.path.join(self.directory, name)
+        if name.startswith(".") or os.path.dirname(name) or not os.path.isfile(path):
+            raise FileNotFoundError(f"No such resource: {self.uri(name)}")
+        return path
+
+    def describe(self, name: str) -> Resource:
+        """resources/list entry for one file"""
+        mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        size = os.path.getsize(os.path.join(self.directory, name))
+        return Resource(
+            uri=self.uri(name),
+            name=name,
+            description=f"{size:,} bytes, read in pages of up to {self.page_size:,} bytes",
+            mimeType=mime_type,
+            size=size,
+        )
+
+    def list_page(self, start: int = 0) -> tuple[list[Resource], int | None]:
+        """One page of resources/list entries, from the `start`-th file
+
+        Returns:
+            (entries, index of the first file on the next page, or None on the last page)
+        """
+        names = self.names()
+        end = start + self.list_page_size
+        return [self.describe(name) for name in names[start:end]], end if end < len(names) else None
+
+    def read_page(self, name: str, cursor: str | None = None) -> tuple[str | bytes, str, dict]:
+        """Read the page of `name` that starts at `cursor` (the first page if None)
+
+        Returns:
+            (content, MIME type, _meta with offset, length, size and nextCursor)
+
+        Raises:
+            FileNotFoundError: If the file is not served
+            ValueError: If the cursor is invalid or the file changed since it was made
+        """
+        path = self._path(name)
+        mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        text = is_text(mime_type)
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            version = stat.st_mtime_ns
+            offset = 0
+            if cursor:
+                offset, cursor_version = decode_cursor(cursor, 2)
+                if cursor_version != version:
+                    raise ValueError(f"{self.uri(name)} changed since this cursor was made; read it from the start")
+                if offset > stat.st_size:
+                    raise ValueError(f"Invalid cursor: {cursor!r}")
+
+            if stat.st_size == 0:  # mmap cannot map an empty file
+                page = b""
+            else:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    end = min(offset + self.page_size, stat.st_size)
+                    if text and end < stat.st_size:
+                        end = self._text_page_end(mapped, offset, end)
+                    page = mapped[offset:end]  # copies just this page
+
+        end = offset + len(page)
+        meta = {
+            "offset": offset,
+            "length": len(page),
+            "size": stat.st_size,
+            "nextCursor": encode_cursor(end, version) if end < stat.st_size else None,
+        }
+        content = page.decode("utf-8", errors="replace") if text else page
+        return content, mime_type, meta
+
+    @staticmethod
+    def _text_page_end(mapped: mmap.mmap, offset: int, end: int) -> int:
+        """Move a text page's end back to a line end (or at least a UTF-8 character boundary)"""
+        newline = mapped.rfind(b"\n", offset, end)
+        if newline >= 0:
+            return newline + 1
+        while end > offset + 1 and mapped[end] & 0xC0 == 0x80:  # continuation byte
+            end -= 1
+        return end
@@ -30,8 +30,16 @@ import asyncio
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureAIAgentClient
 from azure.identity.aio import AzureCliCredential
-from agent_framework import MCPStreamableHTTPTool
 import os
+import sys
+
+# The console helpers and offline mock model shared by the workshops
+# (MSFT_Agent_Framework/chat_console.py and mock_chat_client.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "MSFT_Agent_Framework"))
+
+from chat_console import ainput, stream_reply
+from mock_chat_client import chat_client_or_mock, mock_enabled
+from schema_cache import CachedMCPStdioTool, CachedMCPStreamableHTTPTool
 
 # ============================================================================
 # CONFIGURATION - Update these with your details
@@ -51,6 +59,31 @@ os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"] = "your-model-deployment-name"
 # 3. Copy the Agent ID from the details
 AGENT_ID = "your-agent-id"  # ← REPLACE THIS with your agent ID from the portal
 
+# Optional: How the agent reaches the MCP server
+# - "http":      the server runs separately (python server.py) - the default
+# - "stdio":     this script starts server.py itself and talks over a pipe
+# - "inprocess": the server runs inside this script - fastest, no network at all
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "http")
+
+# Optional: Bearer token, if the MCP server requires one (MCP_AUTH_ISSUER set on the server)
+MCP_AUTH_TOKEN = os.environ.get("MCP_AUTH_TOKEN")
+
+# Optional: how many of the latest thread messages each run reads (0 = all)
+# Once you add a thread (Exercise 4), long conversations then stop re-sending
+# their whole history on every turn
+HISTORY_LAST_MESSAGES = int(os.environ.get("HISTORY_LAST_MESSAGES", "40"))
+RUN_OPTIONS = (
+    {"truncation_strategy": {"type": "last_messages", "last_messages": HISTORY_LAST_MESSAGES}}
+    if HISTORY_LAST_MESSAGES else {}
+)
+
+# Optional: print time-to-first-token for every reply (CHAT_DEBUG=1)
+CHAT_DEBUG = os.environ.get("CHAT_DEBUG", "").lower() in ("1", "true", "yes")
+
+# Optional: chat with a local mock model instead of the Foundry agent (MOCK_CHAT_CLIENT=1)
+# No Azure needed - useful to try the MCP side, or to measure it, offline
+MOCK_CHAT_CLIENT = mock_enabled()
+
 # Example:
 # os.environ["AZURE_AI_PROJECT_ENDPOINT"] = "https://mcpworkshopdemo0000.services.ai.azure.com/api/projects/proj1"
 # os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"] = "gpt-4o-mini"
@@ -58,6 +91,48 @@ AGENT_ID = "your-agent-id"  # ← REPLACE THIS with your agent ID from the porta
 # ============================================================================
 
 
+def create_mcp_tool(chat_client):
+    """
+    Create the MCP tool for the transport chosen in MCP_TRANSPORT
+    
+    stdio and in-process skip HTTP and the TCP loopback on every tool call,
+    which matters when an agent makes many small calls
+    (compare with: python benchmarks/bench_transports.py)
+
+    The http and stdio tools start from cached tool schemas when the server's
+    tools have not changed since the last run (see schema_cache.py)
+    """
+    if MCP_TRANSPORT == "stdio":
+        server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+        mcp_tool = CachedMCPStdioTool(
+            name="Custom MCP Server",
+            command=sys.executable,  # Start server.py with this same Python
+            args=[server_script, "--transport", "stdio"],
+            env=dict(os.environ),
+            chat_client=chat_client
+        )
+        print("✓ MCP tool configured for stdio (server.py started by this script)")
+    elif MCP_TRANSPORT == "inprocess":
+        from inprocess import MCPInProcessTool
+        from server import mcp
+
+        mcp_tool = MCPInProcessTool(
+            name="Custom MCP Server",
+            server=mcp,  # The server object itself - no URL, no process
+            chat_client=chat_client
+        )
+        print("✓ MCP tool configured in-process")
+    else:
+        mcp_tool = CachedMCPStreamableHTTPTool(
+            name="Custom MCP Server",  # Friendly name for the tool
+            url="http://localhost:8080/mcp",  # URL where your MCP server is running
+            headers={"Authorization": f"Bearer {MCP_AUTH_TOKEN}"} if MCP_AUTH_TOKEN else None,
+            chat_client=chat_client  # Agent client for making requests
+        )
+        print("✓ MCP tool configured for localhost:8080")
+    return mcp_tool
+
+
 async def main():
     """
     Main function: Retrieves existing agent and adds MCP tool integration
@@ -82,24 +157,24 @@ async def main():
         # - Update agent settings in the portal UI
         # - Production-ready deployment pattern
         
-        chat_client = AzureAIAgentClient(
+        # Offline (MOCK_CHAT_CLIENT): a local mock model that can still call your MCP tools
+        # (rules, latency and 429s: see MSFT_Agent_Framework/mock_chat_client.py)
+        chat_client = chat_client_or_mock(lambda: AzureAIAgentClient(
             credential=credential,
             agent_id=AGENT_ID  # The ID of your existing agent
-        )
-        print(f"✓ Connected to existing agent: {AGENT_ID}")
+        ))
+        if MOCK_CHAT_CLIENT:
+            print("✓ Using the offline mock model (MOCK_CHAT_CLIENT)")
+        else:
+            print(f"✓ Connected to existing agent: {AGENT_ID}")
         
         # ===================================================================
         # STEP 2: Configure MCP Tool
         # ===================================================================
         # Add MCP tools to the existing agent
-        # The server must be running at http://localhost:8080/mcp
+        # With MCP_TRANSPORT="http" the server must be running at http://localhost:8080/mcp
         
-        mcp_tool = MCPStreamableHTTPTool(
-            name="Custom MCP Server",  # Friendly name for the tool
-            url="http://localhost:8080/mcp",  # URL where your MCP server is running
-            chat_client=chat_client  # Agent client for making requests
-        )
-        print("✓ MCP tool configured for localhost:8080")
+        mcp_tool = create_mcp_tool(chat_client)
         
         # ===================================================================
         # STEP 3: Create ChatAgent Wrapper
@@ -109,6 +184,9 @@ async def main():
         async with ChatAgent(
             chat_client=chat_client,
             tools=mcp_tool,  # Add MCP tools to the agent
+            # Let the model ask for several independent tools in one turn; they
+            # run concurrently over the one MCP session (see fan_out.py)
+            allow_multiple_tool_calls=True,
         ) as agent:
             print("✓ Agent ready with MCP tools")
             
@@ -132,7 +210,7 @@ async def main():
                 while True:
                     try:
                         # Get user input
-                        user_input = input("You: ").strip()
+                        user_input = (await ainput("You: ")).strip()
                         
                         # Check for exit commands
                         if user_input.lower() in ['exit', 'quit', 'q']:
@@ -145,9 +223,9 @@ async def main():
                         
                         # Run the agent with user's query
                         # The agent will automatically use MCP tools when needed
+                        # and the reply prints as it arrives
                         print("\n🤖 Assistant: ", end="", flush=True)
-                        result = await agent.run(user_input) # add thread id here if needed (`thread_id=thread_id`)
-                        print(result.text)
+                        await stream_reply(agent, user_input, debug=CHAT_DEBUG, **RUN_OPTIONS) # add the thread here if needed (`thread=thread`)
                         print()  # Extra newline for readability
                         
                     except EOFError:
@@ -168,5 +246,6 @@ async def main():
 # ============================================================================
 if __name__ == "__main__":
     print("🚀 Retrieving existing Azure AI Foundry Agent...")
-    print("📝 Make sure your MCP server is running (python server.py)\n")
+    if MCP_TRANSPORT == "http":
+        print("📝 Make sure your MCP server is running (python server.py)\n")
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+In-Process MCP Transport
+========================
+
+When the agent and the MCP server run on the same host, the HTTP transport
+still pays for HTTP framing, JSON encoding and a TCP round trip through the
+loopback interface on every tool call. Two faster options:
+
+    stdio       python server.py --transport stdio
+                The agent starts the server as a child process and talks
+                to it over a pipe (agent_framework.MCPStdioTool).
+
+    in-process  The agent imports the server and mounts it directly:
+
+                    from inprocess import MCPInProcessTool
+                    from server import mcp
+
+                    mcp_tool = MCPInProcessTool(name="Calculator", server=mcp)
+
+                MCP messages are handed over through in-memory streams, so
+                there is no socket, pipe or JSON encoding at all.
+
+Either way, every call still goes through the server's usual layers
+(admission control, cache, call log, metrics), and tools behave the same.
+
+Things to know about in-process mode:
+- Tools run on the agent's event loop. Blocking or CPU-heavy tools must use
+  executor="thread" or executor="process" (see offload.py), or the agent
+  stalls while they run.
+- The server's background tasks (e.g. plugin hot reload) are not started by
+  a connection. Wrap the agent in `async with mcp.running_background_tasks():`
+  to run them.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import anyio
+from agent_framework._mcp import MCPTool  # base of MCPStdioTool/MCPStreamableHTTPTool (not re-exported)
+from mcp.shared.memory import MessageStream, create_client_server_memory_streams
+
+from layered_mcp import LayeredFastMCP
+
+
+@asynccontextmanager
+async def inprocess_client(mcp: LayeredFastMCP) -> AsyncIterator[MessageStream]:
+    """Serve `mcp` in this process and yield the client's (read, write) streams
+
+    Use the streams like those of streamablehttp_client or stdio_client:
+
+        async with inprocess_client(mcp) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+    """
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        async with anyio.create_task_group() as task_group:
+            server = mcp._mcp_server
+            task_group.start_soon(
+                server.run, *server_streams, server.create_initialization_options()
+            )
+            try:
+                yield client_streams
+            finally:
+                task_group.cancel_scope.cancel()
+
+
+class MCPInProcessTool(MCPTool):
+    """Agent Framework MCP tool connected to a server object in this process
+
+    A drop-in replacement for MCPStreamableHTTPTool / MCPStdioTool when the
+    agent can import the server.
+    """
+
+    def __init__(self, name: str, server: LayeredFastMCP, **kwargs: Any):
+        """
+        Args:
+            name: Friendly name of the tool
+            server: The server to mount (e.g. `from server import mcp`)
+            **kwargs: Any other MCPTool argument (description, chat_client, ...)
+        """
+        super().__init__(name=name, **kwargs)
+        self.server = server
+
+    def get_mcp_client(self):
+        return inprocess_client(self.server)
@@ -0,0 +1,231 @@
+"""
+JWT Bearer Authentication
+=========================
+
+Protects the /mcp endpoint with OAuth 2.0 bearer tokens (JWTs) issued by an
+identity provider such as Microsoft Entra ID. Clients send
+
+    Authorization: Bearer <token>
+
+and requests without a valid token get 401 (403 if a required scope is
+missing). /metrics, /ready and the other operational routes stay open for
+probes and scrapers.
+
+Validation is built to cost almost nothing per request:
+
+    Key cache     The issuer's signing keys (JWKS) are fetched once and
+                  refreshed in the background every MCP_AUTH_JWKS_REFRESH
+                  seconds. A token signed with a key we have not seen yet
+                  (key rotation) triggers one immediate refresh.
+    Token cache   A small LRU of tokens that already passed, keyed by the
+                  token's SHA-256 hash. An agent sends the same token on
+                  every call until it expires, so only its first call pays
+                  for signature verification; later calls are a dict lookup.
+                  Cached entries still expire with the token.
+
+Configuration (auth is off unless MCP_AUTH_ISSUER is set):
+    MCP_AUTH_ISSUER            Token issuer (`iss`), e.g. https://login.microsoftonline.com/<tenant>/v2.0
+    MCP_AUTH_AUDIENCE          Expected audience (`aud`), e.g. api://calculator-mcp - required
+                               with MCP_AUTH_ISSUER, or any token the issuer signs for any
+                               other app would be accepted here
+    MCP_AUTH_JWKS_URL          Signing keys (default: <issuer>/.well-known/jwks.json)
+    MCP_AUTH_REQUIRED_SCOPES   Space-separated scopes every token must have
+    MCP_AUTH_JWKS_REFRESH      Seconds between key refreshes (default 300)
+    MCP_AUTH_CACHE_SIZE        Validated tokens remembered (default 1024, 0 = no cache)
+
+For local testing, dev_issuer.py is a stand-in issuer that serves a JWKS
+and hands out tokens.
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import httpx
+import jwt
+from mcp.server.auth.provider import AccessToken
+from mcp.server.auth.settings import AuthSettings
+
+from metrics import metrics
+
+DEFAULT_JWKS_REFRESH = 300.0
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_ALGORITHMS = ("RS256", "ES256")
+# An unknown key ID triggers at most one refresh per this many seconds
+MIN_ON_DEMAND_REFRESH = 5.0
+
+metrics.describe("mcp_auth_requests_total", "counter",
+                 "Bearer tokens checked (result: cached, verified, rejected)")
+metrics.describe("mcp_auth_jwks_refreshes_total", "counter", "Signing key fetches (result: ok, error)")
+
+
+def _say(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+class JWKSCache:
+    """The issuer's signing keys by key ID, refreshed in the background"""
+
+    def __init__(self, url: str, refresh_interval: float = DEFAULT_JWKS_REFRESH):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.keys: dict[str, jwt.PyJWK] = {}
+        self.fetched_at = 0.0
+        self.attempted_at = float("-inf")  # Last on-demand fetch, successful or not
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        """Fetch the key set now (keeps the old keys if the fetch fails)
+
+        Raises:
+            httpx.HTTPError, jwt.PyJWKSetError: If the keys cannot be fetched or parsed
+        """
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+            key_set = jwt.PyJWKSet.from_dict(response.json())
+        except Exception:
+            metrics.inc("mcp_auth_jwks_refreshes_total", {"result": "error"})
+            raise
+        self.keys = {key.key_id: key for key in key_set.keys if key.key_id}
+        self.fetched_at = time.monotonic()
+        metrics.inc("mcp_auth_jwks_refreshes_total", {"result": "ok"})
+
+    async def get(self, key_id: str) -> jwt.PyJWK | None:
+        """Key for `key_id`, refreshing once if it is unknown (the issuer may have rotated keys)"""
+        key = self.keys.get(key_id)
+        if key is not None:
+            return key
+        # One fetch at a time, and at most one per MIN_ON_DEMAND_REFRESH seconds:
+        # tokens with made-up key IDs must not turn into a flood of JWKS requests.
+        # Inside that window an unknown key is simply rejected - nobody waits.
+        if self._refreshed_recently():
+            return None
+        async with self._lock:
+            if key_id not in self.keys and not self._refreshed_recently():
+                self.attempted_at = time.monotonic()
+                try:
+                    await self.refresh()
+                except Exception as exc:
+                    _say(f"❌ Could not fetch signing keys from {self.url}: {exc}")
+        return self.keys.get(key_id)
+
+    def _refreshed_recently(self) -> bool:
+        return time.monotonic() - max(self.fetched_at, self.attempted_at) < MIN_ON_DEMAND_REFRESH
+
+    async def watch(self) -> None:
+        """Refresh the keys forever (run as a background task)"""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as exc:
+                _say(f"❌ Could not fetch signing keys from {self.url}: {exc}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+class JWTVerifier:
+    """TokenVerifier for FastMCP: JWT signature and claims, with a validated-token cache"""
+
+    def __init__(
+        self,
+        keys: JWKSCache,
+        issuer: str,
+        audience: str,
+        algorithms: tuple[str, ...] = DEFAULT_ALGORITHMS,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.keys = keys
+        self.issuer = issuer
+        self.audience = audience
+        self.algorithms = list(algorithms)
+        self.cache_size = cache_size
+        self._validated: OrderedDict[bytes, AccessToken] = OrderedDict()
+
+    async def verify_token(self, token: str) -> AccessToken | None:
+        """AccessToken for a valid token, None otherwise"""
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._validated.get(digest)
+        if cached is not None:
+            if cached.expires_at is None or cached.expires_at > time.time():
+                self._validated.move_to_end(digest)
+                metrics.inc("mcp_auth_requests_total", {"result": "cached"})
+                return cached
+            del self._validated[digest]
+
+        access = await self._verify_signature(token)
+        if access is None:
+            metrics.inc("mcp_auth_requests_total", {"result": "rejected"})
+            return None
+        metrics.inc("mcp_auth_requests_total", {"result": "verified"})
+        if self.cache_size > 0:
+            self._validated[digest] = access
+            if len(self._validated) > self.cache_size:
+                self._validated.popitem(last=False)
+        return access
+
+    async def _verify_signature(self, token: str) -> AccessToken | None:
+        try:
+            key_id = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            return None
+        key = await self.keys.get(key_id) if key_id else None
+        if key is None:
+            return None
+        try:
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                issuer=self.issuer,
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except jwt.InvalidTokenError:
+            return None
+
+        scopes = claims.get("scp") or claims.get("scope") or ""
+        audience = claims.get("aud")
+        return AccessToken(
+            token=token,
+            client_id=str(claims.get("azp") or claims.get("appid") or claims.get("client_id") or claims.get("sub")),
+            scopes=scopes.split() if isinstance(scopes, str) else list(scopes),
+            expires_at=int(claims["exp"]),
+            resource=self.audience if isinstance(audience, list) else audience,
+            subject=claims.get("sub"),
+            claims={"iss": claims["iss"]},
+        )
+
+
+def auth_from_env() -> tuple[AuthSettings | None, JWTVerifier | None]:
+    """AuthSettings and verifier for FastMCP from MCP_AUTH_* (both None when auth is off)
+
+    Raises:
+        ValueError: If MCP_AUTH_ISSUER is set without MCP_AUTH_AUDIENCE
+    """
+    issuer = os.environ.get("MCP_AUTH_ISSUER")
+    if not issuer:
+        return None, None
+    audience = os.environ.get("MCP_AUTH_AUDIENCE")
+    if not audience:
+        raise ValueError("MCP_AUTH_AUDIENCE must be set with MCP_AUTH_ISSUER (e.g. api://calculator-mcp), "
+                         "otherwise tokens the issuer signs for other apps would be accepted")
+    keys = JWKSCache(
+        os.environ.get("MCP_AUTH_JWKS_URL", issuer.rstrip("/") + "/.well-known/jwks.json"),
+        refresh_interval=float(os.environ.get("MCP_AUTH_JWKS_REFRESH", DEFAULT_JWKS_REFRESH)),
+    )
+    verifier = JWTVerifier(
+        keys,
+        issuer=issuer,
+        audience=audience,
+        cache_size=int(os.environ.get("MCP_AUTH_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+    )
+    settings = AuthSettings(
+        issuer_url=issuer,
+        resource_server_url=None,
+        required_scopes=os.environ.get("MCP_AUTH_REQUIRED_SCOPES", "").split() or None,
+    )
+    return settings, verifier
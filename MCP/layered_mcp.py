@@ -0,0 +1,389 @@
+"""
+Layered FastMCP
+===============
+
+A drop-in FastMCP subclass that wraps every tool and resource function in
+the server's standard layers when it is registered:
+
+    metrics  ->  call log  ->  result cache (opt-in)  ->  offload (opt-in)  ->  your function
+
+Before any of that, each tools/call and resources/read request must be
+admitted by the server's admission control (admission.py).
+
+So `@mcp.tool()` and `@mcp.resource(...)` in server.py stay exactly as in
+the workshop exercises, and every tool you add is logged (call_log.py) and
+shows up in /metrics (metrics.py) automatically.
+
+Opt-in layers are switched on with extra decorator arguments:
+
+    @mcp.tool(pure=True)          Same arguments -> same result: memoize (LRU)
+    @mcp.tool(cache_ttl=30)       Reuse results for 30 seconds (LRU + TTL)
+    @mcp.tool(cache_size=10_000)  Size of that tool's cache (default 1024)
+    @mcp.tool(executor="process") Run CPU-bound work in a process pool
+    @mcp.tool(executor="thread")  Run blocking I/O in a thread pool
+    @mcp.tool(max_concurrency=2)  At most 2 calls of this tool at once (others queue)
+    @mcp.tool(max_queue=8)        ...and at most 8 waiting; more are rejected
+    @mcp.tool(timeout=10)         Fail a call that takes longer than 10 seconds
+
+The decorators still return YOUR original function, so it can be called and
+tested directly without any of the layers.
+
+Folders of (large) files are served as paginated, memory-mapped resources
+with add_file_resources() (see file_resources.py).
+
+The server also advertises tools/list_changed, and notify_tools_changed()
+tells every session that has listed tools to list them again (used by the
+plugin hot reload in plugin_loader.py). A hash of all tool and resource
+definitions is advertised at initialize, so clients can cache schemas.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ResourceError
+from mcp.server.lowlevel import NotificationOptions
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.session import ServerSession
+from mcp.shared.exceptions import McpError
+from mcp.types import (
+    INVALID_PARAMS,
+    CallToolRequest,
+    ClientNotification,
+    ErrorData,
+    InitializedNotification,
+    ListResourcesRequest,
+    ListResourcesResult,
+    ListToolsRequest,
+    ReadResourceRequest,
+)
+from pydantic import AnyUrl
+from starlette.applications import Starlette
+
+from admission import AdmissionController
+from call_log import logged_call
+from file_resources import FileResources, decode_cursor, encode_cursor
+from metrics import instrument, metrics
+from offload import ExecutorKind, offloaded
+from result_cache import DEFAULT_CACHE_SIZE, ResultCache, cached
+from session_manager import EvictingSessionManager, require_session_internals
+
+# Experimental capability carrying schema_hash() in the initialize response
+SCHEMA_HASH_CAPABILITY = "schemaHash"
+
+
+class LayeredFastMCP(FastMCP):
+    """FastMCP that applies the standard layers to every tool and resource"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        require_session_internals()  # Before FastMCP rejects session_idle_timeout= on an old mcp
+        super().__init__(*args, **kwargs)
+        metrics.gauge_callback(
+            "mcp_active_sessions",
+            "Streamable HTTP sessions currently held by this process",
+            self.active_session_count,
+        )
+        self.admission = AdmissionController.from_env()
+        self.admission.register_metrics()
+        self._admit_requests()
+        self._background_tasks: list[Callable[[], Awaitable[None]]] = []
+        self._file_resources: list[tuple[FileResources, Callable]] = []
+        self._mcp_server.list_resources()(self._list_resources_page)
+        self._tool_listeners: weakref.WeakSet[ServerSession] = weakref.WeakSet()
+        self._track_tool_listeners()
+        self._advertise_capabilities()
+
+    def _admit_requests(self) -> None:
+        """Route tools/call and resources/read through admission control
+
+        This wraps the low-level request handlers (not the tool functions), so
+        a rejection is returned as a JSON-RPC error before any work is done.
+        """
+        handlers = self._mcp_server.request_handlers
+        call_tool = handlers[CallToolRequest]
+        read_resource = handlers[ReadResourceRequest]
+
+        async def admitted_call_tool(request: CallToolRequest):
+            async with self.admission.admit(request.params.name):
+                return await call_tool(request)
+
+        async def admitted_read_resource(request: ReadResourceRequest):
+            async with self.admission.admit():
+                return await read_resource(request)
+
+        handlers[CallToolRequest] = admitted_call_tool
+        handlers[ReadResourceRequest] = admitted_read_resource
+
+    def _track_tool_listeners(self) -> None:
+        """Remember which sessions have tool schemas (they get list_changed notifications)"""
+        handlers = self._mcp_server.request_handlers
+        list_tools = handlers[ListToolsRequest]
+
+        async def tracked_list_tools(request: ListToolsRequest | None):
+            try:
+                self._tool_listeners.add(self._mcp_server.request_context.session)
+            except LookupError:
+                pass  # internal refresh of the schema cache, not a client request
+            return await list_tools(request)
+
+        handlers[ListToolsRequest] = tracked_list_tools
+
+        # Clients that start from cached tool schemas (schema_cache.py) never
+        # list tools, so every session that finished initializing counts too
+        server = self._mcp_server
+        handle_message = server._handle_message
+
+        async def tracked_handle_message(message, session, *args, **kwargs):
+            if isinstance(message, ClientNotification) and isinstance(message.root, InitializedNotification):
+                self._tool_listeners.add(session)
+            return await handle_message(message, session, *args, **kwargs)
+
+        server._handle_message = tracked_handle_message
+
+    def _advertise_capabilities(self) -> None:
+        """Declare tools.listChanged and the current schema hash in every initialize response
+
+        The hash lets clients reuse tool schemas they cached earlier
+        (schema_cache.py) instead of listing tools on every start.
+        """
+        server = self._mcp_server
+        create_options = server.create_initialization_options
+
+        def create_initialization_options(notification_options=None, experimental_capabilities=None):
+            experimental = {SCHEMA_HASH_CAPABILITY: {"value": self.schema_hash()}, **(experimental_capabilities or {})}
+            return create_options(notification_options or NotificationOptions(tools_changed=True), experimental)
+
+        server.create_initialization_options = create_initialization_options
+
+    def schema_hash(self) -> str:
+        """Short hash of every tool, resource and resource template definition
+
+        Changes whenever a tool is added, removed or changes its schema.
+        """
+        definitions = {
+            "tools": [
+                [tool.name, tool.title, tool.description, tool.parameters, tool.output_schema,
+                 tool.annotations.model_dump() if tool.annotations else None]
+                for tool in self._tool_manager.list_tools()
+            ],
+            "resources": [[str(resource.uri), resource.name, resource.description, resource.mime_type]
+                          for resource in self._resource_manager.list_resources()],
+            "templates": [[template.uri_template, template.name, template.description, template.mime_type]
+                          for template in self._resource_manager.list_templates()]
+            + [files.uri_template for files, _ in self._file_resources],
+        }
+        encoded = json.dumps(definitions, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    async def notify_tools_changed(self, names: list[str] | None = None) -> int:
+        """Tell connected clients the tool list changed
+
+        Args:
+            names: Tools that were added, replaced or removed (None = all)
+
+        Returns:
+            Number of sessions notified
+        """
+        # The low-level server validates arguments against cached schemas
+        if names is None:
+            self._mcp_server._tool_cache.clear()
+        for name in names or []:
+            self._mcp_server._tool_cache.pop(name, None)
+
+        notified = 0
+        for session in list(self._tool_listeners):
+            try:
+                await session.send_tool_list_changed()
+                notified += 1
+            except Exception:
+                self._tool_listeners.discard(session)  # session already closed
+        return notified
+
+    def add_file_resources(self, files: FileResources) -> None:
+        """Serve a folder of files as paginated, memory-mapped resources (see file_resources.py)"""
+        # Pages are read in a thread: a cold page may have to come from disk
+        reader = self._layer("resource", files.uri_template, files.read_page, executor="thread")
+        self._file_resources.append((files, reader))
+
+    async def read_resource(self, uri: AnyUrl | str) -> Iterable[ReadResourceContents]:
+        """FastMCP's read_resource, plus one page of a file for file resource URIs"""
+        for files, reader in self._file_resources:
+            parsed = files.parse_uri(str(uri))
+            if parsed is not None:
+                try:
+                    content, mime_type, meta = await reader(*parsed)
+                except (OSError, ValueError) as exc:
+                    raise ResourceError(str(exc)) from exc
+                return [ReadResourceContents(content=content, mime_type=mime_type, meta=meta)]
+        return await super().read_resource(uri)
+
+    async def _list_resources_page(self, request: ListResourcesRequest) -> ListResourcesResult:
+        """resources/list with cursor pagination over the file resources"""
+        cursor = request.params.cursor if request.params else None
+        try:
+            index, start = decode_cursor(cursor, 2) if cursor else (0, 0)
+        except ValueError as exc:
+            raise McpError(ErrorData(code=INVALID_PARAMS, message=str(exc))) from None
+        # The server's own (few) resources come first, on the first page only
+        resources = [] if cursor else await self.list_resources()
+        while index < len(self._file_resources):
+            entries, next_start = self._file_resources[index][0].list_page(start)
+            resources += entries
+            if next_start is not None:
+                return ListResourcesResult(resources=resources, nextCursor=encode_cursor(index, next_start))
+            index, start = index + 1, 0
+        return ListResourcesResult(resources=resources)
+
+    def background_task(self, fn: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+        """Register a coroutine function to run for as long as the server is serving"""
+        self._background_tasks.append(fn)
+        return fn
+
+    def streamable_http_app(self) -> Starlette:
+        """FastMCP's app, with session limits and the registered background tasks"""
+        if self._session_manager is None:
+            # Same settings FastMCP would use, but evicting LRU sessions at the cap
+            self._session_manager = EvictingSessionManager(
+                app=self._mcp_server,
+                event_store=self._event_store,
+                retry_interval=self._retry_interval,
+                json_response=self.settings.json_response,
+                stateless=self.settings.stateless_http,
+                security_settings=self.settings.transport_security,
+                max_request_body_size=self.settings.max_request_body_size,
+                session_idle_timeout=self.settings.session_idle_timeout,
+                max_sessions=self.settings.max_sessions,
+            )
+        app = super().streamable_http_app()
+        session_lifespan = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette):
+            async with session_lifespan(app), self.running_background_tasks():
+                yield
+
+        app.router.lifespan_context = lifespan
+        return app
+
+    async def run_stdio_async(self) -> None:
+        """Serve one client over stdin/stdout, with the registered background tasks"""
+        async with self.running_background_tasks():
+            await super().run_stdio_async()
+
+    @asynccontextmanager
+    async def running_background_tasks(self) -> AsyncIterator[None]:
+        """Run the registered background tasks for the duration of the block"""
+        tasks = [asyncio.create_task(self._run_background(fn)) for fn in self._background_tasks]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _run_background(fn: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await fn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            print(f"❌ Background task {fn.__qualname__} stopped: {exc}", file=sys.stderr, flush=True)
+
+    def active_session_count(self) -> int:
+        """Number of live streamable HTTP sessions (always 0 when stateless)"""
+        if self._session_manager is None:
+            return 0
+        return len(getattr(self._session_manager, "_server_instances", {}))
+
+    def _layer(
+        self,
+        kind: str,
+        name: str,
+        fn: Callable,
+        pure: bool = False,
+        cache_ttl: float | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        executor: ExecutorKind | None = None,
+        timeout: float | None = None,
+    ) -> Callable:
+        """Wrap a tool/resource function in the standard layers (innermost first)"""
+        if executor is not None or timeout is not None:
+            fn = offloaded(kind, name, executor, timeout)(fn)
+        if pure or cache_ttl is not None:
+            cache = ResultCache(maxsize=cache_size, ttl=None if pure else cache_ttl)
+            fn = cached(kind, name, cache, self.get_context)(fn)
+        fn = logged_call(kind, name)(fn)
+        fn = instrument(kind, name)(fn)
+        return fn
+
+    def tool(
+        self,
+        name: str | None = None,
+        *,
+        pure: bool = False,
+        cache_ttl: float | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        executor: ExecutorKind | None = None,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Callable[[Callable], Callable]:
+        """Same as FastMCP.tool(), plus the opt-in layer options above"""
+        if callable(name):
+            raise TypeError("The @tool decorator was used incorrectly. Use @tool() instead of @tool")
+
+        def decorator(fn: Callable) -> Callable:
+            self.add_tool(fn, name=name, pure=pure, cache_ttl=cache_ttl, cache_size=cache_size,
+                          executor=executor, max_concurrency=max_concurrency, max_queue=max_queue,
+                          timeout=timeout, **kwargs)
+            return fn
+
+        return decorator
+
+    def add_tool(
+        self,
+        fn: Callable,
+        name: str | None = None,
+        *,
+        pure: bool = False,
+        cache_ttl: float | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        executor: ExecutorKind | None = None,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Register a tool with the standard layers"""
+        tool_name = name or fn.__name__
+        if max_concurrency:
+            self.admission.limit_tool(tool_name, max_concurrency, max_queue)
+        layered = self._layer("tool", tool_name, fn, pure, cache_ttl, cache_size, executor, timeout)
+        super().add_tool(layered, name=name, **kwargs)
+
+    def resource(
+        self,
+        uri: str,
+        *,
+        pure: bool = False,
+        cache_ttl: float | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        executor: ExecutorKind | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Callable[[Callable], Callable]:
+        """Same as FastMCP.resource(), with the standard layers applied"""
+        register = super().resource(uri, **kwargs)
+
+        def decorator(fn: Callable) -> Callable:
+            register(self._layer("resource", uri, fn, pure, cache_ttl, cache_size, executor, timeout))
+            return fn
+
+        return decorator
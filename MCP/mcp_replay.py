@@ -0,0 +1,333 @@
+"""
+MCP Record/Replay Proxy
+=======================
+
+Repeatable MCP performance tests without the real tool back ends. The proxy
+sits between a client (test_mcp.py, an agent's MCPStreamableHTTPTool, ...)
+and server.py.
+
+Record: forward everything to the server and write each JSON-RPC exchange
+(request, every response message, and when each arrived) to a file:
+
+    python mcp_replay.py record --upstream http://localhost:8080/mcp --file calls.jsonl.gz
+    python test_mcp.py --url http://localhost:8090/mcp
+
+Replay: no server needed. Requests are answered from the recording:
+
+    python mcp_replay.py replay --file calls.jsonl.gz --latency original
+    python mcp_replay.py replay --file calls.jsonl.gz --latency zero
+    python mcp_replay.py replay --file calls.jsonl.gz --latency 0.5
+
+    original  each message is sent as long after the request as it was recorded
+    zero      answers immediately: what is left is client and agent overhead
+    <factor>  recorded delays scaled by this factor
+
+Matching: a request gets the recorded answer for the same method and
+parameters; repeated requests take the recordings in turn. If the exact
+parameters were never recorded, a recording of the same method (and tool
+or resource) is used. Anything else gets a JSON-RPC "not recorded" error.
+Progress and log notifications sent during a call are replayed with it.
+
+File format: JSON lines (gzip if the name ends in .gz). The first line
+describes the recording; each further line is one exchange:
+
+    {"method": "tools/call", "params": {...}, "messages": [[0.0132, {...}], ...]}
+
+A .gz recording is written one gzip member per line, so it is a valid gzip
+file after every exchange and can be replayed while the recording goes on.
+
+Notifications the server sends outside any request (GET stream, e.g.
+tools/list_changed) are passed through when recording but not replayed.
+"""
+
+import argparse
+import asyncio
+import codecs
+import gzip
+import itertools
+import json
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+FORMAT_VERSION = 1
+# Request headers passed on to the server (the rest are hop-by-hop or httpx's own)
+FORWARDED_HEADERS = ("accept", "authorization", "content-type", "last-event-id",
+                     "mcp-protocol-version", "mcp-session-id")
+NOT_RECORDED = -32601
+
+
+def _say(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def _json_or_none(payload: str) -> Any:
+    """A decoded JSON payload, or None for one that is not JSON (it is not recorded)"""
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _match_key(method: str, params: dict | None) -> str:
+    params = {key: value for key, value in (params or {}).items() if key != "_meta"}
+    return method + " " + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def _method_key(method: str, params: dict | None) -> str:
+    target = (params or {}).get("name") or (params or {}).get("uri") or ""
+    return f"{method} {str(target).split('?')[0]}"
+
+
+def _sse_events(buffer: str) -> tuple[list[str], str]:
+    """Complete `data:` payloads in an SSE buffer, and the unfinished rest"""
+    *events, rest = buffer.replace("\r\n", "\n").split("\n\n")
+    payloads = []
+    for event in events:
+        data = [line[5:].lstrip() for line in event.split("\n") if line.startswith("data:")]
+        if data:
+            payloads.append("\n".join(data))
+    return payloads, rest
+
+
+# ============================================================================
+# RECORD
+# ============================================================================
+
+class RecordingProxy:
+    """Forward MCP traffic to `upstream` and write every exchange to `path`"""
+
+    def __init__(self, upstream: str, path: str):
+        self.upstream = upstream
+        self.path = path
+        self.exchanges = 0
+        self._file = open(path, "wb")
+        self._compress = path.endswith(".gz")
+        self._write_line({"format": FORMAT_VERSION, "upstream": upstream, "recorded_at": time.time()})
+        self._client = httpx.AsyncClient(timeout=httpx.Timeout(30, read=None))
+
+    def _write_line(self, record: dict) -> None:
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        # One gzip member per line: readers see every exchange written so far
+        self._file.write(gzip.compress(line) if self._compress else line)
+        self._file.flush()
+
+    def _write(self, request: dict, started: float, messages: list[tuple[float, Any]]) -> None:
+        exchange = {
+            "method": request["method"],
+            "params": request.get("params"),
+            "messages": [[round(offset - started, 6), message] for offset, message in messages],
+        }
+        self._write_line(exchange)
+        self.exchanges += 1
+
+    async def handle(self, request: Request) -> Response:
+        started = time.perf_counter()
+        body = await request.body()
+        headers = {name: value for name, value in request.headers.items() if name in FORWARDED_HEADERS}
+        upstream = await self._client.send(
+            self._client.build_request(request.method, self.upstream, headers=headers, content=body),
+            stream=True,
+        )
+        try:
+            message = json.loads(body) if body else None
+        except ValueError:
+            message = None
+        # Only single JSON-RPC requests are recorded (notifications have no id)
+        recorded = message if isinstance(message, dict) and "id" in message and "method" in message else None
+        response_headers = {name: value for name, value in upstream.headers.items()
+                            if name in ("content-type", "mcp-session-id")}
+
+        async def relay() -> AsyncIterator[bytes]:
+            messages: list[tuple[float, Any]] = []
+            buffer = ""
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            is_sse = upstream.headers.get("content-type", "").startswith("text/event-stream")
+            pending = recorded is not None
+            async for chunk in upstream.aiter_bytes():
+                if pending:
+                    buffer += decoder.decode(chunk)
+                    if is_sse:
+                        payloads, buffer = _sse_events(buffer)
+                        decoded = [_json_or_none(payload) for payload in payloads]
+                        messages += [(time.perf_counter(), item) for item in decoded if isinstance(item, dict)]
+                        # Clients hang up as soon as they have the response, so the
+                        # exchange is written before the response is passed on
+                        if any(message.get("id") == recorded["id"] for _, message in messages):
+                            self._write(recorded, started, messages)
+                            pending = False
+                yield chunk
+            response = _json_or_none(buffer) if pending and not is_sse else None
+            if isinstance(response, dict):
+                messages.append((time.perf_counter(), response))
+                self._write(recorded, started, messages)
+
+        return StreamingResponse(relay(), status_code=upstream.status_code, headers=response_headers,
+                                 background=BackgroundTask(upstream.aclose))
+
+    def app(self) -> Starlette:
+        @asynccontextmanager
+        async def lifespan(app: Starlette):
+            try:
+                yield
+            finally:
+                await self._client.aclose()
+                self._file.close()
+                _say(f"📼 {self.exchanges} exchanges written to {self.path}")
+
+        return Starlette(routes=[Route("/mcp", self.handle, methods=["GET", "POST", "DELETE"])], lifespan=lifespan)
+
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+class Recording:
+    """Recorded exchanges, looked up by method and parameters"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header: dict = {}
+        exact: dict[str, list[dict]] = defaultdict(list)
+        similar: dict[str, list[dict]] = defaultdict(list)
+        with _open(path, "r") as file:
+            self.header = json.loads(next(file))
+            if self.header.get("format") != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported recording format {self.header.get('format')}")
+            for line in file:
+                exchange = json.loads(line)
+                exact[_match_key(exchange["method"], exchange["params"])].append(exchange)
+                similar[_method_key(exchange["method"], exchange["params"])].append(exchange)
+        self.size = sum(len(exchanges) for exchanges in exact.values())
+        # Repeated requests take the recordings in turn
+        self._exact = {key: itertools.cycle(exchanges) for key, exchanges in exact.items()}
+        self._similar = {key: itertools.cycle(exchanges) for key, exchanges in similar.items()}
+
+    def find(self, method: str, params: dict | None) -> dict | None:
+        for index, key in ((self._exact, _match_key(method, params)), (self._similar, _method_key(method, params))):
+            if key in index:
+                return next(index[key])
+        return None
+
+
+class ReplayServer:
+    """Answer MCP requests from a Recording, with original, zero or scaled latency"""
+
+    def __init__(self, recording: Recording, latency_scale: float = 1.0):
+        self.recording = recording
+        self.latency_scale = latency_scale
+        self.replayed = 0
+        self.missed = 0
+
+    def _rewrite(self, message: dict, request: dict) -> dict:
+        """A recorded message with the new request's id and progress token"""
+        message = dict(message)
+        if "id" in message:
+            message["id"] = request["id"]
+        token = ((request.get("params") or {}).get("_meta") or {}).get("progressToken")
+        if message.get("method") == "notifications/progress" and token is not None:
+            message["params"] = {**message["params"], "progressToken": token}
+        return message
+
+    async def handle(self, request: Request) -> Response:
+        started = time.perf_counter()
+        if request.method == "GET":
+            return Response(status_code=405)  # no server-initiated stream in replay
+        if request.method == "DELETE":
+            return Response(status_code=200)
+        try:
+            message = json.loads(await request.body())
+        except ValueError:
+            return JSONResponse({"jsonrpc": "2.0", "id": None,
+                                 "error": {"code": -32700, "message": "Parse error"}}, status_code=400)
+        if not isinstance(message, dict) or "id" not in message:
+            return Response(status_code=202)  # notifications and responses need no answer
+
+        headers = {"mcp-session-id": request.headers.get("mcp-session-id") or uuid.uuid4().hex}
+        exchange = self.recording.find(message["method"], message.get("params"))
+        if exchange is None:
+            self.missed += 1
+            return JSONResponse({
+                "jsonrpc": "2.0",
+                "id": message["id"],
+                "error": {"code": NOT_RECORDED, "message": f"Not recorded: {message['method']}"},
+            }, headers=headers)
+        self.replayed += 1
+
+        async def events() -> AsyncIterator[bytes]:
+            for offset, recorded in exchange["messages"]:
+                delay = started + offset * self.latency_scale - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                data = json.dumps(self._rewrite(recorded, message), separators=(",", ":"))
+                yield f"event: message\ndata: {data}\n\n".encode()
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+    def app(self) -> Starlette:
+        @asynccontextmanager
+        async def lifespan(app: Starlette):
+            yield
+            _say(f"📼 Replayed {self.replayed} requests, {self.missed} not in the recording")
+
+        return Starlette(routes=[Route("/mcp", self.handle, methods=["GET", "POST", "DELETE"])], lifespan=lifespan)
+
+
+def parse_latency(value: str) -> float:
+    """Latency scale from --latency: original = 1, zero = 0, or a factor"""
+    named = {"original": 1.0, "zero": 0.0}
+    if value in named:
+        return named[value]
+    try:
+        scale = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("use original, zero or a number (e.g. 0.5)") from None
+    if scale < 0:
+        raise argparse.ArgumentTypeError("the latency factor must not be negative")
+    return scale
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record MCP traffic to a file, or replay it without the server")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--file", required=True, help="Recording (JSON lines; gzip if it ends in .gz)")
+    parser.add_argument("--upstream", default="http://localhost:8080/mcp", help="MCP server to record")
+    parser.add_argument("--latency", type=parse_latency, default=1.0,
+                        help="Replay timing: original, zero or a factor such as 0.5 (default: original)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8090, help="Port to listen on")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    if args.mode == "record":
+        proxy = RecordingProxy(args.upstream, args.file)
+        app = proxy.app()
+        print("📼 MCP Record Proxy")
+        print("=" * 60)
+        print(f"Upstream:  {args.upstream}")
+        print(f"Recording: {args.file}")
+    else:
+        recording = Recording(args.file)
+        app = ReplayServer(recording, args.latency).app()
+        print("📼 MCP Replay Server")
+        print("=" * 60)
+        print(f"Recording: {args.file} ({recording.size} exchanges from {recording.header.get('upstream')})")
+        print(f"Latency:   {args.latency:g}x recorded")
+    print(f"Endpoint:  http://{args.host}:{args.port}/mcp")
+    print("=" * 60)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
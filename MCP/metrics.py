@@ -0,0 +1,218 @@
+"""
+Server Metrics
+==============
+
+A small, dependency-free metrics registry that renders the Prometheus text
+exposition format. server.py serves it at /metrics next to /mcp.
+
+Every tool and resource is instrumented automatically (see layered_mcp.py):
+
+    mcp_calls_total{kind,name}              Calls started
+    mcp_call_errors_total{kind,name}        Calls that raised
+    mcp_calls_in_flight{kind,name}          Calls currently running
+    mcp_call_duration_seconds{kind,name}    Latency histogram
+
+Other components add their own counters and gauges through the same
+registry (e.g. active sessions), so everything is scraped from one place.
+
+Note: with --workers > 1 each worker process has its own registry, so each
+scrape reports the worker that happened to serve it.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable
+
+# Latency buckets (seconds) - from sub-millisecond math to multi-second tools
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str] | None) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class _Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def samples(self, name: str, labels: Labels) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', repr(bound)),))} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {self.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{_format_labels(labels)} {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms with Prometheus output"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._callbacks: dict[str, Callable[[], float | dict[Labels, float]]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str,
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Declare a metric family (kind: counter, gauge or histogram)"""
+        with self._lock:
+            self._help[name] = (kind, help_text)
+            if kind == "histogram":
+                self._histograms.setdefault(name, {})
+                self._buckets[name] = buckets
+            else:
+                self._values.setdefault(name, {})
+
+    def inc(self, name: str, labels: dict[str, str] | None = None, amount: float = 1.0) -> None:
+        """Increment a counter (or move a gauge up/down with a negative amount)"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        """Set a gauge to a value"""
+        with self._lock:
+            self._values.setdefault(name, {})[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        """Record one observation in a histogram"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets.get(name, DEFAULT_BUCKETS))
+            histogram.observe(value)
+
+    def gauge_callback(self, name: str, help_text: str,
+                       callback: Callable[[], float | dict[Labels, float]]) -> None:
+        """Register a gauge whose value is computed at scrape time
+
+        The callback returns either a single number, or a mapping of label
+        tuples (e.g. (("tool", "add"),)) to numbers.
+        """
+        with self._lock:
+            self._help[name] = ("gauge", help_text)
+            self._callbacks[name] = callback
+
+    def value(self, name: str, labels: dict[str, str] | None = None) -> float:
+        """Current value of a counter/gauge series (0 if never set)"""
+        with self._lock:
+            return self._values.get(name, {}).get(_labels(labels), 0.0)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines: list[str] = []
+        with self._lock:
+            values = {name: dict(series) for name, series in self._values.items()}
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            callbacks = dict(self._callbacks)
+            help_entries = dict(self._help)
+
+        for name, callback in callbacks.items():
+            try:
+                result = callback()
+            except Exception:
+                continue  # a broken gauge must never break the scrape
+            values[name] = result if isinstance(result, dict) else {(): float(result)}
+
+        for name in sorted(set(values) | set(histograms)):
+            kind, help_text = help_entries.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(values.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for labels, histogram in sorted(histograms.get(name, {}).items()):
+                lines.extend(histogram.samples(name, labels))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("mcp_calls_total", "counter", "Tool and resource calls started")
+metrics.describe("mcp_call_errors_total", "counter", "Tool and resource calls that raised an error")
+metrics.describe("mcp_calls_in_flight", "gauge", "Tool and resource calls currently running")
+metrics.describe("mcp_call_duration_seconds", "histogram", "Tool and resource call latency")
+
+
+def instrument(kind: str, name: str, registry: MetricsRegistry = metrics) -> Callable[[Callable], Callable]:
+    """Decorator that records call count, errors, in-flight and latency
+
+    Args:
+        kind: "tool" or "resource"
+        name: Tool name or resource URI template (used as the metric label)
+        registry: Registry to record into
+    """
+    labels = {"kind": kind, "name": name}
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                registry.inc("mcp_calls_total", labels)
+                registry.inc("mcp_calls_in_flight", labels)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    registry.inc("mcp_call_errors_total", labels)
+                    raise
+                finally:
+                    registry.observe("mcp_call_duration_seconds", time.perf_counter() - start, labels)
+                    registry.inc("mcp_calls_in_flight", labels, -1)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            registry.inc("mcp_calls_total", labels)
+            registry.inc("mcp_calls_in_flight", labels)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                registry.inc("mcp_call_errors_total", labels)
+                raise
+            finally:
+                registry.observe("mcp_call_duration_seconds", time.perf_counter() - start, labels)
+                registry.inc("mcp_calls_in_flight", labels, -1)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,132 @@
+"""
+Tool Offloading
+===============
+
+FastMCP runs plain (sync) tool functions inline on the event loop, so one
+slow tool stalls every other session on the server. This layer moves a
+tool's work off the event loop:
+
+    @mcp.tool(executor="process")   CPU-bound work -> shared ProcessPoolExecutor
+    @mcp.tool(executor="thread")    Blocking I/O   -> shared ThreadPoolExecutor
+
+Either can be combined with:
+
+    timeout=S           Give up on a call after S seconds (a sync tool with a
+                        timeout but no executor runs in the thread pool, so
+                        the timeout can fire while it works)
+
+Use max_concurrency=N (admission.py) to cap how many calls run at once.
+
+Notes:
+- Process-pool tools must be module-level functions with picklable
+  arguments and results, and cannot take a Context parameter.
+- A timed-out call returns an error to the client immediately, but work that
+  already started in a pool cannot be interrupted. Its admission slots are
+  released only when that work really finishes, so a stuck tool cannot
+  flood the pool.
+
+Pool sizes: MCP_PROCESS_WORKERS (default: CPU count), MCP_THREAD_WORKERS
+(default: Python's ThreadPoolExecutor default).
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Literal
+
+from mcp.server.fastmcp.utilities.context_injection import find_context_parameter
+
+from admission import current_ticket
+from metrics import metrics
+
+ExecutorKind = Literal["process", "thread"]
+
+metrics.describe("mcp_tool_timeouts_total", "counter", "Tool calls that exceeded their timeout")
+
+_pools: dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_executor(kind: ExecutorKind) -> Executor:
+    """Return the shared pool for `kind`, creating it on first use"""
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            if kind == "process":
+                workers = os.environ.get("MCP_PROCESS_WORKERS")
+                pool = ProcessPoolExecutor(max_workers=int(workers) if workers else None)
+            elif kind == "thread":
+                workers = os.environ.get("MCP_THREAD_WORKERS")
+                pool = ThreadPoolExecutor(max_workers=int(workers) if workers else None,
+                                          thread_name_prefix="mcp-tool")
+            else:
+                raise ValueError(f"Unknown executor '{kind}' (use 'process' or 'thread')")
+            _pools[kind] = pool
+        return pool
+
+
+def shutdown_executors() -> None:
+    """Shut down the shared pools (waits for running work)"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True, cancel_futures=True)
+        _pools.clear()
+
+
+def offloaded(
+    kind: str,
+    name: str,
+    executor: ExecutorKind | None = None,
+    timeout: float | None = None,
+) -> Callable[[Callable], Callable]:
+    """Decorator that runs a function in a pool and/or with a timeout
+
+    Args:
+        kind: "tool" or "resource" (metric label)
+        name: Tool name or resource URI template (metric label / errors)
+        executor: "process", "thread", or None to run on the event loop
+        timeout: Seconds before the call fails with a timeout error
+    """
+    labels = {"kind": kind, "name": name}
+
+    def decorator(fn: Callable) -> Callable:
+        if executor == "process" and find_context_parameter(fn) is not None:
+            raise ValueError(f"'{name}' takes a Context and cannot run in a process pool")
+        is_async = asyncio.iscoroutinefunction(fn)
+        if is_async and executor is not None:
+            raise ValueError(f"'{name}' is async; executor= is only for sync functions")
+        # Inline, a sync call would finish before wait_for could ever time it out
+        run_in = executor or ("thread" if timeout is not None and not is_async else None)
+
+        def start(args: tuple, kwargs: dict) -> asyncio.Future:
+            """Begin the work and return a future for its result"""
+            if is_async:
+                return asyncio.ensure_future(fn(*args, **kwargs))
+            if run_in is None:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(fn(*args, **kwargs))
+                return future
+            call = functools.partial(fn, *args, **kwargs)
+            work = asyncio.get_running_loop().run_in_executor(get_executor(run_in), call)
+            ticket = current_ticket.get()
+            if ticket is not None:
+                # Pool work cannot be interrupted: keep its admission slots until it ends
+                ticket.hold_until(work)
+            return work
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            work = start(args, kwargs)
+            try:
+                return await asyncio.wait_for(asyncio.shield(work), timeout)
+            except asyncio.TimeoutError:
+                metrics.inc("mcp_tool_timeouts_total", labels)
+                if is_async:
+                    work.cancel()
+                raise TimeoutError(f"'{name}' timed out after {timeout}s") from None
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,289 @@
+"""
+Tool Plugins with Hot Reload
+============================
+
+Tools can live in plugin modules instead of server.py. Each .py file in the
+plugins/ folder defines a register(mcp) function:
+
+    # plugins/percentage.py
+    def register(mcp):
+        @mcp.tool(pure=True)
+        def calculate_percentage(value: float, total: float) -> float:
+            ...
+
+While the server runs, the folder is polled for changes. A new, edited or
+deleted plugin is applied in place, without restarting the server:
+
+1. The module is loaded fresh and register() records its tools.
+2. The plugin's old tools are swapped for the new ones in one step, so a
+   call never finds a tool missing.
+3. Calls that were already running finish on the old code ("draining").
+   Nothing is cut off.
+4. Every connected session receives a tools/list_changed notification and
+   keeps its session. Clients just list tools again, with no reconnect.
+
+If a plugin fails to load, the previous version stays active.
+
+Configuration:
+    MCP_PLUGIN_DIR             Plugin folder (default: plugins/ next to server.py)
+    MCP_PLUGIN_POLL_INTERVAL   Seconds between checks (default 1, 0 = no hot reload)
+
+Note: plugin tools cannot use executor="process" (worker processes cannot
+import a plugin module by name); use executor="thread" instead.
+"""
+
+import asyncio
+import functools
+import importlib.util
+import inspect
+import os
+import sys
+import time
+from typing import Any, Callable
+
+from layered_mcp import LayeredFastMCP
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+def _say(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+class PluginRegistrar:
+    """Stand-in for `mcp` passed to register(): records tools instead of adding them"""
+
+    def __init__(self, plugin: str):
+        self.plugin = plugin
+        self.tools: list[tuple[Callable, str, dict[str, Any]]] = []
+
+    def tool(self, name: str | None = None, **kwargs: Any) -> Callable[[Callable], Callable]:
+        """Same arguments as mcp.tool()"""
+        if callable(name):
+            raise TypeError("The @tool decorator was used incorrectly. Use @tool() instead of @tool")
+
+        def decorator(fn: Callable) -> Callable:
+            self.add_tool(fn, name=name, **kwargs)
+            return fn
+
+        return decorator
+
+    def add_tool(self, fn: Callable, name: str | None = None, **kwargs: Any) -> None:
+        """Same arguments as mcp.add_tool()"""
+        if kwargs.get("executor") == "process":
+            raise ValueError(f"Plugin '{self.plugin}': executor='process' is not supported in plugins")
+        self.tools.append((fn, name or fn.__name__, kwargs))
+
+
+class PluginVersion:
+    """One loaded version of a plugin and the calls still running on it"""
+
+    def __init__(self, name: str, version: int, mtime: float, tools: list[str]):
+        self.name = name
+        self.version = version
+        self.mtime = mtime
+        self.tools = tools
+        self.in_flight = 0
+        self.loaded_at = time.time()
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    def track(self, fn: Callable) -> Callable:
+        """Wrap a registered tool function to count calls running on this version"""
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                self._enter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self._exit()
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self._enter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit()
+
+        return wrapper
+
+    def _enter(self) -> None:
+        self.in_flight += 1
+        self._drained.clear()
+
+    def _exit(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._drained.set()
+
+    async def drained(self) -> None:
+        """Wait until no call is running on this version"""
+        await self._drained.wait()
+
+
+class PluginManager:
+    """Loads tool plugins from a folder and hot-reloads them when files change"""
+
+    def __init__(self, mcp: LayeredFastMCP, directory: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.mcp = mcp
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.active: dict[str, PluginVersion] = {}
+        self.draining: list[PluginVersion] = []
+        self.errors: dict[str, str] = {}
+        self._loads = 0
+        self._seen: dict[str, float] = {}
+        self._drain_tasks: set[asyncio.Task] = set()
+
+    def _scan(self) -> dict[str, float]:
+        """Plugin name -> file modification time"""
+        if not os.path.isdir(self.directory):
+            return {}
+        found = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith(".py") and not filename.startswith("_"):
+                path = os.path.join(self.directory, filename)
+                found[filename[:-3]] = os.stat(path).st_mtime
+        return found
+
+    def _load_module(self, name: str) -> PluginRegistrar:
+        """Import a fresh copy of the plugin file and record what it registers"""
+        self._loads += 1
+        path = os.path.join(self.directory, f"{name}.py")
+        # A unique module name per load: old code keeps working for draining calls
+        spec = importlib.util.spec_from_file_location(f"mcp_plugins.{name}.load{self._loads}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, "register"):
+            raise AttributeError(f"{name}.py has no register(mcp) function")
+        registrar = PluginRegistrar(name)
+        module.register(registrar)
+        return registrar
+
+    def _swap(self, name: str, registrar: PluginRegistrar | None, mtime: float) -> list[str]:
+        """Replace a plugin's tools in one step (no await, so no call sees a gap)
+
+        Per-tool admission limits go and come with their tools, and are rolled
+        back with them if the new version fails to register.
+
+        Returns:
+            Names of the tools that were added, replaced or removed
+        """
+        tools = self.mcp._tool_manager._tools
+        limiters = self.mcp.admission.tool_limiters
+        old = self.active.get(name)
+        old_names = set(old.tools) if old else set()
+        new_names = [tool_name for _, tool_name, _ in registrar.tools] if registrar else []
+
+        taken = {tool_name for tool_name in new_names if tool_name in tools and tool_name not in old_names}
+        if taken:
+            raise ValueError(f"tool name(s) already used elsewhere: {', '.join(sorted(taken))}")
+
+        snapshot, limiter_snapshot = dict(tools), dict(limiters)
+        try:
+            for tool_name in old_names:
+                del tools[tool_name]
+                limiters.pop(tool_name, None)  # Calls already admitted keep their own reference
+            version = None
+            if registrar is not None:
+                version = PluginVersion(name, old.version + 1 if old else 1, mtime, new_names)
+                for fn, tool_name, kwargs in registrar.tools:
+                    self.mcp.add_tool(fn, name=tool_name, **kwargs)
+                    tools[tool_name].fn = version.track(tools[tool_name].fn)
+        except Exception:
+            tools.clear()
+            tools.update(snapshot)
+            limiters.clear()
+            limiters.update(limiter_snapshot)
+            raise
+
+        if version is not None:
+            self.active[name] = version
+        else:
+            self.active.pop(name, None)
+        if old is not None and old.in_flight:
+            self.draining.append(old)
+        return sorted(old_names | set(new_names))
+
+    def _apply(self, name: str, mtime: float | None) -> list[str]:
+        """Load (or unload, when mtime is None) one plugin; returns the changed tool names"""
+        try:
+            registrar = self._load_module(name) if mtime is not None else None
+            changed = self._swap(name, registrar, mtime or 0.0)
+        except Exception as exc:
+            self.errors[name] = f"{type(exc).__name__}: {exc}"
+            keeping = " (keeping the previous version)" if name in self.active else ""
+            _say(f"❌ Plugin '{name}' failed to load{keeping}: {self.errors[name]}")
+            return []
+        self.errors.pop(name, None)
+        if mtime is None:
+            _say(f"🔌 Plugin '{name}' unloaded")
+        else:
+            _say(f"🔌 Plugin '{name}' v{self.active[name].version} loaded: {', '.join(self.active[name].tools)}")
+        return changed
+
+    def load_all(self) -> None:
+        """Load every plugin in the folder (at startup, before serving)"""
+        self._seen = self._scan()
+        for name, mtime in self._seen.items():
+            self._apply(name, mtime)
+
+    async def reload_changed(self) -> list[str]:
+        """Apply added, edited and deleted plugin files and notify clients
+
+        Returns:
+            Names of the tools that changed
+        """
+        current = self._scan()
+        changed: list[str] = []
+        already_draining = len(self.draining)
+        for name in sorted(set(current) | set(self._seen)):
+            if current.get(name) != self._seen.get(name):
+                changed += self._apply(name, current.get(name))
+        self._seen = current
+
+        if changed:
+            notified = await self.mcp.notify_tools_changed(changed)
+            _say(f"🔄 Tool list changed ({', '.join(changed)}): notified {notified} session(s)")
+        for version in self.draining[already_draining:]:
+            task = asyncio.create_task(self._report_drained(version))
+            self._drain_tasks.add(task)
+            task.add_done_callback(self._drain_tasks.discard)
+        return changed
+
+    async def _report_drained(self, version: PluginVersion) -> None:
+        count = version.in_flight
+        _say(f"⏳ Plugin '{version.name}' v{version.version}: draining {count} in-flight call(s)")
+        await version.drained()
+        self.draining.remove(version)
+        _say(f"✅ Plugin '{version.name}' v{version.version} drained")
+
+    async def watch(self) -> None:
+        """Poll the plugin folder forever (run as a background task)"""
+        if self.poll_interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.reload_changed()
+            except Exception as exc:
+                _say(f"❌ Plugin reload failed: {exc}")
+
+    def status(self) -> dict:
+        """Loaded plugins, versions still draining, and load errors (for /plugins)"""
+        def describe(version: PluginVersion) -> dict:
+            return {"version": version.version, "tools": version.tools,
+                    "in_flight": version.in_flight, "loaded_at": version.loaded_at}
+
+        return {
+            "directory": self.directory,
+            "hot_reload": self.poll_interval > 0,
+            "plugins": {name: describe(version) for name, version in self.active.items()},
+            "draining": [{"plugin": version.name, **describe(version)} for version in self.draining],
+            "errors": self.errors,
+        }
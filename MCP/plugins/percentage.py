@@ -0,0 +1,46 @@
+"""
+Percentage Tools (plugin)
+=========================
+
+An example tool plugin. Edit this file while the server is running - the
+change is picked up within a second, connected agents are told to refresh
+their tool list, and no session is dropped (see plugin_loader.py).
+"""
+
+
+def register(mcp):
+    """Register this plugin's tools with the server"""
+
+    @mcp.tool(pure=True)
+    def calculate_percentage(value: float, total: float) -> float:
+        """Calculate what percentage `value` is of `total`
+
+        Example: calculate_percentage(45, 60) -> 75.0
+
+        Args:
+            value: The part
+            total: The whole (must not be zero)
+
+        Returns:
+            value as a percentage of total
+        """
+        if total == 0:
+            raise ValueError("total must not be zero")
+        return value / total * 100
+
+    @mcp.tool(pure=True)
+    def percentage_change(old: float, new: float) -> float:
+        """Calculate the percentage change from `old` to `new`
+
+        Example: percentage_change(80, 100) -> 25.0
+
+        Args:
+            old: The starting value (must not be zero)
+            new: The new value
+
+        Returns:
+            The change as a percentage of the starting value
+        """
+        if old == 0:
+            raise ValueError("old must not be zero")
+        return (new - old) / abs(old) * 100
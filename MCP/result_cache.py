@@ -0,0 +1,200 @@
+"""
+Result Cache
+============
+
+Memoization for pure/cacheable MCP tools and resources.
+
+Agents often repeat identical calls while re-planning. For a tool marked
+`@mcp.tool(pure=True)` (same arguments -> same result, no side effects) or
+`@mcp.tool(cache_ttl=60)` (result may be reused for 60 seconds) the result is
+kept in a bounded LRU cache keyed on the canonicalized arguments.
+
+- LRU + TTL: at most `maxsize` entries per tool; entries older than the TTL
+  are treated as misses (pure tools have no TTL)
+- Concurrent identical calls to an async tool share one execution; it keeps
+  running while any of them still waits, even if the first caller is cancelled
+- Hits, misses, bypasses and entry counts are exported in /metrics
+- A client can skip the cache for one call by sending request metadata
+  `{"cache": "bypass"}` (MCP `_meta`) - the result is computed fresh (not
+  shared with an identical call already running) and stored for later calls
+"""
+
+import asyncio
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from mcp.server.fastmcp import Context
+
+from metrics import metrics
+
+DEFAULT_CACHE_SIZE = 1024
+BYPASS_VALUES = ("bypass", "no-cache", False)
+
+metrics.describe("mcp_cache_hits_total", "counter", "Calls answered from the result cache")
+metrics.describe("mcp_cache_misses_total", "counter", "Cacheable calls that had to be computed")
+metrics.describe("mcp_cache_bypass_total", "counter", "Calls that opted out of the cache via _meta")
+
+_MISSING = object()
+_BYPASS = object()
+_caches: dict[tuple[str, str], "ResultCache"] = {}
+
+
+def canonical_key(arguments: dict[str, Any]) -> str:
+    """Stable cache key for a set of arguments (order-independent JSON)"""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+class ResultCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float | None = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or the module's _MISSING sentinel"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _Flight:
+    """One running execution of an async function and how many calls await it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+def _entries_gauge() -> dict:
+    return {(("kind", kind), ("name", name)): len(cache) for (kind, name), cache in _caches.items()}
+
+
+metrics.gauge_callback("mcp_cache_entries", "Entries currently held in result caches", _entries_gauge)
+
+
+def _bypass_requested(get_context: Callable[[], Context]) -> bool:
+    """True if the current MCP request asked to skip the cache via _meta"""
+    try:
+        meta = get_context().request_context.meta
+    except (LookupError, ValueError):
+        return False  # called directly, outside an MCP request
+    if meta is None:
+        return False
+    return (meta.model_extra or {}).get("cache", True) in BYPASS_VALUES
+
+
+def cached(kind: str, name: str, cache: ResultCache,
+           get_context: Callable[[], Context]) -> Callable[[Callable], Callable]:
+    """Decorator that memoizes a tool/resource function in `cache`
+
+    Args:
+        kind: "tool" or "resource" (metric label)
+        name: Tool name or resource URI template (metric label)
+        cache: The cache for this function
+        get_context: Returns the current FastMCP Context (to read _meta)
+    """
+    labels = {"kind": kind, "name": name}
+    _caches[(kind, name)] = cache
+
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        def key_for(args: tuple, kwargs: dict) -> str:
+            bound = signature.bind_partial(*args, **kwargs).arguments
+            return canonical_key({k: v for k, v in bound.items() if not isinstance(v, Context)})
+
+        def lookup(key: str) -> Any:
+            """The cached value, _MISSING on a miss, or _BYPASS if the request skips the cache"""
+            if _bypass_requested(get_context):
+                metrics.inc("mcp_cache_bypass_total", labels)
+                return _BYPASS
+            value = cache.get(key)
+            metrics.inc("mcp_cache_misses_total" if value is _MISSING else "mcp_cache_hits_total", labels)
+            return value
+
+        if inspect.iscoroutinefunction(fn):
+            in_flight: dict[str, _Flight] = {}
+
+            def settle(key: str, flight: _Flight, task: asyncio.Task) -> None:
+                if in_flight.get(key) is flight:
+                    del in_flight[key]
+                if not task.cancelled() and task.exception() is None:
+                    cache.put(key, task.result())
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                key = key_for(args, kwargs)
+                value = lookup(key)
+                if value is _BYPASS:
+                    # Fresh on request: neither joins nor serves a call already running
+                    value = await fn(*args, **kwargs)
+                    cache.put(key, value)
+                    return value
+                if value is not _MISSING:
+                    return value
+                # Single flight: identical concurrent calls await one shared task,
+                # which outlives any one caller's cancellation
+                flight = in_flight.get(key)
+                if flight is None:
+                    flight = in_flight[key] = _Flight(asyncio.ensure_future(fn(*args, **kwargs)))
+                    flight.task.add_done_callback(functools.partial(settle, key, flight))
+                flight.waiters += 1
+                try:
+                    return await asyncio.shield(flight.task)
+                finally:
+                    flight.waiters -= 1
+                    if flight.waiters == 0 and not flight.task.done():
+                        flight.task.cancel()  # Every caller has gone
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = key_for(args, kwargs)
+            value = lookup(key)
+            if value is not _MISSING and value is not _BYPASS:
+                return value
+            value = fn(*args, **kwargs)
+            cache.put(key, value)
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def clear_caches() -> None:
+    """Drop every cached result (e.g. after reloading tool code)"""
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,195 @@
+"""
+Tool Schema Cache (client side)
+===============================
+
+Before an agent's first turn, every MCP tool it uses normally connects,
+initializes and lists the server's tools. With several servers, that
+discovery adds up on every start. This module keeps the schemas on disk:
+
+    first run    initialize -> tools/list -> schemas saved to the cache
+    next runs    initialize -> same schema hash? -> tools built from the cache
+                                                    (no tools/list at all)
+
+Entries are keyed by server (URL, or command line for stdio) and tagged
+with the schema hash the server advertises at initialize (layered_mcp.py).
+When the hash differs, the tools are listed again and the cache updated.
+For servers that do not advertise a hash, the agent starts from the cache
+and checks the server in the background.
+
+While connected, a tools/list_changed notification (e.g. a plugin was
+hot-reloaded) re-lists the tools in the background and updates both the
+agent's tools and the cache.
+
+    from schema_cache import CachedMCPStreamableHTTPTool
+
+    mcp_tool = CachedMCPStreamableHTTPTool(name="Calculator", url="http://localhost:8080/mcp")
+
+Configuration:
+    MCP_SCHEMA_CACHE   Cache file (default: ~/.cache/mcp-workshop/schemas.json)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+from typing import Any
+
+from agent_framework import AIFunction, MCPStdioTool, MCPStreamableHTTPTool
+from agent_framework._mcp import _get_input_model_from_mcp_tool, _normalize_mcp_name
+from mcp import ClientSession
+from mcp.types import ResourceTemplate, ServerNotification, Tool
+
+# Experimental capability the server advertises its schema hash in (see layered_mcp.py)
+SCHEMA_HASH_CAPABILITY = "schemaHash"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "mcp-workshop", "schemas.json")
+
+
+def _say(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def advertised_hash(session: ClientSession) -> str | None:
+    """Schema hash from the server's initialize response (None if not advertised)"""
+    capabilities = session.get_server_capabilities()
+    experimental = (capabilities.experimental or {}) if capabilities else {}
+    return experimental.get(SCHEMA_HASH_CAPABILITY, {}).get("value")
+
+
+async def fetch_schemas(session: ClientSession) -> tuple[list[Tool], list[ResourceTemplate]]:
+    """All tools and resource templates of the server (following pagination)"""
+    tools: list[Tool] = []
+    cursor = None
+    while True:
+        page = await session.list_tools(cursor=cursor) if cursor else await session.list_tools()
+        tools += page.tools
+        cursor = page.nextCursor
+        if not cursor:
+            break
+    templates: list[ResourceTemplate] = []
+    capabilities = session.get_server_capabilities()
+    if capabilities and capabilities.resources:
+        templates = (await session.list_resource_templates()).resourceTemplates
+    return tools, templates
+
+
+class SchemaCache:
+    """JSON file of tool/resource-template schemas per server"""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.environ.get("MCP_SCHEMA_CACHE", DEFAULT_CACHE_PATH)
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}  # missing or damaged cache: start empty
+
+    def get(self, server: str) -> dict[str, Any] | None:
+        """Cached entry for `server`: {"hash", "tools", "resource_templates", "saved_at"}"""
+        return self._load().get(server)
+
+    def put(self, server: str, schema_hash: str | None, tools: list[Tool],
+            resource_templates: list[ResourceTemplate]) -> None:
+        """Save the schemas of `server` (written atomically, so readers never see half a file)"""
+        entries = self._load()
+        entries[server] = {
+            "hash": schema_hash,
+            "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+            "resource_templates": [template.model_dump(mode="json", by_alias=True, exclude_none=True)
+                                   for template in resource_templates],
+            "saved_at": time.time(),
+        }
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as file:
+            json.dump(entries, file)
+        os.replace(file.name, self.path)
+
+
+class SchemaCachingMixin:
+    """Adds the schema cache to an Agent Framework MCP tool class (see the classes below)"""
+
+    def __init__(self, *args: Any, schema_cache: SchemaCache | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.schema_cache = schema_cache or SchemaCache()
+        self.schemas_from = None  # "cache" or "server", for the last load
+        self._tool_names: set[str] = set()
+        self._revalidation: asyncio.Task | None = None
+
+    @property
+    def cache_key(self) -> str:
+        url = getattr(self, "url", None)
+        return url if url else " ".join([self.command, *self.args])
+
+    async def load_tools(self) -> None:
+        """Tools from the cache when the server's schema hash matches, else from the server"""
+        entry = self.schema_cache.get(self.cache_key)
+        server_hash = advertised_hash(self.session)
+        if entry is not None and (server_hash is None or entry["hash"] == server_hash):
+            self._replace_tools([Tool.model_validate(tool) for tool in entry["tools"]])
+            self.schemas_from = "cache"
+            if server_hash is None:
+                self._revalidate_in_background()  # no hash: cannot tell if the cache is current
+            return
+        await self._refresh(server_hash)
+
+    async def _refresh(self, schema_hash: str | None) -> None:
+        tools, templates = await fetch_schemas(self.session)
+        self._replace_tools(tools)
+        self.schemas_from = "server"
+        self.schema_cache.put(self.cache_key, schema_hash, tools, templates)
+
+    def _revalidate_in_background(self) -> None:
+        if self._revalidation is not None and not self._revalidation.done():
+            return
+
+        async def revalidate() -> None:
+            try:
+                # The hash from initialize describes the old tools; the next start lists again
+                await self._refresh(None)
+            except Exception as exc:
+                _say(f"❌ Could not refresh tool schemas from {self.cache_key}: {exc}")
+
+        self._revalidation = asyncio.create_task(revalidate())
+
+    def _replace_tools(self, tools: list[Tool]) -> None:
+        """Swap this tool's functions for `tools` (prompts are left alone)"""
+        functions = []
+        for tool in tools:
+            local_name = _normalize_mcp_name(tool.name)
+            functions.append(AIFunction(
+                func=partial(self.call_tool, tool.name),
+                name=local_name,
+                description=tool.description or "",
+                approval_mode=self._determine_approval_mode(local_name),
+                input_model=_get_input_model_from_mcp_tool(tool),
+            ))
+        self._functions = [function for function in self._functions if function.name not in self._tool_names]
+        self._functions += functions
+        self._tool_names = {function.name for function in functions}
+
+    async def message_handler(self, message: Any) -> None:
+        # Listing tools from inside the message handler would wait on the very
+        # loop that delivers the answer, so list_changed re-lists in a task
+        if isinstance(message, ServerNotification) and message.root.method == "notifications/tools/list_changed":
+            self._revalidate_in_background()
+            return
+        await super().message_handler(message)
+
+    async def close(self) -> None:
+        if self._revalidation is not None:
+            self._revalidation.cancel()
+        await super().close()
+
+
+class CachedMCPStreamableHTTPTool(SchemaCachingMixin, MCPStreamableHTTPTool):
+    """MCPStreamableHTTPTool that starts from cached tool schemas"""
+
+
+class CachedMCPStdioTool(SchemaCachingMixin, MCPStdioTool):
+    """MCPStdioTool that starts from cached tool schemas"""
@@ -10,24 +10,67 @@ Workshop: Add your own tools by following the pattern below!
 """
 
 # server.py
-from mcp.server.fastmcp import FastMCP
+import argparse
+import asyncio
+import math
+import os
+import sys
+from typing import Literal
+
+import numpy as np
 import uvicorn
 
+from mcp.server.fastmcp import Context
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from admission import current_ticket
+from call_log import call_log
+from expression_eval import ExpressionError, compile_expression
+from file_resources import DEFAULT_LIST_PAGE_SIZE, DEFAULT_PAGE_SIZE, FileResources
+from jwt_auth import auth_from_env
+from layered_mcp import LayeredFastMCP
+from metrics import metrics
+from offload import get_executor
+from plugin_loader import DEFAULT_POLL_INTERVAL, PluginManager
+from session_manager import DEFAULT_MAX_SESSIONS, DEFAULT_SESSION_IDLE_TIMEOUT
+from tool_stream import ToolStream
+
+# Bearer-token (JWT) authentication for /mcp - off unless MCP_AUTH_ISSUER is
+# set (see jwt_auth.py; dev_issuer.py is a local stand-in issuer)
+auth_settings, token_verifier = auth_from_env()
+
 # Create an MCP server
 # This server will be accessible at http://localhost:8080/mcp
-mcp = FastMCP(
+# LayeredFastMCP is FastMCP plus automatic logging and metrics for every
+# @mcp.tool() / @mcp.resource() (see layered_mcp.py)
+mcp = LayeredFastMCP(
     name="Calculator",
     host="0.0.0.0",  # Listen on all network interfaces (localhost for dev)
     port=8080,  # Port number - must match what clients connect to
+    # Stateless mode keeps no per-session state in the process, so ANY worker
+    # process can serve ANY request. Set automatically by --workers > 1.
+    stateless_http=os.environ.get("MCP_STATELESS_HTTP", "").lower() in ("1", "true"),
+    # Abandoned sessions are closed after this many idle seconds, and at the
+    # session cap the least recently used one makes room (see session_manager.py)
+    session_idle_timeout=float(os.environ.get("MCP_SESSION_IDLE_TIMEOUT", DEFAULT_SESSION_IDLE_TIMEOUT)),
+    max_sessions=int(os.environ.get("MCP_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+    auth=auth_settings,
+    token_verifier=token_verifier,
 )
+if token_verifier is not None:
+    mcp.background_task(token_verifier.keys.watch)
 
 
 # ============================================================================
 # TOOLS - Add your custom tools below using the @mcp.tool() decorator
+# `pure=True` marks a tool whose result depends only on its arguments, so
+# repeated identical calls are answered from a cache (see result_cache.py).
+# Use `cache_ttl=<seconds>` instead for results that may go stale.
 # ============================================================================
 
 # Tool 1: Addition
-@mcp.tool()
+@mcp.tool(pure=True)
 def add(a: int, b: int) -> int:
     """Add two numbers
     
@@ -38,16 +81,10 @@ def add(a: int, b: int) -> int:
     Returns:
         The sum of a and b
     """
-    print('-'*50)
-    print(f"Add tool being used for sum of:")
-    print(a)
-    print('+')
-    print(b)
-    print('-'*50)
     return a + b
 
 # Tool 2: Subtraction
-@mcp.tool()
+@mcp.tool(pure=True)
 def subtract(a: int, b: int) -> int:
     """Subtract two numbers
     
@@ -58,17 +95,263 @@ def subtract(a: int, b: int) -> int:
     Returns:
         The difference (a - b)
     """
-    print('-'*50)
-    print(f"Subtract tool being used for difference of:")
-    print(a)
-    print('-')
-    print(b)
-    print('-'*50)
     return a - b
 
 # ============================================================================
 # Additional Tool "Multiplication" can be added here. 
+# (Or put it in a plugin file in plugins/ - picked up without a restart)
+# ============================================================================
+
+# ============================================================================
+# BATCH TOOLS - One call operates on whole arrays of numbers
+# Every tool call is a full JSON-RPC round trip (and often a full LLM turn),
+# so an agent summing a column of 500 numbers should make ONE call, not 500.
+# The work is vectorized with NumPy.
+# ============================================================================
+
+def _as_array(values: list[float], name: str) -> np.ndarray:
+    """Convert a JSON number list into a float64 NumPy array, rejecting empties"""
+    if not values:
+        raise ValueError(f"'{name}' must contain at least one number")
+    return np.asarray(values, dtype=np.float64)
+
+
+def _broadcast_pair(a: list[float], b: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """Validate two operand arrays for an element-wise operation
+
+    Arrays must have the same length, or one of them may hold a single
+    number which is then applied to every element of the other.
+    """
+    x = _as_array(a, "a")
+    y = _as_array(b, "b")
+    if x.size != y.size and 1 not in (x.size, y.size):
+        raise ValueError(
+            f"'a' and 'b' must have the same length (got {x.size} and {y.size}), "
+            "or one of them must contain a single number"
+        )
+    return x, y
+
+
+def _finite(result: np.ndarray, operation: str) -> np.ndarray:
+    """Reject results that overflowed a float64 (inf) or are undefined (nan)
+
+    JSON has no inf or nan, so they would reach the client as null and fail
+    the tool's output schema.
+    """
+    if not np.all(np.isfinite(result)):
+        raise ValueError(f"The {operation} is not a finite number (beyond the float range of about ±1.8e308)")
+    return result
+
+
+# Tool 3: Element-wise addition
+@mcp.tool(pure=True)
+def batch_add(a: list[float], b: list[float]) -> list[float]:
+    """Add two lists of numbers element by element in a single call
+
+    Use this instead of calling 'add' repeatedly. If one list holds a single
+    number, it is added to every element of the other list.
+
+    Args:
+        a: First list of numbers
+        b: Second list of numbers (same length as a, or a single number)
+
+    Returns:
+        A list where each element is a[i] + b[i]
+    """
+    x, y = _broadcast_pair(a, b)
+    return _finite(np.add(x, y), "sum").tolist()
+
+# Tool 4: Element-wise subtraction
+@mcp.tool(pure=True)
+def batch_subtract(a: list[float], b: list[float]) -> list[float]:
+    """Subtract two lists of numbers element by element in a single call
+
+    Use this instead of calling 'subtract' repeatedly. If one list holds a
+    single number, it is applied to every element of the other list.
+
+    Args:
+        a: List of numbers to subtract from
+        b: List of numbers to subtract (same length as a, or a single number)
+
+    Returns:
+        A list where each element is a[i] - b[i]
+    """
+    x, y = _broadcast_pair(a, b)
+    return _finite(np.subtract(x, y), "difference").tolist()
+
+# Tool 5: Reduce a list to a single number
+_REDUCERS = {
+    "sum": np.sum,
+    "mean": np.mean,
+    "min": np.min,
+    "max": np.max,
+    "product": np.prod,
+}
+
+@mcp.tool(pure=True)
+def batch_reduce(
+    values: list[float],
+    operation: Literal["sum", "mean", "min", "max", "product"] = "sum",
+) -> float:
+    """Reduce a list of numbers to a single number in one call
+
+    Use this to total a column of numbers instead of chaining 'add' calls.
+
+    Args:
+        values: The numbers to reduce
+        operation: One of sum, mean, min, max or product (default: sum)
+
+    Returns:
+        The reduced value
+    """
+    x = _as_array(values, "values")
+    return float(_finite(_REDUCERS[operation](x), operation))
+
 # ============================================================================
+# EXPRESSION TOOL - A whole multi-step calculation in one call
+# Instead of one add/subtract call (and one LLM turn) per operation, the agent
+# sends the full formula. It is compiled once (see expression_eval.py) and can
+# be evaluated against many sets of variable values in the same call.
+# ============================================================================
+
+# Tool 6: Evaluate an arithmetic expression
+@mcp.tool(pure=True)
+def evaluate(
+    expression: str,
+    variables: list[dict[str, float]] | None = None,
+) -> list[float]:
+    """Evaluate an arithmetic expression, optionally for many sets of variables
+
+    Supports + - * / // % **, parentheses, the constants pi and e, and the
+    functions abs, round, min, max, sqrt, exp, log, log10, floor, ceil, sin,
+    cos and tan. Use this for multi-step math instead of chaining add/subtract.
+
+    Example: expression="price * qty - discount",
+             variables=[{"price": 9.5, "qty": 3, "discount": 2}, {"price": 4, "qty": 10, "discount": 0}]
+
+    Args:
+        expression: The arithmetic expression to evaluate
+        variables: List of variable bindings; the expression is evaluated once
+            per binding. Omit when the expression has no variables.
+
+    Returns:
+        One result per binding (a single result when no variables are given)
+    """
+    compiled = compile_expression(expression)
+    results = []
+    for binding in variables or [{}]:
+        value = compiled.evaluate(binding)
+        try:
+            result = float(value)
+        except (OverflowError, TypeError) as exc:
+            # e.g. 9**999 is a valid integer, but too large for a float
+            raise ExpressionError(f"Result of '{expression}' is not a finite number: {exc}") from exc
+        if not math.isfinite(result):
+            # e.g. 1e308 * 10 overflows to inf, which JSON and the output schema cannot carry
+            raise ExpressionError(f"Result of '{expression}' is not a finite number: {result}")
+        results.append(result)
+    return results
+
+# ============================================================================
+# CPU-HEAVY TOOLS - Offloaded to a process pool (see offload.py)
+# A plain sync tool runs on the server's event loop, so a few seconds of
+# number crunching would freeze every other session. executor="process" runs
+# it in a worker process instead; max_concurrency (admission.py) and timeout
+# keep a burst of heavy calls from hogging all the cores.
+# ============================================================================
+
+MAX_FACTOR_INPUT = 10**15
+PRIME_FACTORS_TIMEOUT = 10
+
+# Tool 7: Prime factorization
+@mcp.tool(pure=True, executor="process", max_concurrency=2, timeout=PRIME_FACTORS_TIMEOUT)
+def prime_factors(n: int) -> list[int]:
+    """Return the prime factors of a whole number, smallest first
+
+    Example: prime_factors(360) -> [2, 2, 2, 3, 3, 5]
+
+    Args:
+        n: Whole number between 2 and 10**15
+
+    Returns:
+        The prime factors, with repeats
+    """
+    if not 2 <= n <= MAX_FACTOR_INPUT:
+        raise ValueError(f"n must be between 2 and {MAX_FACTOR_INPUT}")
+    factors = []
+    while n % 2 == 0:
+        factors.append(2)
+        n //= 2
+    divisor = 3
+    while divisor * divisor <= n:
+        while n % divisor == 0:
+            factors.append(divisor)
+            n //= divisor
+        divisor += 2
+    if n > 1:
+        factors.append(n)
+    return factors
+
+# ============================================================================
+# STREAMING TOOLS - Show progress and partial results while working
+# A ToolStream (see tool_stream.py) sends progress notifications and partial
+# result chunks over the same HTTP response, so the client sees the first
+# answers right away instead of waiting for the slowest one.
+# ============================================================================
+
+MAX_FACTORIZE_BATCH = 100
+
+# Tool 8: Factorize many numbers, streaming each answer as it is ready
+@mcp.tool()
+async def factorize_many(numbers: list[int], ctx: Context) -> dict[str, list[int]]:
+    """Prime-factorize a list of whole numbers, reporting each one as soon as it is done
+
+    Example: factorize_many([12, 97]) -> {"12": [2, 2, 3], "97": [97]}
+
+    Args:
+        numbers: Up to 100 whole numbers between 2 and 10**15
+
+    Returns:
+        Mapping of each number (as text) to its prime factors
+    """
+    if len(numbers) > MAX_FACTORIZE_BATCH:
+        raise ValueError(f"At most {MAX_FACTORIZE_BATCH} numbers per call")
+    unique = list(dict.fromkeys(numbers))
+    stream = ToolStream(ctx, total=len(unique))
+    pool = get_executor("process")
+    loop = asyncio.get_running_loop()
+    # Each number counts against prime_factors' own limit and timeout, so a
+    # batch cannot take more of the pool than the same calls made one by one
+    limiter = mcp.admission.tool_limiters["prime_factors"]
+    ticket = current_ticket.get()
+    queue_entry = asyncio.Lock()  # One number of the batch waits in the tool queue at a time
+
+    async def factorize(n: int) -> tuple[int, list[int]]:
+        async with queue_entry:
+            await limiter.acquire()
+        work = loop.run_in_executor(pool, prime_factors, n)
+        # Pool work cannot be interrupted: keep the slots until it ends
+        work.add_done_callback(lambda _: limiter.release())
+        if ticket is not None:
+            ticket.hold_until(work)
+        try:
+            return n, await asyncio.wait_for(asyncio.shield(work), PRIME_FACTORS_TIMEOUT)
+        except asyncio.TimeoutError:
+            metrics.inc("mcp_tool_timeouts_total", {"kind": "tool", "name": "prime_factors"})
+            raise TimeoutError(f"Factorizing {n} timed out after {PRIME_FACTORS_TIMEOUT}s") from None
+
+    tasks = [asyncio.ensure_future(factorize(n)) for n in unique]
+    results: dict[int, list[int]] = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            n, factors = await next_done
+            results[n] = factors
+            await stream.partial({"number": n, "factors": factors})
+            await stream.progress(len(results), f"Factorized {n}")
+    finally:
+        for task in tasks:
+            task.cancel()
+    return {str(n): results[n] for n in numbers}
 
 # ============================================================================
 # RESOURCES - Dynamic content accessible via URI patterns
@@ -76,7 +359,7 @@ def subtract(a: int, b: int) -> int:
 # performing actions. Agents can request resources by URI.
 # ============================================================================
 
-@mcp.resource("greeting://{name}")
+@mcp.resource("greeting://{name}", pure=True)
 def get_greeting(name: str) -> str:
     """Get a personalized greeting
     
@@ -88,33 +371,170 @@ def get_greeting(name: str) -> str:
     Returns:
         A personalized greeting message
     """
-    print('-'*50)
-    print(f"Greeting resource being used for:")
-    print(name)
-    print('-'*50)
     return f"Hello, {name}!"
 
 
+# Every file in data/ (datasheets, order exports, ...) is a resource too:
+# data://<file name>, read one page at a time from a memory-mapped file, so
+# a multi-GB export costs no more server memory than a small one.
+# See file_resources.py for the page cursors.
+data_files = FileResources(
+    os.environ.get("MCP_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")),
+    page_size=int(os.environ.get("MCP_RESOURCE_PAGE_SIZE", DEFAULT_PAGE_SIZE)),
+    list_page_size=int(os.environ.get("MCP_RESOURCE_LIST_PAGE_SIZE", DEFAULT_LIST_PAGE_SIZE)),
+)
+mcp.add_file_resources(data_files)
+
+
+# ============================================================================
+# PLUGINS - Tools loaded from the plugins/ folder and hot-reloaded
+# Edit, add or delete a plugin file while the server runs: the tools are
+# swapped in place, running calls finish on the old code, and connected
+# agents get a tools/list_changed notification instead of a dropped session.
+# ============================================================================
+
+plugins = PluginManager(
+    mcp,
+    os.environ.get("MCP_PLUGIN_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")),
+    poll_interval=float(os.environ.get("MCP_PLUGIN_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)),
+)
+plugins.load_all()
+mcp.background_task(plugins.watch)
+
+# ============================================================================
+# OBSERVABILITY - Served next to the /mcp endpoint
+# Every tool/resource above is automatically logged (call_log.py) and
+# measured (metrics.py) - no extra decorators needed.
+# ============================================================================
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint: call counts, errors, in-flight, latency, sessions"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.custom_route("/calls/recent", methods=["GET"])
+async def recent_calls(request: Request) -> JSONResponse:
+    """Return the most recent tool/resource calls (ring buffer, newest last)"""
+    limit = int(request.query_params.get("limit", "50"))
+    return JSONResponse(call_log.recent_calls(limit))
+
+
+@mcp.custom_route("/ready", methods=["GET"])
+async def readiness(request: Request) -> JSONResponse:
+    """Readiness probe: 503 while the admission queue is full (see admission.py)"""
+    snapshot = mcp.admission.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@mcp.custom_route("/sessions", methods=["GET"])
+async def session_report(request: Request) -> JSONResponse:
+    """Open sessions (most idle first) with approximate memory per session"""
+    limit = int(request.query_params.get("limit", "50"))
+    sizes = request.query_params.get("sizes", "1") != "0"
+    return JSONResponse(mcp.session_manager.report(limit, sizes))
+
+
+@mcp.custom_route("/plugins", methods=["GET"])
+async def plugin_status(request: Request) -> JSONResponse:
+    """Loaded plugin versions, versions still draining, and load errors"""
+    return JSONResponse(plugins.status())
+
+
 # ============================================================================
 # SERVER STARTUP
 # ============================================================================
 
 if __name__ == "__main__":
     """Main entry point - starts the MCP server"""
+    parser = argparse.ArgumentParser(description="Calculator MCP server (streamable HTTP or stdio)")
+    parser.add_argument(
+        "--transport", choices=["http", "stdio"], default="http",
+        help="http: streamable HTTP on --host/--port; stdio: one client over stdin/stdout",
+    )
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("MCP_WORKERS", "1")),
+        help="Number of worker processes (>1 implies --stateless)",
+    )
+    parser.add_argument(
+        "--stateless", action="store_true",
+        help="Stateless streamable HTTP: no Mcp-Session-Id state kept in the server",
+    )
+    args = parser.parse_args()
+
+    if args.transport == "stdio":
+        # stdout carries the MCP messages, so everything else goes to stderr.
+        # The agent starts this process itself (agent_framework.MCPStdioTool).
+        call_log.stream = sys.stderr
+        print(f"🚀 Calculator MCP server on stdio ({len(mcp._tool_manager.list_tools())} tools)",
+              file=sys.stderr, flush=True)
+        mcp.run("stdio")
+        sys.exit(0)
+
+    # Worker processes re-import this module, so the mode is passed through the
+    # environment (inherited by the workers) rather than through argv.
+    stateless = args.stateless or args.workers > 1
+    if stateless:
+        os.environ["MCP_STATELESS_HTTP"] = "1"
+        mcp.settings.stateless_http = True
+
     print("="*60)
     print("🚀 Starting MCP Server")
     print("="*60)
-    print("Transport: HTTP Streamable")
-    print("Endpoint: http://0.0.0.0:8080/mcp") 
+    print("Transport: HTTP Streamable" + (" (stateless)" if stateless else ""))
+    print(f"Endpoint: http://{args.host}:{args.port}/mcp")
+    print(f"Workers: {args.workers}")
+    if token_verifier is not None:
+        print(f"Auth: bearer JWT from {token_verifier.issuer} for {token_verifier.audience}")
+    else:
+        print("Auth: none (set MCP_AUTH_ISSUER to require bearer tokens)")
     print("\nAvailable Tools:")
     print("  - add(a, b): Add two numbers")
     print("  - subtract(a, b): Subtract two numbers")
     print("  - multiply(a, b): Multiply two numbers")
+    print("  - batch_add(a[], b[]): Element-wise addition of two lists")
+    print("  - batch_subtract(a[], b[]): Element-wise subtraction of two lists")
+    print("  - batch_reduce(values[], operation): sum/mean/min/max/product of a list")
+    print("  - evaluate(expression, variables[]): Evaluate a formula for many inputs")
+    print("  - prime_factors(n): Prime factorization (runs in a process pool)")
+    print("  - factorize_many(numbers[]): Factorize many numbers, streaming results")
+    for version in plugins.active.values():
+        print(f"  - {', '.join(version.tools)}: from plugin '{version.name}'")
     print("\nAvailable Resources:")
     print("  - greeting://{name}: Get personalized greeting")
+    print(f"  - data://{{file}}: {len(data_files.names())} file(s) in {data_files.directory}, "
+          f"paged {data_files.page_size:,} bytes at a time")
+    print(f"\nMetrics: http://{args.host}:{args.port}/metrics" +
+          (" (per worker)" if args.workers > 1 else ""))
+    print(f"Recent calls: http://{args.host}:{args.port}/calls/recent" +
+          (" (per worker)" if args.workers > 1 else ""))
+    if not stateless:
+        print(f"Sessions: http://{args.host}:{args.port}/sessions "
+              f"(max {mcp.settings.max_sessions}, idle timeout {mcp.settings.session_idle_timeout:g}s)")
+    print(f"Plugins: http://{args.host}:{args.port}/plugins" +
+          (" (hot reload on)" if plugins.poll_interval > 0 else ""))
+    limits = mcp.admission.global_limiter
+    print(f"Readiness: http://{args.host}:{args.port}/ready "
+          f"(max {limits.max_concurrent or 'unlimited'} concurrent calls, {limits.max_queue} queued"
+          + (" per worker)" if args.workers > 1 else ")"))
     print("="*60)
     print("\n⚡ Server is running... (Press CTRL+C to stop)\n")
-    
-    # Get the streamable HTTP ASGI app from FastMCP and run it
-    app = mcp.streamable_http_app
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+
+    if args.workers > 1:
+        # Multi-process mode: uvicorn needs an import string so each worker can
+        # build its own app. Stateless sessions mean requests carrying any
+        # Mcp-Session-Id (or none) can land on any worker.
+        uvicorn.run(
+            "server:mcp.streamable_http_app",
+            factory=True,
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+        )
+    else:
+        # Get the streamable HTTP ASGI app from FastMCP and run it
+        app = mcp.streamable_http_app
+        uvicorn.run(app, host=args.host, port=args.port)
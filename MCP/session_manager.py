@@ -0,0 +1,245 @@
+"""
+Session Limits
+==============
+
+Every stateful streamable HTTP session holds memory in the server (its
+transport, message streams and the MCP session task) until it ends. Agents
+that crash or never close their client leave sessions behind, so the server
+bounds them in two ways:
+
+    Idle timeout   A session with no request in flight (and no open GET
+                   stream) for MCP_SESSION_IDLE_TIMEOUT seconds is closed.
+                   Default 1800 (30 minutes).
+    Session cap    At most MCP_MAX_SESSIONS sessions (default 10000). When a
+                   new client connects at the cap, the least recently used
+                   session that is not serving a request is closed to make
+                   room. Only when every session is busy is the new client
+                   refused (503).
+
+A closed session's ID answers 404, and MCP clients respond by initializing
+a new session.
+
+The eviction hooks into private parts of mcp's StreamableHTTPSessionManager
+(mcp 1.30 or newer, see requirements.txt); require_session_internals()
+checks they are there before the server is built.
+
+/sessions lists the open sessions (idle time, requests in flight, and an
+approximate size in bytes), and /metrics has session counts, evictions and
+the process's resident memory (RSS).
+"""
+
+import asyncio
+import gc
+import inspect
+import os
+import sys
+import time
+import types
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any
+
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.types import Receive, Scope, Send
+
+from metrics import metrics
+
+DEFAULT_SESSION_IDLE_TIMEOUT = 30 * 60
+DEFAULT_MAX_SESSIONS = 10_000
+MIN_MCP_VERSION = "1.30"
+
+# What EvictingSessionManager overrides or uses of StreamableHTTPSessionManager
+_REQUIRED_METHODS = ("_handle_stateful_request", "_admit_session", "_discard_session")
+_REQUIRED_PARAMETERS = ("session_idle_timeout", "max_sessions")
+_REQUIRED_ATTRIBUTES = ("_session_owners",)
+
+metrics.describe("mcp_sessions_opened_total", "counter", "Streamable HTTP sessions opened")
+metrics.describe("mcp_sessions_closed_total", "counter",
+                 "Streamable HTTP sessions closed (reason: closed, idle, evicted)")
+
+
+def _unsupported_mcp(missing: list[str]) -> RuntimeError:
+    try:
+        installed = version("mcp")
+    except PackageNotFoundError:
+        installed = "unknown"
+    return RuntimeError(
+        f"The installed mcp package ({installed}) lacks the session manager internals this "
+        f"server relies on ({', '.join(missing)}). Install mcp>={MIN_MCP_VERSION},<2: "
+        "pip install -r requirements.txt"
+    )
+
+
+def require_session_internals() -> None:
+    """Fail with a clear error if mcp's StreamableHTTPSessionManager is too old
+
+    Raises:
+        RuntimeError: when a method or parameter EvictingSessionManager needs is missing
+    """
+    parameters = inspect.signature(StreamableHTTPSessionManager.__init__).parameters
+    missing = [name for name in _REQUIRED_METHODS if not hasattr(StreamableHTTPSessionManager, name)]
+    missing += [name for name in _REQUIRED_PARAMETERS if name not in parameters]
+    if missing:
+        raise _unsupported_mcp(missing)
+
+
+def resident_memory_bytes() -> int:
+    """Resident set size of this process (0 if unavailable)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # peak, not current
+    except (ImportError, OSError):
+        return 0
+
+
+metrics.gauge_callback("process_resident_memory_bytes", "Resident memory of the server process",
+                       resident_memory_bytes)
+
+# Objects that many sessions share - a size walk stops here
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, types.CodeType, types.FrameType)
+
+
+def approximate_size(root: Any, stop: set[int], limit: int = 20_000) -> int:
+    """Rough memory held by `root`: sum of sys.getsizeof over objects reachable from it
+
+    The walk does not enter shared objects (classes, modules, functions,
+    anything in `stop`), and gives up after `limit` objects.
+    """
+    seen = set(stop)
+    pending = [root]
+    total = 0
+    while pending and len(seen) - len(stop) < limit:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        pending.extend(gc.get_referents(obj))
+    return total
+
+
+class SessionInfo:
+    """Bookkeeping for one open session"""
+
+    __slots__ = ("opened_at", "last_seen", "active_posts")
+
+    def __init__(self):
+        self.opened_at = self.last_seen = time.monotonic()
+        self.active_posts = 0
+
+
+class EvictingSessionManager(StreamableHTTPSessionManager):
+    """Session manager that closes the least recently used session at the cap"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        require_session_internals()
+        super().__init__(*args, **kwargs)
+        missing = [name for name in _REQUIRED_ATTRIBUTES if not hasattr(self, name)]
+        if missing:
+            raise _unsupported_mcp(missing)
+        self._sessions: OrderedDict[str, SessionInfo] = OrderedDict()  # least recently used first
+        self._closing: dict[str, str] = {}  # session id -> reason, while it is being closed
+        self._evictions: set[asyncio.Task] = set()
+        metrics.gauge_callback("mcp_sessions_limit", "Maximum open sessions (0 = unlimited)",
+                               lambda: self.max_sessions or 0)
+
+    async def _handle_stateful_request(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session_id = None
+        for key, value in scope.get("headers", []):
+            if key.decode("latin-1").lower() == MCP_SESSION_ID_HEADER:
+                session_id = value.decode("latin-1")
+                break
+
+        info = self._sessions.get(session_id) if session_id is not None else None
+        if info is None:
+            await super()._handle_stateful_request(scope, receive, send)  # new session, or 404
+            return
+        info.last_seen = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        # GET is the long-lived notification stream - only POSTs make a session busy
+        busy = scope.get("method") == "POST"
+        info.active_posts += busy
+        try:
+            await super()._handle_stateful_request(scope, receive, send)
+        finally:
+            info.active_posts -= busy
+            info.last_seen = time.monotonic()
+
+    def _evict_one(self) -> None:
+        """Close the least recently used session that is not busy
+
+        Runs under the session creation lock, so the slot is freed right here
+        (before any await) and concurrent new clients cannot take it twice.
+        The transport itself is terminated in the background.
+        """
+        for session_id, info in self._sessions.items():
+            transport = self._server_instances.get(session_id)
+            if transport is not None and not info.active_posts and session_id not in self._closing:
+                self._closing[session_id] = "evicted"
+                self._server_instances.pop(session_id)
+                self._session_owners.pop(session_id, None)
+                task = asyncio.create_task(self._discard_session(session_id, transport))
+                self._evictions.add(task)
+                task.add_done_callback(self._evictions.discard)
+                return
+
+    def _admit_session(self, requestor):
+        if self.max_sessions is not None and len(self._server_instances) >= self.max_sessions:
+            self._evict_one()
+        transport = super()._admit_session(requestor)
+        if transport is not None:
+            self._sessions[transport.mcp_session_id] = SessionInfo()
+            metrics.inc("mcp_sessions_opened_total")
+        return transport
+
+    async def _discard_session(self, session_id: str, transport) -> None:
+        if self._sessions.pop(session_id, None) is not None:
+            reason = self._closing.get(session_id)
+            if reason is None:
+                idle = transport.idle_scope is not None and transport.idle_scope.cancel_called
+                reason = "idle" if idle else "closed"
+            metrics.inc("mcp_sessions_closed_total", {"reason": reason})
+        try:
+            await super()._discard_session(session_id, transport)
+        finally:
+            self._closing.pop(session_id, None)
+
+    def report(self, limit: int = 50, sizes: bool = True) -> dict:
+        """Open sessions, most idle first, for /sessions
+
+        Args:
+            limit: Maximum sessions to list
+            sizes: Also estimate each listed session's memory (slower)
+        """
+        now = time.monotonic()
+        stop = {id(self), id(self.app), id(self._sessions), id(self._server_instances)}
+        listed = []
+        for session_id, info in list(self._sessions.items())[:limit]:
+            transport = self._server_instances.get(session_id)
+            if transport is None:
+                continue
+            entry = {
+                "session_id": session_id,
+                "age_seconds": round(now - info.opened_at, 1),
+                "idle_seconds": round(now - info.last_seen, 1),
+                "requests_in_flight": info.active_posts,
+                "open_streams": len(transport._request_streams),
+            }
+            if sizes:
+                entry["approx_bytes"] = approximate_size(transport, stop)
+            listed.append(entry)
+        return {
+            "open_sessions": len(self._server_instances),
+            "max_sessions": self.max_sessions,
+            "idle_timeout_seconds": self.session_idle_timeout,
+            "resident_memory_bytes": resident_memory_bytes(),
+            "sessions": listed,
+        }
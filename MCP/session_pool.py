@@ -0,0 +1,305 @@
+"""
+Shared MCP Session Pool (client side)
+=====================================
+
+Each MCPStreamableHTTPTool opens its own MCP session and HTTP connection.
+When one process hosts many agents (ChatAgents per user, per workflow step,
+...), 50 agents mean 50 sessions on the server, each initialized separately
+and held open. This module shares one session per server instead:
+
+    agent 1 ─┐
+    agent 2 ─┼─ PooledMCPTool ─> MCPSessionPool ─> one ClientSession ─> server
+    agent N ─┘                    (per URL + auth)
+
+- Keyed by server URL and auth headers: agents with different tokens never
+  share a session.
+- Keep-alive: the pool pings each session every MCP_POOL_KEEPALIVE seconds,
+  so idle sessions are not closed by the server's idle timeout and a dead
+  server is noticed before an agent needs it.
+- Reconnection: when a ping or a call fails, the session is replaced,
+  retrying with exponential backoff (1s, 2s, 4s, ... up to
+  MCP_POOL_MAX_BACKOFF). Calls made meanwhile wait for the new session.
+  Failed calls are not retried: tools may not be safe to run twice.
+- A session is closed MCP_POOL_LINGER seconds after its last agent lets go.
+
+Usage:
+
+    from session_pool import PooledMCPTool
+
+    mcp_tool = PooledMCPTool(name="Calculator", url="http://localhost:8080/mcp")
+
+Notifications (e.g. tools/list_changed) reach every agent on the session.
+Sampling requests from the server are not supported on shared sessions.
+
+Configuration:
+    MCP_POOL_KEEPALIVE     Seconds between health-check pings (default 30)
+    MCP_POOL_MAX_BACKOFF   Longest wait between reconnect attempts (default 30)
+    MCP_POOL_LINGER        Seconds an unused session stays open (default 60)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Any
+
+from agent_framework._mcp import MCPTool  # base of MCPStreamableHTTPTool (not re-exported)
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED, LoggingMessageNotificationParams, ServerNotification
+
+DEFAULT_KEEPALIVE = 30.0
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_LINGER = 60.0
+PING_TIMEOUT = 10.0
+# McpError codes that mean the session, not the request, has a problem
+# (408 is what ClientSession raises when the server does not answer in time)
+SESSION_ERROR_CODES = {CONNECTION_CLOSED, 408}
+
+
+def _say(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+class PooledSession:
+    """One shared, self-healing MCP session to a server"""
+
+    def __init__(self, pool: "MCPSessionPool", url: str, headers: dict[str, str] | None):
+        self.pool = pool
+        self.url = url
+        self.headers = headers
+        self.session: ClientSession | None = None
+        self.users = 0
+        self.reconnects = 0
+        self.connected_at: float | None = None
+        self.last_error: str | None = None
+        self._listeners: set[MCPTool] = set()
+        self._ready = asyncio.Event()
+        self._check_now = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self._linger: asyncio.Task | None = None
+        self._dispatches: set[asyncio.Task] = set()
+
+    async def get(self, timeout: float | None = None) -> ClientSession:
+        """The current session, waiting while it (re)connects
+
+        Raises:
+            asyncio.TimeoutError: If no session is up within `timeout` seconds
+        """
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+        async def wait() -> ClientSession:
+            while self.session is None:
+                await self._ready.wait()
+            return self.session
+
+        return await asyncio.wait_for(wait(), timeout)
+
+    def report_failure(self) -> None:
+        """A call on this session failed: check its health now instead of at the next ping"""
+        self._check_now.set()
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                async with streamablehttp_client(self.url, headers=self.headers) as (read, write, _):
+                    async with ClientSession(read, write, message_handler=self._dispatch,
+                                             logging_callback=self._log) as session:
+                        await asyncio.wait_for(session.initialize(), PING_TIMEOUT)
+                        self.session, self.connected_at, self.last_error = session, time.time(), None
+                        self._ready.set()
+                        backoff = 1.0
+                        await self._keep_alive(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = str(exc) or type(exc).__name__
+            finally:
+                self._ready.clear()
+                self.session = None
+            # Connection lost or refused: try again, waiting longer each time
+            self.reconnects += 1
+            _say(f"🔄 MCP session to {self.url} lost ({self.last_error}), reconnecting in {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.pool.max_backoff)
+
+    async def _keep_alive(self, session: ClientSession) -> None:
+        """Ping until the session fails (returns by raising)"""
+        while True:
+            try:
+                await asyncio.wait_for(self._check_now.wait(), self.pool.keepalive)
+            except asyncio.TimeoutError:
+                pass
+            self._check_now.clear()
+            await asyncio.wait_for(session.send_ping(), PING_TIMEOUT)
+
+    async def _dispatch(self, message: Any) -> None:
+        # Handlers may call the server (e.g. list tools on list_changed); run
+        # them as tasks so they do not block the loop that delivers the reply
+        if isinstance(message, ServerNotification):
+            for tool in list(self._listeners):
+                task = asyncio.create_task(tool.message_handler(message))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _log(self, params: LoggingMessageNotificationParams) -> None:
+        # Log messages are per session, not per agent: handle them once
+        listener = next(iter(self._listeners), None)
+        if listener is not None:
+            await listener.logging_callback(params)
+
+    def attach(self, tool: MCPTool) -> None:
+        self.users += 1
+        self._listeners.add(tool)
+        if self._linger is not None:
+            self._linger.cancel()
+            self._linger = None
+
+    def detach(self, tool: MCPTool) -> None:
+        self._listeners.discard(tool)
+        self.users -= 1
+        if self.users == 0:
+            self._linger = asyncio.create_task(self._close_later())
+
+    async def _close_later(self) -> None:
+        await asyncio.sleep(self.pool.linger)
+        await self.pool._discard(self)
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+        self._runner = None
+
+
+class MCPSessionPool:
+    """Process-wide MCP sessions, one per server URL and auth headers"""
+
+    def __init__(self, keepalive: float | None = None, max_backoff: float | None = None,
+                 linger: float | None = None):
+        self.keepalive = keepalive or float(os.environ.get("MCP_POOL_KEEPALIVE", DEFAULT_KEEPALIVE))
+        self.max_backoff = max_backoff or float(os.environ.get("MCP_POOL_MAX_BACKOFF", DEFAULT_MAX_BACKOFF))
+        self.linger = linger if linger is not None else float(os.environ.get("MCP_POOL_LINGER", DEFAULT_LINGER))
+        self._sessions: dict[tuple, PooledSession] = {}
+
+    def session_for(self, url: str, headers: dict[str, str] | None = None) -> PooledSession:
+        """The shared session for `url` with these headers (created on first use)"""
+        key = (url, tuple(sorted((headers or {}).items())))
+        pooled = self._sessions.get(key)
+        if pooled is None:
+            pooled = self._sessions[key] = PooledSession(self, url, headers)
+        return pooled
+
+    async def _discard(self, pooled: PooledSession) -> None:
+        for key, candidate in list(self._sessions.items()):
+            if candidate is pooled:
+                del self._sessions[key]
+        await pooled.close()
+
+    async def close(self) -> None:
+        """Close every pooled session (e.g. at process shutdown)"""
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for pooled in sessions:
+            await pooled.close()
+
+    def stats(self) -> list[dict[str, Any]]:
+        """One row per pooled session: URL, agents using it, health"""
+        return [
+            {
+                "url": pooled.url,
+                "users": pooled.users,
+                "connected": pooled.session is not None,
+                "connected_at": pooled.connected_at,
+                "reconnects": pooled.reconnects,
+                "last_error": pooled.last_error,
+            }
+            for pooled in self._sessions.values()
+        ]
+
+
+# The shared pool for this process
+session_pool = MCPSessionPool()
+
+
+class PooledMCPTool(MCPTool):
+    """Agent Framework MCP tool that uses a shared session from the pool"""
+
+    def __init__(self, name: str, url: str, headers: dict[str, str] | None = None,
+                 pool: MCPSessionPool | None = None, connect_timeout: float = 30.0, **kwargs: Any):
+        super().__init__(name=name, **kwargs)
+        self.url = url
+        self.headers = headers
+        self.pool = pool or session_pool
+        self.connect_timeout = connect_timeout
+        self._pooled: PooledSession | None = None
+        self._tool_names: set[str] = set()
+
+    def get_mcp_client(self):
+        """A private, unpooled transport to the same server and headers
+
+        connect() never uses it (the session comes from the pool); it is
+        there for code that needs a connection of its own, as with
+        MCPStreamableHTTPTool.
+        """
+        return streamablehttp_client(self.url, headers=self.headers)
+
+    async def connect(self) -> None:
+        if self._pooled is None:
+            self._pooled = self.pool.session_for(self.url, self.headers)
+            self._pooled.attach(self)
+        # Sessions in the pool are already initialized, so the base class
+        # only loads tools and prompts here
+        self.session = await self._pooled.get(self.connect_timeout)
+        await super().connect()
+
+    async def load_tools(self) -> None:
+        # Reloads (after list_changed) replace the tools instead of adding duplicates
+        self._functions = [function for function in self._functions if function.name not in self._tool_names]
+        before = {function.name for function in self._functions}
+        await super().load_tools()
+        self._tool_names = {function.name for function in self._functions} - before
+
+    async def _current_session(self) -> None:
+        if self._pooled is not None:
+            self.session = await self._pooled.get(self.connect_timeout)
+
+    async def call_tool(self, tool_name: str, **kwargs: Any) -> Any:
+        await self._current_session()
+        try:
+            return await super().call_tool(tool_name, **kwargs)
+        except Exception as exc:
+            if self._pooled is not None and not _is_tool_error(exc):
+                self._pooled.report_failure()
+            raise
+
+    async def get_prompt(self, prompt_name: str, **kwargs: Any) -> Any:
+        await self._current_session()
+        return await super().get_prompt(prompt_name, **kwargs)
+
+    async def message_handler(self, message: Any) -> None:
+        if isinstance(message, Exception):
+            return  # transport errors are handled by the pool (reconnect)
+        await super().message_handler(message)
+
+    async def close(self) -> None:
+        if self._pooled is not None:
+            self._pooled.detach(self)
+            self._pooled = None
+        self.session = None
+        self.is_connected = False
+
+
+def _is_tool_error(exc: Exception) -> bool:
+    """True if the server answered with an MCP error (the session itself is fine)
+
+    A closed connection or an unanswered request also surfaces as an McpError,
+    but those are session failures.
+    """
+    inner = getattr(exc, "inner_exception", None) or exc.__cause__  # Agent Framework raises `from` the McpError
+    return isinstance(inner, McpError) and inner.error.code not in SESSION_ERROR_CODES
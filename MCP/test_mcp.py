@@ -4,24 +4,52 @@ Simple MCP Client to Test Server Locally
 This script connects to the MCP server running locally and:
 1. Lists available tools
 2. Tests the 'add' and 'subtract' functions
+3. Reads the greeting resource
+4. Calls a streaming tool and prints progress and partial results as they arrive
+5. Sends a batch of independent tool calls at once (fan_out.py)
 
 Usage:
 1. Start the MCP server: python server.py
-2. In another terminal, run: python test_mcp_client.py
+2. In another terminal, run: python test_mcp.py
+   (add --token <jwt> if the server requires bearer tokens, see jwt_auth.py)
+
+Benchmark mode (size a server before a rollout):
+    python test_mcp.py --bench --sessions 20 --calls 200
+    python test_mcp.py --bench --mode open --rate 500 --mix add=6,read_resource=2,list_tools=1
+    python test_mcp.py --bench --json results.json
+
+    --sessions  Concurrent ClientSessions
+    --calls     Calls per session
+    --mix       Weighted call mix (operation=weight,...)
+    --mode      closed: each session sends its next call when the last returns
+                open:   calls are sent at --rate per second regardless of
+                        completion; latency counts from the scheduled start
 """
 
+import argparse
 import asyncio
 import json
+import os
+import random
+import time
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.types import LoggingMessageNotificationParams
+
+from fan_out import call_tools
+
+# Logger name the server uses for partial-result chunks (see tool_stream.py)
+PARTIAL_RESULT_LOGGER = "partial_result"
 
 
-async def test_mcp_server():
+def _auth_headers(token: str | None) -> dict[str, str] | None:
+    """Authorization header for servers that require a bearer token (see jwt_auth.py)"""
+    return {"Authorization": f"Bearer {token}"} if token else None
+
+
+async def test_mcp_server(server_url: str = "http://localhost:8080/mcp", token: str | None = None):
     """Test the MCP server running locally"""
     
-    # Server endpoint
-    server_url = "http://localhost:8080/mcp"
-    
     print("=" * 60)
     print("MCP Server Test Client")
     print("=" * 60)
@@ -35,9 +63,19 @@ async def test_mcp_server():
         print("🔌 Initializing MCP session...")
         print("-" * 60)
         
-        streams_ctx = streamablehttp_client(server_url)
+        streams_ctx = streamablehttp_client(server_url, headers=_auth_headers(token))
         streams = await streams_ctx.__aenter__()
-        session_ctx = ClientSession(streams[0], streams[1])
+        stream_started = time.perf_counter()
+
+        async def on_log_message(params: LoggingMessageNotificationParams) -> None:
+            # Partial results from streaming tools arrive as log notifications
+            elapsed = time.perf_counter() - stream_started
+            if params.logger == PARTIAL_RESULT_LOGGER:
+                print(f"   📦 +{elapsed:.2f}s partial result: {json.dumps(params.data)}")
+            else:
+                print(f"   📝 [{params.level}] {params.data}")
+
+        session_ctx = ClientSession(streams[0], streams[1], logging_callback=on_log_message)
         session = await session_ctx.__aenter__()
         await session.initialize()
         
@@ -147,6 +185,56 @@ async def test_mcp_server():
             print(f"ℹ️  Greeting resource not available or error occurred: {e}")
             print("   (This is expected if the greeting resource is not defined in the server)")
 
+        # Test 6: Streaming tool - progress and partial results before the final answer
+        print("\n" + "=" * 60)
+        print("📡 Testing streaming tool 'factorize_many'...")
+        print("-" * 60)
+
+        try:
+            async def on_progress(progress: float, total: float | None, message: str | None) -> None:
+                elapsed = time.perf_counter() - stream_started
+                print(f"   ⏳ +{elapsed:.2f}s progress {progress:g}/{total:g} {message or ''}" if total
+                      else f"   ⏳ +{elapsed:.2f}s progress {progress:g} {message or ''}")
+
+            # The small numbers finish (and are shown) long before the large prime
+            numbers = [360, 97, 1234567890, 600851475143, 999999999999989]
+            stream_started = time.perf_counter()
+            result = await session.call_tool(
+                "factorize_many", {"numbers": numbers}, progress_callback=on_progress
+            )
+            elapsed = time.perf_counter() - stream_started
+            if result.isError:
+                print(f"⚠️  Tool error: {result.content[0].text if result.content else result}")
+            else:
+                print(f"✅ +{elapsed:.2f}s final result: {json.dumps(result.structuredContent)}")
+        except Exception as e:
+            print(f"ℹ️  Streaming tool not available or error occurred: {e}")
+
+        # Test 7: Independent calls sent together - results in request order, errors per call
+        print("\n" + "=" * 60)
+        print("🔀 Testing concurrent fan-out of independent tool calls...")
+        print("-" * 60)
+
+        calls = [
+            ("prime_factors", {"n": random.randint(10**14, 10**15)}),
+            ("add", {"a": 5, "b": 3}),
+            ("evaluate", {"expression": "2 **"}),  # invalid on purpose: a tool error
+            ("batch_reduce", {"values": [1e308, 1e308]}),  # overflows a float: a tool error, not null
+            ("prime_factors", {"n": random.randint(10**14, 10**15)}),
+            ("no_such_tool", {}),  # unknown tool: fails without affecting the others
+        ]
+        fan_out_started = time.perf_counter()
+        results = await call_tools(session, calls)
+        elapsed = time.perf_counter() - fan_out_started
+        for (name, arguments), result in zip(calls, results):
+            if isinstance(result, Exception):
+                print(f"   ❌ {name}: {result}")
+            else:
+                text = (json.dumps(result.structuredContent) if result.structuredContent
+                        else result.content[0].text if result.content else result)
+                print(f"   {'⚠️ ' if result.isError else '✅'} {name}({json.dumps(arguments)}): {text}")
+        print(f"✅ {len(calls)} calls in {elapsed:.2f}s (sent together, see fan_out.py)")
+
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -167,5 +255,186 @@ async def test_mcp_server():
                 pass
 
 
+# ============================================================================
+# BENCHMARK MODE
+# ============================================================================
+
+# Operations the benchmark can mix, keyed by the name used in --mix
+OPERATIONS = {
+    "list_tools": lambda session: session.list_tools(),
+    "add": lambda session: session.call_tool("add", {"a": random.randint(0, 1000), "b": random.randint(0, 1000)}),
+    "subtract": lambda session: session.call_tool("subtract", {"a": random.randint(0, 1000), "b": random.randint(0, 1000)}),
+    "list_resources": lambda session: session.list_resources(),
+    "read_resource": lambda session: session.read_resource("greeting://Benchmark"),
+}
+
+DEFAULT_MIX = "add=4,subtract=4,list_tools=1,list_resources=1,read_resource=2"
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse 'add=4,subtract=2' into {'add': 4.0, 'subtract': 2.0}"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Choose from: {', '.join(OPERATIONS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+async def _timed_call(session, operation: str, scheduled: float, samples: dict) -> None:
+    """Run one operation and record its latency (from `scheduled`) or error"""
+    try:
+        result = await OPERATIONS[operation](session)
+        failed = bool(getattr(result, "isError", False))
+    except Exception:
+        failed = True
+    latency = time.perf_counter() - scheduled
+    samples[operation]["errors" if failed else "latencies"].append(latency)
+
+
+async def _run_session(url: str, args, weights: dict[str, float], samples: dict,
+                       ready: asyncio.Semaphore, go: asyncio.Event, start_time: list[float],
+                       session_index: int) -> None:
+    """One benchmark client: open a session, wait for all others, then issue calls"""
+    operations, op_weights = list(weights), list(weights.values())
+    async with streamablehttp_client(url, headers=_auth_headers(args.token)) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            try:
+                await session.initialize()
+            finally:
+                ready.release()  # report in even on failure so the run can't hang
+            await go.wait()
+
+            if args.mode == "closed":
+                for _ in range(args.calls):
+                    operation = random.choices(operations, op_weights)[0]
+                    await _timed_call(session, operation, time.perf_counter(), samples)
+                return
+
+            # Open loop: this session owns every `sessions`-th arrival slot
+            interval = 1.0 / args.rate
+            pending = []
+            for i in range(args.calls):
+                scheduled = start_time[0] + (i * args.sessions + session_index) * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                operation = random.choices(operations, op_weights)[0]
+                pending.append(asyncio.create_task(_timed_call(session, operation, scheduled, samples)))
+            await asyncio.gather(*pending)
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Per-operation throughput and latency percentiles (milliseconds)"""
+    report = {}
+    for operation, data in samples.items():
+        latencies = sorted(data["latencies"])
+        count = len(latencies) + len(data["errors"])
+        if not count:
+            continue
+        report[operation] = {
+            "calls": count,
+            "errors": len(data["errors"]),
+            "throughput_per_sec": count / elapsed,
+            "mean_ms": (sum(latencies) / len(latencies) * 1000) if latencies else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "max_ms": (latencies[-1] * 1000) if latencies else 0.0,
+        }
+    return report
+
+
+def print_table(report: dict, total: dict) -> None:
+    """Print the benchmark report as a table"""
+    header = f"{'operation':<16}{'calls':>8}{'errors':>8}{'ops/s':>10}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+    for operation, row in list(report.items()) + [("TOTAL", total)]:
+        print(f"{operation:<16}{row['calls']:>8}{row['errors']:>8}{row['throughput_per_sec']:>10.1f}"
+              f"{row['mean_ms']:>9.2f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+    print("=" * len(header))
+    print("Latencies in milliseconds")
+
+
+async def benchmark_mcp_server(args) -> dict:
+    """Drive the server with concurrent sessions and report latency/throughput"""
+    weights = parse_mix(args.mix)
+    samples = {operation: {"latencies": [], "errors": []} for operation in OPERATIONS}
+    ready = asyncio.Semaphore(0)
+    go = asyncio.Event()
+    start_time = [0.0]
+
+    print("=" * 60)
+    print("MCP Server Benchmark")
+    print("=" * 60)
+    print(f"Server: {args.url}")
+    print(f"Sessions: {args.sessions} | Calls/session: {args.calls} | Mode: {args.mode}"
+          + (f" @ {args.rate}/s" if args.mode == "open" else ""))
+    print(f"Mix: {args.mix}\n")
+
+    tasks = [
+        asyncio.create_task(_run_session(args.url, args, weights, samples, ready, go, start_time, i))
+        for i in range(args.sessions)
+    ]
+    for _ in range(args.sessions):
+        await ready.acquire()  # wait until every session is initialized...
+    start_time[0] = time.perf_counter()  # ...then start the clock
+    go.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start_time[0]
+
+    report = summarize(samples, elapsed)
+    everything = {"latencies": [], "errors": []}
+    for data in samples.values():
+        everything["latencies"] += data["latencies"]
+        everything["errors"] += data["errors"]
+    total = summarize({"TOTAL": everything}, elapsed)["TOTAL"]
+
+    result = {
+        "config": {"url": args.url, "sessions": args.sessions, "calls_per_session": args.calls,
+                   "mode": args.mode, "rate": args.rate if args.mode == "open" else None,
+                   "mix": weights},
+        "elapsed_sec": elapsed,
+        "operations": report,
+        "total": total,
+    }
+    print_table(report, total)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n📄 JSON report written to {args.json}")
+    else:
+        print("\n" + json.dumps(result, indent=2))
+    return result
+
+
 if __name__ == "__main__":
-    asyncio.run(test_mcp_server())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Test or benchmark the local MCP server")
+    parser.add_argument("--url", default="http://localhost:8080/mcp", help="MCP server endpoint")
+    parser.add_argument("--token", default=os.environ.get("MCP_AUTH_TOKEN"),
+                        help="Bearer token, if the server requires one (default: $MCP_AUTH_TOKEN)")
+    parser.add_argument("--bench", action="store_true", help="Run the benchmark instead of the walkthrough")
+    parser.add_argument("--sessions", type=int, default=10, help="Concurrent ClientSessions")
+    parser.add_argument("--calls", type=int, default=100, help="Calls per session")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Call mix as operation=weight,...")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed", help="Load model")
+    parser.add_argument("--rate", type=float, default=200.0, help="Open-loop arrival rate (calls/sec, total)")
+    parser.add_argument("--json", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.bench:
+        asyncio.run(benchmark_mcp_server(args))
+    else:
+        asyncio.run(test_mcp_server(args.url, args.token))
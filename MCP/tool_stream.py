@@ -0,0 +1,82 @@
+"""
+Tool Streaming
+==============
+
+Lets a long-running tool show its work while it runs, instead of the client
+seeing nothing until the final result:
+
+    @mcp.tool()
+    async def crunch(values: list[float], ctx: Context) -> float:
+        stream = ToolStream(ctx, total=len(values))
+        for i, chunk in enumerate(chunks):
+            ...
+            await stream.partial({"chunk": i, "subtotal": subtotal})   # partial result
+            await stream.progress(done, f"{done} of {len(values)}")     # progress bar
+        return total                                                   # final result
+
+Both travel on the same streamable HTTP response as the final result (an SSE
+stream for that request), so they reach the client as soon as they are sent.
+
+- progress() sends MCP progress notifications (notifications/progress). Only
+  clients that pass a progress_callback to call_tool receive them. Updates
+  are throttled to `min_interval` seconds apart, except the last one.
+- partial() sends an MCP log notification (notifications/message) whose
+  logger is PARTIAL_RESULT_LOGGER and whose data is the chunk (any JSON
+  value). Clients read them with a `logging_callback` on ClientSession; MCP
+  has no dedicated partial-result message yet.
+
+The final return value is the tool's real result - partial chunks are a
+preview and should not be the only place the data appears.
+"""
+
+import time
+from typing import Any
+
+from mcp.server.fastmcp import Context
+
+PARTIAL_RESULT_LOGGER = "partial_result"
+
+
+class ToolStream:
+    """Progress and partial-result sender for one tool call"""
+
+    def __init__(self, ctx: Context, total: float | None = None, min_interval: float = 0.1):
+        """
+        Args:
+            ctx: The tool's Context parameter
+            total: Total amount of work (e.g. item count), if known
+            min_interval: Minimum seconds between progress notifications
+        """
+        self.ctx = ctx
+        self.total = total
+        self.min_interval = min_interval
+        self.chunks_sent = 0
+        self._last_progress = float("-inf")
+
+    async def progress(self, completed: float, message: str | None = None) -> None:
+        """Report how much work is done (throttled; the final update always goes out)
+
+        Args:
+            completed: Work done so far, in the same unit as `total`
+            message: Optional human-readable status
+        """
+        now = time.monotonic()
+        finished = self.total is not None and completed >= self.total
+        if not finished and now - self._last_progress < self.min_interval:
+            return
+        self._last_progress = now
+        await self.ctx.report_progress(completed, self.total, message)
+
+    async def partial(self, chunk: Any) -> None:
+        """Send a partial result to the client right away
+
+        Args:
+            chunk: Any JSON-serializable value
+        """
+        await self.ctx.request_context.session.send_log_message(
+            level="info",
+            data=chunk,
+            logger=PARTIAL_RESULT_LOGGER,
+            related_request_id=self.ctx.request_id,
+        )
+        self.chunks_sent += 1
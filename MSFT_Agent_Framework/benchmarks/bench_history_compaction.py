@@ -0,0 +1,111 @@
+"""
+Benchmark: Prompt Size over Long Conversations
+==============================================
+
+Runs a 200-turn conversation against a local mock chat client (no Azure)
+three times and records how many tokens each turn sends to the model:
+
+    full history   a plain thread: every turn re-sends everything so far
+    summarize      HistoryCompaction with a summarizer (the mock, too)
+    relevance      HistoryCompaction dropping the least relevant old turns
+
+Full history grows linearly with the number of turns. Both compacting threads
+should level off under the budget and stay there, with the recent turns kept
+word for word. (With a summarizer the size saw-tooths: each compaction leaves
+the summary and the recent turns, and the next turns fill it up again.)
+
+Usage (from the MSFT_Agent_Framework folder):
+    python benchmarks/bench_history_compaction.py
+    python benchmarks/bench_history_compaction.py --turns 500 --budget 2000 --keep-recent 2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import MutableSequence
+from typing import Any
+
+from agent_framework import ChatAgent, ChatMessage, ChatOptions, ChatResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solution"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # mock_chat_client.py
+
+from history_compaction import HistoryCompaction, estimate_tokens, summarize_with  # noqa: E402
+from load_test_chat_server import REPLY_RULES  # noqa: E402
+from mock_chat_client import MockChatClient  # noqa: E402
+
+TOPICS = ["tents", "sleeping bags", "backpacks", "stoves", "hiking boots", "water filters", "lanterns"]
+CHECKPOINTS = (1, 10, 25, 50, 100, 150, 200)
+
+
+def question(turn: int) -> str:
+    return f"Question {turn}: which {TOPICS[turn % len(TOPICS)]} would you recommend for a winter trip?"
+
+
+class RecordingChatClient(MockChatClient):
+    """The mock model, recording the prompt size of every request"""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(rules=REPLY_RULES, **kwargs)
+        self.prompt_tokens: list[int] = []
+
+    async def _inner_get_response(self, *, messages: MutableSequence[ChatMessage], chat_options: ChatOptions,
+                                  **kwargs: Any) -> ChatResponse:
+        self.prompt_tokens.append(sum(estimate_tokens(message) for message in messages))
+        return await super()._inner_get_response(messages=messages, chat_options=chat_options, **kwargs)
+
+
+async def converse(turns: int, policy: HistoryCompaction | None) -> tuple[list[int], float]:
+    """Prompt tokens per turn, and the total time, for one conversation"""
+    client = RecordingChatClient()
+    agent = ChatAgent(chat_client=client, chat_message_store_factory=policy.message_store if policy else None)
+    thread = agent.get_new_thread()
+    start = time.perf_counter()
+    for turn in range(1, turns + 1):
+        await agent.run(question(turn), thread=thread)
+    return client.prompt_tokens, time.perf_counter() - start
+
+
+async def run(turns: int, budget: int, keep_recent: int) -> dict[str, tuple[list[int], float]]:
+    summarizer = summarize_with(MockChatClient(rules=REPLY_RULES))
+    return {
+        "full history": await converse(turns, None),
+        "summarize": await converse(turns, HistoryCompaction(budget, keep_recent, summarizer=summarizer)),
+        "relevance": await converse(turns, HistoryCompaction(budget, keep_recent)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prompt size per turn with and without history compaction")
+    parser.add_argument("--turns", type=int, default=200, help="Turns in the conversation")
+    parser.add_argument("--budget", type=int, default=4000, help="History budget in tokens")
+    parser.add_argument("--keep-recent", type=int, default=4, help="Recent turns always kept verbatim")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.turns, args.budget, args.keep_recent))
+    checkpoints = [turn for turn in CHECKPOINTS if turn <= args.turns]
+
+    print("=" * 72)
+    print(f"Prompt tokens per turn, {args.turns} turns, budget {args.budget}, "
+          f"last {args.keep_recent} turns kept verbatim")
+    print("=" * 72)
+    print(f"{'turn':<16}" + "".join(f"{turn:>8}" for turn in checkpoints) + f"{'time':>10}")
+    for mode, (prompts, elapsed) in results.items():
+        print(f"{mode:<16}" + "".join(f"{prompts[turn - 1]:>8}" for turn in checkpoints) + f"{elapsed:>9.2f}s")
+    print("=" * 72)
+    # The newest question comes on top of the stored history
+    limit = args.budget + max(estimate_tokens(ChatMessage(role="user", text=question(turn)))
+                              for turn in range(1, args.turns + 1))
+    for mode in ("summarize", "relevance"):
+        prompts = results[mode][0]
+        second_half = prompts[len(prompts) // 2:]
+        span = f"{min(second_half)}-{max(second_half)} tokens from turn {len(prompts) - len(second_half) + 1} on"
+        print(f"✅ {mode}: stays under {limit} tokens ({span})" if max(second_half) <= limit
+              else f"⚠️  {mode}: over the budget ({span})")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
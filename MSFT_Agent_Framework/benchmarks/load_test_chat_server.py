@@ -0,0 +1,193 @@
+"""
+Load Test: Multi-User Chat Server
+=================================
+
+Starts solution/chat_server.py on the offline mock chat client
+(mock_chat_client.py: no Azure, no network) and has many simulated
+users chat with it at once over POST /chat, each with its own session token
+from POST /session.
+The mock streams a reply about as long as the answers in
+eval/synthetic_eval_data.jsonl, after a configurable first-token delay.
+
+Reports turns per second, time to first token and full reply time
+(p50/p95/p99), and how many turns were turned away by backpressure
+(503 queue full / 429 user busy) and retried. Also checks that every user
+saw only their own conversation: the mock starts each reply with the number
+of user messages in the thread it was given. Finally the server is restarted
+on the same thread database and session secret, and every user sends one
+more message with the token they already have, which must continue their
+conversation (thread_registry.py).
+
+Usage (from the MSFT_Agent_Framework folder):
+    python benchmarks/load_test_chat_server.py
+    python benchmarks/load_test_chat_server.py --users 500 --turns 3 --max-concurrent 64 --max-queued 100
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+from agent_framework import ChatAgent
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "solution"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))  # mock_chat_client.py
+
+from mock_chat_client import MockChatClient  # noqa: E402
+
+ANSWER = ("Contoso offers a range of tent models designed to meet various camping needs. "
+          "The TrailMaster X4 sleeps four and suits family trips, the Alpine Explorer is a light "
+          "two-person tent for backpacking, and the Summit Pro sleeps six with a vestibule for gear. ") * 6
+# Every reply starts with the number of user messages in the thread it was given
+REPLY_RULES = [{"reply": "[turn {turn}] " + ANSWER}]
+
+
+def mock_model(first_token: float, chunk_delay: float) -> MockChatClient:
+    """Stand-in model: streams ANSWER in chunks after `first_token` seconds"""
+    return MockChatClient(rules=REPLY_RULES, first_token=first_token, chunk_delay=chunk_delay)
+
+
+def _serve(port: int, first_token: float, chunk_delay: float, max_concurrent: int, max_queued: int,
+           thread_db: str, session_secret: bytes) -> None:
+    """Server process: chat_server's app on the mock client"""
+    import uvicorn
+
+    from chat_server import create_app
+
+    @asynccontextmanager
+    async def mock_agent():
+        async with ChatAgent(chat_client=mock_model(first_token, chunk_delay), name="MockAgent") as agent:
+            yield agent
+
+    app = create_app(mock_agent(), max_concurrent=max_concurrent, max_queued=max_queued, thread_db=thread_db,
+                     session_secret=session_secret)
+    # Users keep their connection between turns, and a turn can wait in the queue
+    # longer than uvicorn's default 5 s keep-alive
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=60)
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    """Block until something accepts connections on localhost:port"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise TimeoutError(f"Server did not start on port {port}")
+
+
+async def _user(client: httpx.AsyncClient, base: str, user: int, tokens: dict[int, str], turns: range,
+                stats: dict[str, Any]) -> None:
+    """One simulated user: a message for each of `turns` in a row, retrying when turned away"""
+    if user not in tokens:
+        response = await client.post(f"{base}/session")
+        response.raise_for_status()
+        tokens[user] = response.json()["session"]
+    headers = {"Authorization": f"Bearer {tokens[user]}"}
+    for turn in turns:
+        while True:
+            start = time.perf_counter()
+            first_token = None
+            text = ""
+            async with client.stream("POST", f"{base}/chat", json={"message": f"Question {turn}"},
+                                     headers=headers) as response:
+                if response.status_code in (429, 503):
+                    stats["rejected"][response.status_code] += 1
+                    await asyncio.sleep(float(response.headers.get("retry-after", "0.2")))
+                    continue
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith("data: ") and '"text"' in line:
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        text += json.loads(line[6:])["text"]
+            break
+        stats["first_token"].append(first_token)
+        stats["latency"].append(time.perf_counter() - start)
+        if not text.startswith(f"[turn {turn}]"):
+            stats["mixed"] += 1
+
+
+def _percentiles(values: list[float]) -> str:
+    cuts = statistics.quantiles(values, n=100)
+    return f"p50 {cuts[49] * 1e3:7.0f} ms   p95 {cuts[94] * 1e3:7.0f} ms   p99 {cuts[98] * 1e3:7.0f} ms"
+
+
+async def run(port: int, users: int, tokens: dict[int, str], turns: range) -> dict[str, Any]:
+    stats: dict[str, Any] = {"first_token": [], "latency": [], "rejected": {429: 0, 503: 0}, "mixed": 0}
+    base = f"http://127.0.0.1:{port}"
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(120)) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(client, base, i, tokens, turns, stats) for i in range(users)))
+        stats["elapsed"] = time.perf_counter() - start
+        stats["health"] = (await client.get(f"{base}/health")).json()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test chat_server.py with many concurrent users")
+    parser.add_argument("--users", type=int, default=200, help="Concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=3, help="Messages per user")
+    parser.add_argument("--first-token", type=float, default=0.5, help="Mock model delay before the first chunk (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Mock model delay between chunks (s)")
+    parser.add_argument("--max-concurrent", type=int, default=64, help="Server CHAT_MAX_CONCURRENT")
+    parser.add_argument("--max-queued", type=int, default=100, help="Server CHAT_MAX_QUEUED")
+    parser.add_argument("--port", type=int, default=8198, help="Port for the server under test")
+    args = parser.parse_args()
+
+    session_secret = secrets.token_bytes(32)  # Shared by both server runs, so the tokens stay valid
+    tokens: dict[int, str] = {}
+
+    def serve_and_run(thread_db: str, turns: range) -> dict[str, Any]:
+        server = multiprocessing.Process(
+            target=_serve,
+            args=(args.port, args.first_token, args.chunk_delay, args.max_concurrent, args.max_queued, thread_db,
+                  session_secret),
+            daemon=True,
+        )
+        server.start()
+        try:
+            _wait_for_port(args.port)
+            return asyncio.run(run(args.port, args.users, tokens, turns))
+        finally:
+            server.terminate()
+            server.join(timeout=15)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        thread_db = os.path.join(data_dir, "threads.db")
+        print(f"⏱️  {args.users} users x {args.turns} turns...", flush=True)
+        stats = serve_and_run(thread_db, range(1, args.turns + 1))
+        print("⏱️  Restarting the server, one more turn each...", flush=True)
+        resumed = serve_and_run(thread_db, range(args.turns + 1, args.turns + 2))
+
+    completed = len(stats["latency"])
+    print("=" * 72)
+    print(f"{args.users} users x {args.turns} turns, {args.max_concurrent} concurrent / "
+          f"{args.max_queued} queued on the server")
+    print("=" * 72)
+    print(f"Turns completed   {completed} in {stats['elapsed']:.1f}s ({completed / stats['elapsed']:.1f} turns/s)")
+    print(f"First token       {_percentiles(stats['first_token'])}")
+    print(f"Full reply        {_percentiles(stats['latency'])}")
+    print(f"Turned away       {stats['rejected'][503]} x 503 (queue full), {stats['rejected'][429]} x 429 (user busy)")
+    print(f"Conversations     {stats['health']['conversations']} stored")
+    print("✅ Every user saw only their own conversation" if not stats["mixed"]
+          else f"⚠️  {stats['mixed']} replies came from the wrong conversation")
+    print(f"✅ All {args.users} conversations resumed after a restart" if not resumed["mixed"]
+          else f"⚠️  {resumed['mixed']} conversations did not resume after a restart")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+MSFT Agent Framework Workshop - Console Chat Helpers
+====================================================
+The one copy shared by the console scripts of all three workshops:
+
+    ainput()        input() that does not block the event loop
+                    (foundry_agent_starter.py, solution/foundry_agent.py,
+                    MCP/get_agent_mi.py, Multi_Agent_Workshop/Handoff/agent_handoff.py)
+    stream_reply()  print the agent's reply as it is generated; Ctrl+C stops it
+                    (foundry_agent_starter.py, solution/foundry_agent.py, MCP/get_agent_mi.py)
+    cancel_run()    cancel a Foundry run that is still going
+                    (stream_reply() on Ctrl+C, solution/chat_server.py on a dropped client)
+
+Fix them here only - there are no other copies to keep in step.
+"""
+
+import asyncio
+import signal
+import threading
+import time
+
+
+async def ainput(prompt=""):
+    """
+    input() for async code: waits for a line without blocking the event loop
+
+    The read happens on a daemon thread, so token refresh, MCP keep-alives,
+    workflows and trace export keep running while the user types, and exiting
+    never waits for a pending read. Ctrl+D raises EOFError, as with input().
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def settle(line, error):
+        if future.done():
+            return  # The caller stopped waiting
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+    def read():
+        try:
+            result = (input(prompt), None)
+        except Exception as error:
+            result = (None, error)
+        try:
+            loop.call_soon_threadsafe(settle, *result)
+        except RuntimeError:
+            pass  # The event loop has already closed
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def cancel_run(agent, thread_id, run_id):
+    """
+    Cancel a Foundry agent run that is still going
+
+    Closing the reply stream only stops reading it: the service keeps the run
+    going (and the thread busy) until it finishes. Chat clients without
+    Foundry runs (e.g. the mock) have nothing to cancel.
+    """
+    agents_client = getattr(agent.chat_client, "agents_client", None)
+    if agents_client is None or thread_id is None or run_id is None:
+        return
+    try:
+        await agents_client.runs.cancel(thread_id, run_id)
+    except Exception:
+        pass  # The run finished on its own meanwhile
+
+
+async def stream_reply(agent, user_input, debug=False, **kwargs):
+    """
+    Print the agent's reply as it is generated, instead of all at once at the end
+
+    Ctrl+C stops the reply - and cancels the run behind it - and returns to the
+    prompt. With debug=True the time to the first token and the total time are
+    printed. Other keyword arguments go to agent.run_stream().
+    """
+    started = time.perf_counter()
+    first_token = None
+    interrupted = False
+    thread_id = run_id = None
+    stream = agent.run_stream(user_input, **kwargs)
+
+    async def print_updates():
+        nonlocal first_token, thread_id, run_id
+        async for update in stream:
+            # Which run this is, in case it has to be cancelled
+            run_id = update.response_id or run_id
+            thread_id = getattr(update.raw_representation, "conversation_id", None) or thread_id
+            if update.text:
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                print(update.text, end="", flush=True)
+
+    def interrupt():
+        nonlocal interrupted
+        interrupted = True
+        task.cancel()
+
+    task = asyncio.create_task(print_updates())
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, interrupt)
+    except NotImplementedError:
+        pass  # Windows: Ctrl+C ends the script instead
+    try:
+        await task
+    except asyncio.CancelledError:
+        if not interrupted:
+            raise
+        print("\n⏹️  Stopped", end="")
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except NotImplementedError:
+            pass
+        await stream.aclose()
+    if interrupted:
+        await cancel_run(agent, thread_id, run_id)
+    print()
+    if debug:
+        ttft = f"{first_token:.2f}s" if first_token is not None else "-"
+        print(f"⏱️  first token {ttft}, total {time.perf_counter() - started:.2f}s")
@@ -19,6 +19,8 @@ from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import AzureCliCredential
 import os
 
+from chat_console import ainput, stream_reply
+
 # ============================================================================
 # EXERCISE 1: Configure Your Azure AI Foundry Project
 # ============================================================================
@@ -42,6 +44,9 @@ os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"] = "your-model-deployment-name"
 
 AGENT_ID = "your-agent-id"  # <-- REPLACE THIS
 
+# Optional: print time-to-first-token for every reply (CHAT_DEBUG=1)
+CHAT_DEBUG = os.environ.get("CHAT_DEBUG", "").lower() in ("1", "true", "yes")
+
 
 async def main():
     """Main function demonstrating agent interaction with tracing."""
@@ -97,7 +102,7 @@ async def main():
         while True:
             try:
                 # Get user input
-                user_input = input("You: ").strip()
+                user_input = (await ainput("You: ")).strip()
                 
                 # Check for exit commands
                 if user_input.lower() in ['exit', 'quit', 'q']:
@@ -108,14 +113,13 @@ async def main():
                 if not user_input:
                     continue
                 
-                # Send message to your Foundry agent
+                # Send message to your Foundry agent - the reply prints as it arrives
                 print("\n🤖 Assistant: ", end="", flush=True)
                 
                 # TODO: After completing Exercise 4, change this line to:
-                # result = await agent.run(user_input, thread=thread)
-                result = await agent.run(user_input)
+                # await stream_reply(agent, user_input, debug=CHAT_DEBUG, thread=thread)
+                await stream_reply(agent, user_input, debug=CHAT_DEBUG)
                 
-                print(result.text)
                 print()  # Extra newline for readability
                 
             except EOFError:
@@ -0,0 +1,287 @@
+"""
+MSFT Agent Framework Workshop - Offline Mock Chat Client
+========================================================
+A stand-in for AzureOpenAIChatClient / AzureAIAgentClient that never touches
+the network: every reply is computed locally and is the same on every run.
+Use it to profile the orchestration (group chat, sequential, handoff, the
+Foundry chat loops) without Azure, and with latency and throttling you choose.
+
+    chat_client = MockChatClient(first_token=0.3, chunk_delay=0.01, rules=[
+        {"agent": "triage", "match": "refund", "tool_calls": [{"name": "handoff_to_refund_agent"}]},
+        {"agent": "refund", "tool_calls": [{"name": "submit_refund", "arguments": {"order_id": "A1"}}]},
+        {"match": "hello", "replies": ["Hi!", "Hello again!"]},
+    ])
+
+The workshop scripts create their model client through chat_client_or_mock(),
+so an environment variable switches them to the mock, no code changes:
+
+    chat_client = chat_client_or_mock(lambda: AzureOpenAIChatClient(credential=AzureCliCredential()))
+
+    MOCK_CHAT_CLIENT=1          Use the mock instead of Azure
+    MOCK_CHAT_RULES=rules.json  A JSON list of rules like the ones above
+    MOCK_FIRST_TOKEN=0.3        Seconds before the first chunk (default 0)
+    MOCK_CHUNK_DELAY=0.01       Seconds between chunks (default 0)
+    MOCK_CHUNK_SIZE=24          Characters per streamed chunk (default 24)
+    MOCK_REPLY_TOKENS=60        Length of the default reply (default 60)
+    MOCK_RATE_LIMIT=0.1         Share of requests that fail with a 429 (default 0)
+    MOCK_RATE_LIMIT_EVERY=10    Or: every 10th request fails with a 429
+    MOCK_SEED=0                 Seed for MOCK_RATE_LIMIT, so failures repeat
+
+Rules are tried in order and the first one that fits answers:
+    agent       regex searched in the agent's instructions (system messages)
+    match       regex searched in the latest user message
+    reply       the text to answer with; {input} is the latest user message and
+                {turn} the number of user messages so far
+    replies     a script: the next text each time the rule answers (the last repeats)
+    tool_calls  [{"name": ..., "arguments": {...}}] to call first; calls to tools
+                the agent does not have are left out. Once the tools have run,
+                the rule answers with its reply.
+    json        the answer when structured output (response_format) is requested
+
+Without a matching rule the reply is a fixed text of MOCK_REPLY_TOKENS tokens.
+A structured request that no rule answers gets its model's defaults, except
+group chat manager decisions: those pick the participants listed in the
+prompt ("- Name: description") in turn, then finish after `manager_rounds`
+rounds.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+from collections.abc import AsyncIterable, Callable, MutableSequence, Sequence
+from typing import Any
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    FunctionCallContent,
+    TextContent,
+    use_function_invocation,
+)
+from agent_framework.exceptions import ServiceResponseException
+
+FILLER = ("Contoso offers a range of outdoor gear for every season, from lightweight tents and sleeping "
+          "bags to stoves, lanterns and water filters, backed by a two-year warranty. ")
+
+# Field names the group chat managers use for their decisions
+_SPEAKER_FIELDS = ("next_agent", "selected_participant", "next_speaker")
+_FINISH_FIELDS = ("finish", "terminate")
+_FINAL_FIELDS = ("final_response", "final_message")
+_PARTICIPANT_LINE = re.compile(r"^\s*-\s*([\w-]+)\s*:", re.MULTILINE)
+
+
+class MockRateLimitError(ServiceResponseException):
+    """The 429 a throttled deployment answers with"""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded (mock), retry after {retry_after:g}s")
+        self.retry_after = retry_after
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name) or default)
+
+
+def mock_enabled() -> bool:
+    """True when MOCK_CHAT_CLIENT asks for the mock"""
+    return os.environ.get("MOCK_CHAT_CLIENT", "").lower() in ("1", "true", "yes")
+
+
+def chat_client_or_mock(factory: Callable[[], Any], **overrides: Any) -> Any:
+    """factory() - or, when MOCK_CHAT_CLIENT asks for it, MockChatClient.from_env(**overrides)"""
+    if mock_enabled():
+        return MockChatClient.from_env(**overrides)
+    return factory()
+
+
+@use_function_invocation
+class MockChatClient(BaseChatClient):
+    """Deterministic offline chat client: rule-based replies, tool calls, latency and 429s"""
+
+    OTEL_PROVIDER_NAME = "mock"
+
+    def __init__(self, rules: Sequence[dict] | None = None, first_token: float = 0.0, chunk_delay: float = 0.0,
+                 chunk_size: int = 24, reply_tokens: int = 60, rate_limit: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 1.0, manager_rounds: int = 1, seed: int = 0, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.rules = [dict(rule) for rule in rules or []]
+        self.first_token = first_token
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.reply_tokens = reply_tokens
+        self.rate_limit = rate_limit
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.manager_rounds = manager_rounds
+        self.requests = 0
+        self.rate_limited = 0
+        self.simulated_seconds = 0.0  # Time spent "generating", to tell apart from orchestration time
+        self._random = random.Random(seed)
+        self._script_positions = [0] * len(self.rules)
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "MockChatClient":
+        """A mock configured from the MOCK_* environment variables"""
+        rules = None
+        if os.environ.get("MOCK_CHAT_RULES"):
+            with open(os.environ["MOCK_CHAT_RULES"], encoding="utf-8") as file:
+                rules = json.load(file)
+        settings = {
+            "rules": rules,
+            "first_token": _env_float("MOCK_FIRST_TOKEN", 0.0),
+            "chunk_delay": _env_float("MOCK_CHUNK_DELAY", 0.0),
+            "chunk_size": int(_env_float("MOCK_CHUNK_SIZE", 24)),
+            "reply_tokens": int(_env_float("MOCK_REPLY_TOKENS", 60)),
+            "rate_limit": _env_float("MOCK_RATE_LIMIT", 0.0),
+            "rate_limit_every": int(_env_float("MOCK_RATE_LIMIT_EVERY", 0)),
+            "seed": int(_env_float("MOCK_SEED", 0)),
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    async def _wait(self, seconds: float) -> None:
+        self.simulated_seconds += seconds
+        await asyncio.sleep(seconds)
+
+    # Choosing the answer
+
+    def _throttle(self) -> None:
+        self.requests += 1
+        every = self.rate_limit_every and self.requests % self.rate_limit_every == 0
+        if every or (self.rate_limit and self._random.random() < self.rate_limit):
+            self.rate_limited += 1
+            raise MockRateLimitError(self.retry_after)
+
+    def _rule_for(self, messages: Sequence[ChatMessage]) -> int | None:
+        instructions = "\n".join(message.text or "" for message in messages if message.role.value == "system")
+        latest = _latest_user_text(messages)
+        for index, rule in enumerate(self.rules):
+            if "agent" in rule and not re.search(rule["agent"], instructions, re.IGNORECASE):
+                continue
+            if "match" in rule and not re.search(rule["match"], latest, re.IGNORECASE):
+                continue
+            return index
+        return None
+
+    def _tool_calls(self, rule: dict, messages: Sequence[ChatMessage], chat_options: ChatOptions,
+                    ) -> list[FunctionCallContent]:
+        """The rule's tool calls that the agent has and that have not run yet this turn"""
+        available = {getattr(tool, "name", None) for tool in chat_options.tools or []}
+        already_called = {content.name for content in _since_latest_user(messages)
+                          if isinstance(content, FunctionCallContent)}
+        calls = []
+        for number, call in enumerate(rule.get("tool_calls", [])):
+            if call["name"] in available and call["name"] not in already_called:
+                calls.append(FunctionCallContent(call_id=f"mock_call_{self.requests}_{number}", name=call["name"],
+                                                 arguments=call.get("arguments", {})))
+        return calls
+
+    def _text(self, index: int | None, messages: Sequence[ChatMessage]) -> str:
+        fields = {"input": _latest_user_text(messages), "turn": _user_turns(messages)}
+        if index is None:
+            return _default_reply(self.reply_tokens).format(**fields)
+        rule = self.rules[index]
+        if "replies" in rule:
+            position = self._script_positions[index]
+            self._script_positions[index] = min(position + 1, len(rule["replies"]) - 1)
+            return rule["replies"][position].format(**fields)
+        return rule.get("reply", _default_reply(self.reply_tokens)).format(**fields)
+
+    def _structured(self, index: int | None, messages: Sequence[ChatMessage], response_format: type) -> str:
+        if index is not None and "json" in self.rules[index]:
+            return json.dumps(self.rules[index]["json"])
+        fields = getattr(response_format, "model_fields", {})
+        speaker = next((name for name in _SPEAKER_FIELDS if name in fields), None)
+        if speaker is None:
+            try:
+                return response_format().model_dump_json()
+            except Exception:
+                return "{}"
+        return json.dumps(self._manager_decision(messages, fields, speaker))
+
+    def _manager_decision(self, messages: Sequence[ChatMessage], fields: dict, speaker: str) -> dict:
+        """Round-robin over the participants listed in the prompt"""
+        prompt = "\n".join(message.text or "" for message in messages if message.role.value == "system")
+        participants = list(dict.fromkeys(_PARTICIPANT_LINE.findall(prompt)))
+        spoken = [message for message in messages
+                  if message.role.value == "assistant" and message.author_name in participants and message.text]
+        finish = next((name for name in _FINISH_FIELDS if name in fields), None)
+        if not participants or len(spoken) >= len(participants) * self.manager_rounds:
+            decision: dict[str, Any] = {speaker: None}
+            if finish:
+                decision[finish] = True
+            final = next((name for name in _FINAL_FIELDS if name in fields), None)
+            if final:
+                decision[final] = spoken[-1].text if spoken else ""
+            return decision
+        decision = {speaker: participants[len(spoken) % len(participants)]}
+        if finish:
+            decision[finish] = False
+        return decision
+
+    def _answer(self, messages: Sequence[ChatMessage], chat_options: ChatOptions,
+                ) -> tuple[list[FunctionCallContent], str]:
+        index = self._rule_for(messages)
+        calls = self._tool_calls(self.rules[index], messages, chat_options) if index is not None else []
+        if calls:
+            return calls, ""
+        if chat_options.response_format is not None:
+            return [], self._structured(index, messages, chat_options.response_format)
+        return [], self._text(index, messages)
+
+    # BaseChatClient
+
+    async def _inner_get_response(self, *, messages: MutableSequence[ChatMessage], chat_options: ChatOptions,
+                                  **kwargs: Any) -> ChatResponse:
+        self._throttle()
+        calls, text = self._answer(messages, chat_options)
+        chunks = max(1, -(-len(text) // self.chunk_size))
+        await self._wait(self.first_token + self.chunk_delay * (chunks - 1))
+        message = ChatMessage(role="assistant", contents=calls or [TextContent(text=text)])
+        return ChatResponse(messages=[message], response_format=chat_options.response_format)
+
+    async def _inner_get_streaming_response(self, *, messages: MutableSequence[ChatMessage],
+                                            chat_options: ChatOptions, **kwargs: Any
+                                            ) -> AsyncIterable[ChatResponseUpdate]:
+        self._throttle()
+        calls, text = self._answer(messages, chat_options)
+        await self._wait(self.first_token)
+        if calls:
+            yield ChatResponseUpdate(role="assistant", contents=calls)
+            return
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                await self._wait(self.chunk_delay)
+            yield ChatResponseUpdate(role="assistant", contents=[TextContent(text=text[start:start + self.chunk_size])])
+
+
+def _latest_user_text(messages: Sequence[ChatMessage]) -> str:
+    return next((message.text or "" for message in reversed(messages) if message.role.value == "user"), "")
+
+
+def _user_turns(messages: Sequence[ChatMessage]) -> int:
+    return sum(1 for message in messages if message.role.value == "user")
+
+
+def _since_latest_user(messages: Sequence[ChatMessage]) -> list:
+    """Contents of the messages after the latest user message"""
+    contents: list = []
+    for message in reversed(messages):
+        if message.role.value == "user":
+            break
+        contents.extend(message.contents)
+    return contents
+
+
+def _default_reply(tokens: int) -> str:
+    text = "Mock reply to: {input} "
+    while len(text) < tokens * 4:
+        text += FILLER
+    return text[:max(tokens * 4, len("Mock reply to: {input}"))].rstrip()
@@ -0,0 +1,364 @@
+"""
+MSFT Agent Framework Workshop - Multi-User Chat Server
+======================================================
+Serves the Foundry agent from foundry_agent.py to many users at once from a
+single process, instead of one user at a terminal.
+
+    python chat_server.py --port 8000
+
+Endpoints:
+    POST /session            Start a conversation: {"session": "<token>"}
+    POST /chat               {"message": "..."} with Authorization: Bearer <token>
+                             The reply streams back as server-sent events:
+                             data: {"text": "..."} ... then event: done
+    WS   /ws?session=<token> Send a message as text; receive {"type": "delta", "text": ...}
+                             messages and then {"type": "done"}. Repeat on the same socket.
+    GET  /health             Running and queued turns, and stored conversations
+
+Every session gets its own thread, so conversations never mix. The session
+token is issued by the server - a random id signed with CHAT_SESSION_SECRET -
+so a client cannot pick, guess or forge another session's id and read its
+conversation. Keep the token like a password. Without CHAT_SESSION_SECRET a
+random secret is made at startup, and tokens stop working when the server
+restarts; set it (the same on every replica) to keep conversations across
+restarts. A token identifies a conversation, not a person: to tie threads to
+signed-in users, put the server behind your identity provider and use the
+authenticated user id as the session id instead.
+
+Threads are kept in a ThreadRegistry (CHAT_THREAD_DB, default threads.db next
+to this file), so a restarted server, or another replica on the same file,
+resumes each session's conversation. The credential, the AIProjectClient and
+the agent are created once and shared by all users. With MOCK_CHAT_CLIENT=1
+the server answers from a local mock model instead (mock_chat_client.py), e.g.
+for load tests.
+
+Backpressure:
+    CHAT_MAX_CONCURRENT   Turns running against the model at once (default 32)
+    CHAT_MAX_QUEUED       Turns waiting for a slot (default 200). When the queue
+                          is full, new turns get 503 with Retry-After right away.
+    CHAT_QUEUE_TIMEOUT    Seconds a turn may wait for a slot before it gets 503 (default 30)
+
+A session's next message is refused with 429 while its previous reply is still
+streaming. Replies are streamed at the pace the client reads them: a slow
+reader slows down its own turn, not the server.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import uvicorn
+from agent_framework import ChatAgent
+from agent_framework.azure import AzureAIAgentClient
+from azure.ai.projects.aio import AIProjectClient
+from azure.identity.aio import AzureCliCredential
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+# chat_console.py and mock_chat_client.py are shared with the other scripts, one folder up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chat_console import cancel_run  # noqa: E402
+from foundry_agent import AGENT_ID, MOCK_CHAT_CLIENT, PROJECT_ENDPOINT, RUN_OPTIONS  # noqa: E402
+from mock_chat_client import MockChatClient  # noqa: E402
+from thread_registry import ThreadRegistry  # noqa: E402
+
+DEFAULT_MAX_CONCURRENT = 32
+DEFAULT_MAX_QUEUED = 200
+DEFAULT_QUEUE_TIMEOUT = 30.0
+DEFAULT_THREAD_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "threads.db")
+
+
+class SessionTokens:
+    """Server-issued session tokens: a random id and its HMAC signature
+
+    Only ids this server (or a replica with the same secret) handed out
+    verify, so the id can safely key the session's thread.
+    """
+
+    def __init__(self, secret: bytes):
+        self._secret = secret
+
+    def _sign(self, session_id: str) -> str:
+        digest = hmac.new(self._secret, session_id.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def issue(self) -> str:
+        session_id = secrets.token_urlsafe(18)
+        return f"{session_id}.{self._sign(session_id)}"
+
+    def verify(self, token: str | None) -> str | None:
+        """The session id in a valid token, None for a missing or forged one"""
+        session_id, _, signature = (token or "").partition(".")
+        if not session_id or not hmac.compare_digest(signature, self._sign(session_id)):
+            return None
+        return session_id
+
+
+class Busy(Exception):
+    """A turn was refused; `status` is the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Turn:
+    """A user's admitted turn: holds a model slot until released"""
+
+    def __init__(self, service: "ChatService", user: str):
+        self.service = service
+        self.user = user
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.service._slots.release()
+        self.service._active_users.discard(self.user)
+        self.service.running -= 1
+
+
+class ChatService:
+    """One shared agent serving many users, each with their own thread"""
+
+    def __init__(self, agent: ChatAgent, registry: ThreadRegistry, max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+                 max_queued: int = DEFAULT_MAX_QUEUED, queue_timeout: float | None = DEFAULT_QUEUE_TIMEOUT,
+                 run_options: dict | None = None):
+        self.agent = agent
+        self.registry = registry
+        self.run_options = run_options or {}
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.running = 0
+        self.queued = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._active_users: set[str] = set()
+
+    async def admit(self, user: str) -> Turn:
+        """Wait for a model slot for `user`
+
+        Raises:
+            Busy: 429 if the user already has a turn running, 503 if the queue
+                is full or the wait exceeded the queue timeout
+        """
+        if user in self._active_users:
+            raise Busy(429, "The previous reply is still streaming")
+        if self._slots.locked() and self.queued >= self.max_queued:
+            raise Busy(503, "Server busy, try again shortly")
+        self._active_users.add(user)
+        self.queued += 1
+        try:
+            if self._slots.locked():
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+            else:
+                await self._slots.acquire()  # Free slot: no wait (and queue_timeout=0 means "never queue")
+        except asyncio.TimeoutError:
+            self._active_users.discard(user)
+            raise Busy(503, "Server busy, try again shortly") from None
+        except BaseException:
+            self._active_users.discard(user)
+            raise
+        finally:
+            self.queued -= 1
+        self.running += 1
+        return Turn(self, user)
+
+    async def reply(self, turn: Turn, message: str) -> AsyncIterator[str]:
+        """Stream the agent's reply to `message` in the user's thread"""
+        try:
+            thread = await self.registry.get(turn.user)
+            stream = self.agent.run_stream(message, thread=thread, **self.run_options)
+            thread_id = run_id = None
+            finished = False
+            try:
+                async for update in stream:
+                    run_id = update.response_id or run_id
+                    thread_id = getattr(update.raw_representation, "conversation_id", None) or thread_id
+                    if update.text:
+                        yield update.text
+                finished = True
+            finally:
+                await stream.aclose()
+                if not finished:
+                    # The client went away: closing the stream does not stop a Foundry run
+                    await cancel_run(self.agent, thread_id, run_id)
+            await self.registry.save(turn.user, thread)
+        finally:
+            turn.release()
+
+    async def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "conversations": await self.registry.count(),
+        }
+
+
+def _refused(busy: Busy) -> JSONResponse:
+    headers = {"Retry-After": "1"} if busy.status == 503 else None
+    return JSONResponse({"error": str(busy)}, status_code=busy.status, headers=headers)
+
+
+def _session_secret() -> bytes:
+    secret = os.environ.get("CHAT_SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    print("⚠️  CHAT_SESSION_SECRET is not set: session tokens end when the server stops", file=sys.stderr)
+    return secrets.token_bytes(32)
+
+
+def create_app(agent_context, max_concurrent: int | None = None, max_queued: int | None = None,
+               queue_timeout: float | None = None, thread_db: str | None = None,
+               run_options: dict | None = None, session_secret: bytes | None = None) -> Starlette:
+    """
+    Build the ASGI app around the agent from `agent_context`
+
+    `agent_context` is an async context manager that yields a ChatAgent; it
+    is entered once at startup and shared by every user. Limits, the thread
+    database and the session secret default to the CHAT_* environment
+    variables; `run_options` are passed to every agent run (e.g. history
+    truncation).
+    """
+    service: ChatService | None = None
+    sessions = SessionTokens(session_secret if session_secret is not None else _session_secret())
+
+    def setting(value, name: str, default, kind):
+        return value if value is not None else kind(os.environ.get(name, default))
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        nonlocal service
+        async with agent_context as agent:
+            registry = ThreadRegistry(agent, thread_db or os.environ.get("CHAT_THREAD_DB", DEFAULT_THREAD_DB))
+            service = ChatService(
+                agent,
+                registry,
+                max_concurrent=setting(max_concurrent, "CHAT_MAX_CONCURRENT", DEFAULT_MAX_CONCURRENT, int),
+                max_queued=setting(max_queued, "CHAT_MAX_QUEUED", DEFAULT_MAX_QUEUED, int),
+                queue_timeout=setting(queue_timeout, "CHAT_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT, float),
+                run_options=run_options,
+            )
+            try:
+                yield
+            finally:
+                registry.close()
+
+    async def new_session(request: Request) -> JSONResponse:
+        return JSONResponse({"session": sessions.issue()})
+
+    async def chat(request: Request) -> Response:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        user = sessions.verify(token) if scheme.lower() == "bearer" else None
+        if user is None:
+            return JSONResponse({"error": "Missing or invalid session token (POST /session for one)"},
+                                status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        try:
+            message = str((await request.json())["message"])
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": 'Expected {"message": ...}'}, status_code=400)
+        try:
+            turn = await service.admit(user)
+        except Busy as busy:
+            return _refused(busy)
+
+        async def events() -> AsyncIterator[str]:
+            try:
+                async for text in service.reply(turn, message):
+                    yield f"data: {json.dumps({'text': text})}\n\n"
+            except Exception as error:
+                yield f"event: error\ndata: {json.dumps({'error': str(error)})}\n\n"
+                return
+            yield "event: done\ndata: {}\n\n"
+
+        # release() also runs as a background task in case the client hung up
+        # before the reply started
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 background=BackgroundTask(turn.release))
+
+    async def chat_socket(websocket: WebSocket) -> None:
+        user = sessions.verify(websocket.query_params.get("session"))
+        if user is None:
+            await websocket.close(code=1008, reason="Missing or invalid ?session= token")
+            return
+        await websocket.accept()
+        try:
+            while True:
+                message = await websocket.receive_text()
+                try:
+                    turn = await service.admit(user)
+                except Busy as busy:
+                    await websocket.send_json({"type": "error", "status": busy.status, "error": str(busy)})
+                    continue
+                try:
+                    async for text in service.reply(turn, message):
+                        await websocket.send_json({"type": "delta", "text": text})
+                except WebSocketDisconnect:
+                    raise
+                except Exception as error:
+                    await websocket.send_json({"type": "error", "status": 500, "error": str(error)})
+                    continue
+                finally:
+                    turn.release()
+                await websocket.send_json({"type": "done"})
+        except WebSocketDisconnect:
+            pass
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse(await service.snapshot())
+
+    return Starlette(
+        routes=[
+            Route("/session", new_session, methods=["POST"]),
+            Route("/chat", chat, methods=["POST"]),
+            WebSocketRoute("/ws", chat_socket),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+@asynccontextmanager
+async def foundry_agent():
+    """The Foundry agent from foundry_agent.py, on one shared credential and project client"""
+    if MOCK_CHAT_CLIENT:
+        # Offline: serve a local mock model instead (see mock_chat_client.py)
+        async with ChatAgent(chat_client=MockChatClient.from_env(), name="FoundryAgent") as agent:
+            yield agent
+        return
+    async with (
+        AzureCliCredential() as credential,
+        AIProjectClient(endpoint=PROJECT_ENDPOINT, credential=credential) as project_client,
+        ChatAgent(
+            chat_client=AzureAIAgentClient(project_client=project_client, agent_id=AGENT_ID),
+            name="FoundryAgent",
+        ) as agent,
+    ):
+        yield agent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Foundry agent to many users over HTTP and WebSocket")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    args = parser.parse_args()
+
+    print("🚀 Serving Foundry agent:", "offline mock (MOCK_CHAT_CLIENT)" if MOCK_CHAT_CLIENT else AGENT_ID)
+    print(f"   POST http://{args.host}:{args.port}/session, then POST /chat or WS /ws?session=<token>")
+    uvicorn.run(create_app(foundry_agent(), run_options=RUN_OPTIONS), host=args.host, port=args.port, log_level="warning")
@@ -5,11 +5,21 @@ This is the completed solution for the workshop.
 """
 
 import asyncio
+import getpass
 from agent_framework import ChatAgent
 from agent_framework.azure import AzureAIAgentClient, AzureAIClient
 from azure.ai.projects.aio import AIProjectClient
 from azure.identity.aio import AzureCliCredential
 import os
+import sys
+
+# chat_console.py and mock_chat_client.py are shared with the other scripts, one folder up
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from chat_console import ainput, stream_reply
+from history_compaction import service_truncation
+from mock_chat_client import MockChatClient, mock_enabled
+from thread_registry import ThreadRegistry
 
 # Required: Your Azure AI Foundry project endpoint
 # Find this in Azure AI Foundry Studio → Project Settings
@@ -22,10 +32,35 @@ os.environ["AZURE_AI_MODEL_DEPLOYMENT_NAME"] = "your-model-deployment-name"
 # Your agent ID from Azure AI Foundry
 AGENT_ID = "your-agent-id"
 
+# Optional: chat with a local mock model instead of the Foundry agent (MOCK_CHAT_CLIENT=1)
+# No Azure needed; latency, scripted replies and 429s are set with MOCK_* (see mock_chat_client.py)
+MOCK_CHAT_CLIENT = mock_enabled()
+
+# Optional: where conversations are kept between runs, and whose conversation this is
+# Restart the script and the conversation continues (see thread_registry.py)
+# Mock conversations are kept apart, so going offline never replaces a real one
+THREAD_DB = os.environ.get("THREAD_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "threads.db"))
+SESSION_KEY = ("mock:" if MOCK_CHAT_CLIENT else "") + os.environ.get("CHAT_SESSION", getpass.getuser())
+
+# Optional: how many of the latest thread messages each run reads (0 = all)
+# Keeps the prompt from growing with every turn of a long conversation (see history_compaction.py)
+HISTORY_LAST_MESSAGES = int(os.environ.get("HISTORY_LAST_MESSAGES", "40"))
+RUN_OPTIONS = service_truncation(HISTORY_LAST_MESSAGES) if HISTORY_LAST_MESSAGES else {}
+
+# Optional: print time-to-first-token for every reply (CHAT_DEBUG=1)
+CHAT_DEBUG = os.environ.get("CHAT_DEBUG", "").lower() in ("1", "true", "yes")
+
 
 async def main():
     """Main function demonstrating agent interaction with tracing."""
     
+    if MOCK_CHAT_CLIENT:
+        # Offline: the same chat loop on a local mock model (see mock_chat_client.py)
+        async with ChatAgent(chat_client=MockChatClient.from_env(), name="FoundryAgent") as agent:
+            print("✓ Using the offline mock model (MOCK_CHAT_CLIENT)")
+            await chat_loop(agent)
+        return
+    
     async with (
         AzureCliCredential() as credential,
         AIProjectClient(endpoint=PROJECT_ENDPOINT, credential=credential) as project_client,
@@ -43,42 +78,59 @@ async def main():
         
         print("✓ Connected to agent:", AGENT_ID)
         print("✓ Azure Monitor tracing enabled")
-        
-        # Interactive Chat Loop
-        print("\n" + "="*60)
-        print("💬 Interactive Chat Mode")
-        print("="*60)
-        print("Chat with your Contoso Sales Agent")
-        print("Type 'exit', 'quit', or 'q' to end")
-        print("="*60 + "\n")
-        
-        # Create a thread to maintain conversation history
-        thread = agent.get_new_thread()
-        
-        while True:
-            try:
-                # Get user input
-                user_input = input("You: ").strip()
-                
-                # Check for exit commands
-                if user_input.lower() in ['exit', 'quit', 'q']:
-                    print("\n👋 Goodbye!")
-                    break
-                
-                # Skip empty inputs
-                if not user_input:
-                    continue
-                
-                # Send message to your Foundry agent
-                print("\n🤖 Assistant: ", end="", flush=True)
-                result = await agent.run(user_input, thread=thread)
-                print(result.text)
-                print()  # Extra newline for readability
-                
-            except EOFError:
-                # Handle Ctrl+D
-                print("\n\n👋 Goodbye!")
+        await chat_loop(agent)
+
+
+async def chat_loop(agent):
+    """Interactive chat with the agent, resuming this session's last conversation"""
+    # Interactive Chat Loop
+    print("\n" + "="*60)
+    print("💬 Interactive Chat Mode")
+    print("="*60)
+    print("Chat with your Contoso Sales Agent")
+    print("Type 'new' to start a new conversation")
+    print("Type 'exit', 'quit', or 'q' to end")
+    print("="*60 + "\n")
+    
+    # Resume this session's thread from the last run, or start a new one
+    registry = ThreadRegistry(agent, THREAD_DB)
+    thread = await registry.get(SESSION_KEY)
+    if thread.is_initialized:
+        print(f"↩️  Continuing your last conversation ({SESSION_KEY})\n")
+    
+    while True:
+        try:
+            # Get user input
+            user_input = (await ainput("You: ")).strip()
+            
+            # Check for exit commands
+            if user_input.lower() in ['exit', 'quit', 'q']:
+                print("\n👋 Goodbye!")
                 break
+            
+            # Skip empty inputs
+            if not user_input:
+                continue
+            
+            # Forget the stored conversation and start over
+            if user_input.lower() == 'new':
+                await registry.forget(SESSION_KEY)
+                thread = await registry.get(SESSION_KEY)
+                print("🆕 New conversation\n")
+                continue
+            
+            # Send message to your Foundry agent - the reply prints as it arrives
+            print("\n🤖 Assistant: ", end="", flush=True)
+            await stream_reply(agent, user_input, debug=CHAT_DEBUG, thread=thread, **RUN_OPTIONS)
+            await registry.save(SESSION_KEY, thread)
+            print()  # Extra newline for readability
+            
+        except EOFError:
+            # Handle Ctrl+D
+            print("\n\n👋 Goodbye!")
+            break
+    
+    registry.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+MSFT Agent Framework Workshop - History Compaction
+==================================================
+With thread=thread every turn sends the whole conversation so far, so prompt
+tokens and latency grow with every message. A compacting thread keeps the
+history under a token budget instead:
+
+    policy = HistoryCompaction(budget_tokens=4000, keep_recent_turns=4,
+                               summarizer=summarize_with(chat_client))
+    agent = ChatAgent(chat_client=chat_client,
+                      chat_message_store_factory=policy.message_store)
+
+After each turn, if the stored history is over budget_tokens:
+    - the last keep_recent_turns turns are always kept word for word (0: none)
+    - with a summarizer, everything older is folded into one running summary
+      message at the start of the history
+    - without one, older turns are dropped, least relevant to the latest
+      question first, until the history fits
+
+A turn is a user message plus everything up to the next user message, so a
+tool call is never separated from its result.
+
+Service-managed threads (Foundry agents, AzureAIAgentClient) keep their
+history in the service, not in a message store. For those, pass
+service_truncation(n) to each run: the service then only reads the last n
+messages of the thread.
+
+Token counts are estimated at ~4 characters per token, which is close enough
+for budgeting; pass count_tokens= for an exact tokenizer.
+"""
+
+import re
+from typing import Awaitable, Callable, Sequence
+
+from agent_framework import ChatMessage, ChatMessageStore
+
+DEFAULT_BUDGET_TOKENS = 4000
+DEFAULT_KEEP_RECENT_TURNS = 4
+SUMMARY_AUTHOR = "history_summary"
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+Summarizer = Callable[[str, Sequence[ChatMessage]], Awaitable[str]]
+
+
+def estimate_tokens(message: ChatMessage) -> int:
+    """Rough token count of a message: ~4 characters per token, plus overhead"""
+    text = message.text or ""
+    extra = sum(len(str(getattr(content, "arguments", "") or getattr(content, "result", "") or ""))
+                for content in message.contents)
+    return 4 + (len(text) + extra) // 4
+
+
+def _words(text: str) -> set[str]:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 2}
+
+
+def _split_turns(messages: Sequence[ChatMessage]) -> list[list[ChatMessage]]:
+    """Group messages into turns, each starting at a user message"""
+    turns: list[list[ChatMessage]] = []
+    for message in messages:
+        if message.role.value == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def summarize_with(chat_client, max_words: int = 200) -> Summarizer:
+    """A summarizer that asks `chat_client` to fold old turns into the running summary"""
+
+    async def summarize(summary: str, messages: Sequence[ChatMessage]) -> str:
+        transcript = "\n".join(f"{message.role.value}: {message.text}" for message in messages if message.text)
+        prompt = (
+            f"Update the summary of a conversation with the new messages below. Keep names, numbers, "
+            f"decisions and open questions. At most {max_words} words.\n\n"
+            f"Summary so far:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+        )
+        response = await chat_client.get_response([ChatMessage(role="user", text=prompt)])
+        return response.text
+
+    return summarize
+
+
+def service_truncation(last_messages: int) -> dict:
+    """Run options that make a service-managed thread read only its last messages"""
+    return {"truncation_strategy": {"type": "last_messages", "last_messages": last_messages}}
+
+
+class HistoryCompaction:
+    """When and how a thread's history is compacted"""
+
+    def __init__(self, budget_tokens: int = DEFAULT_BUDGET_TOKENS, keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+                 summarizer: Summarizer | None = None,
+                 count_tokens: Callable[[ChatMessage], int] = estimate_tokens):
+        if keep_recent_turns < 0:
+            raise ValueError("keep_recent_turns must be 0 or more")
+        self.budget_tokens = budget_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.summarizer = summarizer
+        self.count_tokens = count_tokens
+
+    def tokens(self, messages: Sequence[ChatMessage]) -> int:
+        return sum(self.count_tokens(message) for message in messages)
+
+    async def compact(self, messages: Sequence[ChatMessage]) -> list[ChatMessage]:
+        """`messages` brought under the budget, or unchanged if they fit"""
+        messages = list(messages)
+        if self.tokens(messages) <= self.budget_tokens:
+            return messages
+        summary = ""
+        if messages and messages[0].author_name == SUMMARY_AUTHOR:
+            summary = messages.pop(0).text.removeprefix(SUMMARY_PREFIX)
+        turns = _split_turns(messages)
+        # Not turns[-keep:]: with keep_recent_turns=0 that is every turn, not none
+        split = max(0, len(turns) - self.keep_recent_turns)
+        recent, older = turns[split:], turns[:split]
+        if not older:
+            return ([self._summary_message(summary)] if summary else []) + messages
+
+        if self.summarizer is not None:
+            summary = await self.summarizer(summary, [message for turn in older for message in turn])
+            return [self._summary_message(summary)] + [message for turn in recent for message in turn]
+
+        # No summarizer: drop the old turns least related to the latest question
+        question = next((message.text for message in reversed(messages) if message.role.value == "user"), "")
+        keywords = _words(question)
+        head = [self._summary_message(summary)] if summary else []
+        room = self.budget_tokens - self.tokens(head) - sum(self.tokens(turn) for turn in recent)
+        ranked = sorted(range(len(older)),
+                        key=lambda index: (len(keywords & _words(" ".join(m.text or "" for m in older[index]))),
+                                           index),
+                        reverse=True)
+        kept = set()
+        for index in ranked:
+            size = self.tokens(older[index])
+            if size <= room:
+                kept.add(index)
+                room -= size
+        older = [turn for index, turn in enumerate(older) if index in kept]
+        return head + [message for turn in older + recent for message in turn]
+
+    def _summary_message(self, summary: str) -> ChatMessage:
+        return ChatMessage(role="system", text=SUMMARY_PREFIX + summary, author_name=SUMMARY_AUTHOR)
+
+    def message_store(self) -> "CompactingMessageStore":
+        """Factory for ChatAgent(chat_message_store_factory=...)"""
+        return CompactingMessageStore(self)
+
+
+class CompactingMessageStore(ChatMessageStore):
+    """ChatMessageStore that compacts its history after every turn"""
+
+    def __init__(self, policy: HistoryCompaction, messages: Sequence[ChatMessage] | None = None):
+        super().__init__(messages)
+        self.policy = policy
+
+    async def add_messages(self, messages: Sequence[ChatMessage]) -> None:
+        self.messages.extend(messages)
+        self.messages = await self.policy.compact(self.messages)
@@ -0,0 +1,155 @@
+"""
+MSFT Agent Framework Workshop - Persistent Thread Registry
+==========================================================
+Keeps each user's conversation thread in a local SQLite file, so a restarted
+script, or another replica using the same file, picks the conversation up
+where it left off instead of starting a new thread.
+
+    registry = ThreadRegistry(agent, "threads.db")
+    thread = await registry.get("alice")          # Resumed, or new on first use
+    await agent.run("Hi again", thread=thread)
+    await registry.save("alice", thread)          # After every turn
+
+What is stored is thread.serialize():
+    - service-managed threads (Foundry agents): only the service thread ID;
+      the history stays in the service
+    - local threads (e.g. chat-completion clients): the message history itself
+
+Loading restores the thread with agent.deserialize_thread(); nothing is
+replayed to the model.
+
+Hot threads stay in memory (least recently used first out, max_hot of them)
+and cold ones are loaded from the file when their user comes back. Every
+save and forget bumps a version number that never goes back - forget() leaves
+a tombstone rather than deleting the row - and get() checks it, so a thread
+another replica has moved on or forgotten is reloaded rather than served stale
+from memory.
+
+That check is one primary-key SELECT (in the worker thread) per get(), even
+for hot threads: memory saves the deserialization, not the round trip. A
+process that is the only user of its file, or can live with a thread being
+a little behind another replica, can skip it with recheck_after=<seconds>.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from agent_framework import AgentThread, ChatAgent
+
+DEFAULT_MAX_HOT = 1000
+
+# The state of a forgotten conversation: the row stays, so its version keeps counting
+FORGOTTEN = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    key        TEXT PRIMARY KEY,
+    state      TEXT NOT NULL,
+    version    INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class ThreadRegistry:
+    """User/session key -> AgentThread, persisted in SQLite with an in-memory LRU"""
+
+    def __init__(self, agent: ChatAgent, path: str = "threads.db", max_hot: int = DEFAULT_MAX_HOT,
+                 recheck_after: float = 0.0):
+        self.agent = agent
+        self.path = path
+        self.max_hot = max_hot
+        self.recheck_after = recheck_after
+        # key -> (thread, version, when the version was last checked against the file)
+        self._hot: OrderedDict[str, tuple[AgentThread, int, float]] = OrderedDict()
+        self._loading: dict[str, asyncio.Future] = {}
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several processes read while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(SCHEMA)
+
+    # SQLite calls run in a worker thread so a slow disk never stalls the event loop
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    async def _run(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return await asyncio.to_thread(self._query, sql, params)
+
+    def _remember(self, key: str, thread: AgentThread, version: int) -> None:
+        self._hot[key] = (thread, version, time.monotonic())
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.max_hot:
+            self._hot.popitem(last=False)  # Already saved, so it can simply go
+
+    async def get(self, key: str) -> AgentThread:
+        """The thread for `key`: from memory, from the file, or a new one"""
+        hot = self._hot.get(key)
+        if hot is not None and time.monotonic() - hot[2] < self.recheck_after:
+            self._hot.move_to_end(key)
+            return hot[0]
+        rows = await self._run("SELECT version FROM threads WHERE key = ?", (key,))
+        stored_version = rows[0][0] if rows else 0
+        hot = self._hot.get(key)
+        if hot is not None and hot[1] == stored_version:
+            self._remember(key, hot[0], stored_version)
+            return hot[0]
+        if key in self._loading:
+            # Someone is already loading it: share their result
+            return await asyncio.shield(self._loading[key])
+
+        future = self._loading[key] = asyncio.get_running_loop().create_future()
+        try:
+            rows = await self._run("SELECT state, version FROM threads WHERE key = ?", (key,))
+            if rows and rows[0][0] != FORGOTTEN:
+                thread = await self.agent.deserialize_thread(json.loads(rows[0][0]))
+            else:
+                thread = self.agent.get_new_thread()
+            version = rows[0][1] if rows else 0
+            self._remember(key, thread, version)
+            future.set_result(thread)
+            return thread
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            future.exception()  # Mark it retrieved: there may be no one else waiting
+            raise
+        finally:
+            del self._loading[key]
+
+    async def save(self, key: str, thread: AgentThread) -> None:
+        """Store the thread's current state; call after every turn"""
+        state = json.dumps(await thread.serialize(), separators=(",", ":"))
+        rows = await self._run(
+            "INSERT INTO threads (key, state, version, updated_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT(key) DO UPDATE SET state = excluded.state, version = threads.version + 1, "
+            "updated_at = excluded.updated_at RETURNING version",
+            (key, state, time.time()),
+        )
+        self._remember(key, thread, rows[0][0])
+
+    async def forget(self, key: str) -> None:
+        """Drop the conversation for `key` (the next get() starts a new thread)"""
+        self._hot.pop(key, None)
+        # A tombstone, not a DELETE: a re-save must not start over at version 1,
+        # where another replica's hot copy of the old conversation could match it
+        await self._run("UPDATE threads SET state = ?, version = version + 1, updated_at = ? WHERE key = ?",
+                        (FORGOTTEN, time.time(), key))
+
+    async def count(self) -> int:
+        """Number of stored conversations"""
+        rows = await self._run("SELECT COUNT(*) FROM threads WHERE state != ?", (FORGOTTEN,))
+        return rows[0][0]
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._db.close()
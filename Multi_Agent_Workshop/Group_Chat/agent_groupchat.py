@@ -66,6 +66,7 @@ import asyncio
 import os
 import json
 import time
+import sys
 from typing import cast, Annotated
 from agent_framework.azure import AzureOpenAIChatClient
 from agent_framework import ChatAgent, GroupChatBuilder, GroupChatStateSnapshot
@@ -73,6 +74,10 @@ from agent_framework import AgentRunUpdateEvent, Role, WorkflowOutputEvent
 from azure.identity import AzureCliCredential
 from dotenv import load_dotenv
 
+# The offline mock model shared by the workshops (MSFT_Agent_Framework/mock_chat_client.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "MSFT_Agent_Framework"))
+from mock_chat_client import chat_client_or_mock  # noqa: E402
+
 load_dotenv()  # Load environment variables from .env file
 
 
@@ -94,12 +99,14 @@ if not os.getenv("AZURE_OPENAI_ENDPOINT"):
 
 # Initialize chat client
 # Note: Requires 'az login --identity' to be completed first
-chat_client = AzureOpenAIChatClient(
+# Offline: MOCK_CHAT_CLIENT=1 swaps in a local mock model - no Azure, no network
+# (see MSFT_Agent_Framework/mock_chat_client.py for rules, latency and 429s)
+chat_client = chat_client_or_mock(lambda: AzureOpenAIChatClient(
     credential=AzureCliCredential(),
     # Uncomment to override environment variables:
     # deployment_name="your-deployment-name",
     # endpoint="https://your-resource.openai.azure.com/"
-)
+))
 
 
 # =============================================================================
@@ -97,6 +97,7 @@ Use Cases:
 
 import asyncio
 import os
+import sys
 from typing import Annotated
 from agent_framework.azure import AzureOpenAIChatClient
 from agent_framework import HandoffBuilder, ai_function
@@ -105,6 +106,11 @@ from agent_framework import FunctionApprovalRequestContent
 from azure.identity import AzureCliCredential
 from dotenv import load_dotenv
 
+# The offline mock model and console helpers shared by the workshops (in MSFT_Agent_Framework/)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "MSFT_Agent_Framework"))
+from chat_console import ainput  # noqa: E402
+from mock_chat_client import chat_client_or_mock  # noqa: E402
+
 load_dotenv()
 
 
@@ -118,7 +124,9 @@ if not os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"):
 if not os.getenv("AZURE_OPENAI_ENDPOINT"):
     os.environ["AZURE_OPENAI_ENDPOINT"] = "https://your-resource.openai.azure.com/"
 
-chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+# Offline: MOCK_CHAT_CLIENT=1 swaps in a local mock model - no Azure, no network
+# (see MSFT_Agent_Framework/mock_chat_client.py for rules, latency and 429s)
+chat_client = chat_client_or_mock(lambda: AzureOpenAIChatClient(credential=AzureCliCredential()))
 
 
 # =============================================================================
@@ -323,7 +331,7 @@ async def run_interactive_handoff(workflow, initial_message: str, workflow_name:
                         print(f"{msg.text}\n")
                 
                 # Get user input
-                user_input = input("You: ").strip()
+                user_input = (await ainput("You: ")).strip()
                 if user_input.lower() in ['quit', 'exit', 'bye']:
                     print("\n👋 Ending support session. Thank you!")
                     return
@@ -345,7 +353,7 @@ async def run_interactive_handoff(workflow, initial_message: str, workflow_name:
                     print(f"  • {key}: {value}")
                 print(f"{'─'*80}")
                 
-                approval_input = input("Approve this action? (yes/no): ").strip().lower()
+                approval_input = (await ainput("Approve this action? (yes/no): ")).strip().lower()
                 approved = approval_input in ['yes', 'y']
                 
                 if approved:
@@ -35,6 +35,7 @@ EXERCISES:
 
 import asyncio
 import os
+import sys
 import time
 from typing import Any, Annotated
 from agent_framework.azure import AzureOpenAIChatClient
@@ -44,6 +45,10 @@ from agent_framework import Executor, WorkflowContext, handler
 from azure.identity import AzureCliCredential
 from dotenv import load_dotenv
 
+# The offline mock model shared by the workshops (MSFT_Agent_Framework/mock_chat_client.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "MSFT_Agent_Framework"))
+from mock_chat_client import chat_client_or_mock  # noqa: E402
+
 load_dotenv()
 
 
@@ -58,7 +63,9 @@ if not os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"):
 if not os.getenv("AZURE_OPENAI_ENDPOINT"):
     os.environ["AZURE_OPENAI_ENDPOINT"] = "https://your-resource.openai.azure.com/"
 
-chat_client = AzureOpenAIChatClient(credential=AzureCliCredential())
+# Offline: MOCK_CHAT_CLIENT=1 swaps in a local mock model - no Azure, no network
+# (see MSFT_Agent_Framework/mock_chat_client.py for rules, latency and 429s)
+chat_client = chat_client_or_mock(lambda: AzureOpenAIChatClient(credential=AzureCliCredential()))
 
 
 # =============================================================================
@@ -0,0 +1,191 @@
+"""
+Benchmark: Orchestration Overhead of Every Workflow, Offline
+============================================================
+
+Runs the workshop's workflows on the offline mock chat client
+(MSFT_Agent_Framework/mock_chat_client.py) instead of Azure OpenAI,
+so the only time spent is the framework's own plus the latency you give the
+mock:
+
+    sequential   Sequential/agent_sequential.py   workflow_advanced (Writer -> Reviewer -> Editor -> ContentAnalyzer)
+    handoff      Handoff/agent_handoff.py         workflow_basic: triage -> refund agent -> approval -> triage
+    foundry      MSFT_Agent_Framework/solution    the foundry_agent.py chat loop: stored thread, streamed reply
+
+The scripts are imported with MOCK_CHAT_CLIENT=1 and the rules in
+mock_rules.json, which script the agents' replies and tool calls (the same
+file works for running a script by hand offline). Each run reloads the script,
+so every run starts from a fresh workflow; loading is not timed.
+Group_Chat/agent_groupchat.py is not part of it: its managers need a newer
+GroupChatBuilder than the agent-framework release the other scripts run on.
+
+For each workflow: model calls per run, time per run (p50/p95) and the
+orchestration overhead - run time minus the latency the mock simulated. With
+--rate-limit some model calls fail with a 429, to see how each workflow
+surfaces throttling.
+
+Usage (from the Multi_Agent_Workshop folder):
+    python benchmarks/bench_workflows.py
+    python benchmarks/bench_workflows.py --runs 50 --first-token 0.3 --chunk-delay 0.01
+    python benchmarks/bench_workflows.py --workflows handoff foundry --rate-limit 0.1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORKSHOP = os.path.join(HERE, "..")
+FRAMEWORK = os.path.join(WORKSHOP, "..", "MSFT_Agent_Framework")
+for folder in ("Sequential", "Handoff"):
+    sys.path.insert(0, os.path.join(WORKSHOP, folder))
+sys.path.insert(0, os.path.join(FRAMEWORK, "solution"))
+sys.path.insert(0, FRAMEWORK)
+
+HANDOFF_MESSAGES = ["My order 12345 arrived damaged, I want a refund", "Thanks, that's all."]
+SEQUENTIAL_TASK = "Write a tagline for a budget-friendly eBike."
+FOUNDRY_TURNS = ["Which tents do you have?", "Which one is lightest?", "And for a family of four?"]
+
+
+def _load(module_name: str):
+    """The script, imported (or re-imported) fresh with its own mock client"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        if module_name in sys.modules:
+            return importlib.reload(sys.modules[module_name])
+        return importlib.import_module(module_name)
+
+
+async def run_sequential(module) -> Any:
+    await module.workflow_advanced.run(SEQUENTIAL_TASK)
+    return module.chat_client
+
+
+async def run_handoff(module) -> Any:
+    from agent_framework import HandoffUserInputRequest, RequestInfoEvent
+
+    workflow = module.workflow_basic
+    messages = list(HANDOFF_MESSAGES)
+    events = workflow.run_stream(messages.pop(0))
+    while True:
+        pending = [event async for event in events if isinstance(event, RequestInfoEvent)]
+        responses = {}
+        for request in pending:
+            if isinstance(request.data, HandoffUserInputRequest):
+                if not messages:
+                    return module.chat_client  # The customer is done
+                responses[request.request_id] = messages.pop(0)
+            else:
+                responses[request.request_id] = request.data.create_response(approved=True)
+        if not responses:
+            return module.chat_client
+        events = workflow.send_responses_streaming(responses)
+
+
+def new_foundry_client() -> Any:
+    from mock_chat_client import MockChatClient
+
+    _load("foundry_agent")
+    return MockChatClient.from_env()
+
+
+async def run_foundry(chat_client) -> Any:
+    from agent_framework import ChatAgent
+    from foundry_agent import RUN_OPTIONS
+    from thread_registry import ThreadRegistry
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        async with ChatAgent(chat_client=chat_client, name="FoundryAgent") as agent:
+            registry = ThreadRegistry(agent, os.path.join(data_dir, "threads.db"))
+            try:
+                for message in FOUNDRY_TURNS:
+                    thread = await registry.get("bench")
+                    async for _ in agent.run_stream(message, thread=thread, **RUN_OPTIONS):
+                        pass
+                    await registry.save("bench", thread)
+            finally:
+                registry.close()
+    return chat_client
+
+
+# Workflow -> (set up a fresh run, untimed; the run itself, returning its mock client)
+WORKFLOWS = {
+    "sequential": (lambda: _load("agent_sequential"), run_sequential),
+    "handoff": (lambda: _load("agent_handoff"), run_handoff),
+    "foundry": (new_foundry_client, run_foundry),
+}
+
+
+async def measure(name: str, runs: int) -> dict[str, Any]:
+    stats: dict[str, Any] = {"times": [], "overheads": [], "calls": [], "failed": 0}
+    setup, run = WORKFLOWS[name]
+    for number in range(runs):
+        os.environ["MOCK_SEED"] = str(number)  # Each run its own, repeatable, 429s
+        prepared = setup()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):  # The tools print banners
+                chat_client = await run(prepared)
+        except Exception:
+            stats["failed"] += 1  # e.g. a 429 from --rate-limit
+            continue
+        elapsed = time.perf_counter() - start
+        stats["times"].append(elapsed)
+        stats["overheads"].append(elapsed - chat_client.simulated_seconds)
+        stats["calls"].append(chat_client.requests)
+    return stats
+
+
+def _ms(values: list[float], cut: int) -> float:
+    if len(values) < 2:
+        return values[0] * 1e3 if values else float("nan")
+    return statistics.quantiles(values, n=100)[cut - 1] * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Orchestration overhead of the workshop workflows on a mock model")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per workflow")
+    parser.add_argument("--workflows", nargs="+", choices=list(WORKFLOWS), default=list(WORKFLOWS),
+                        help="Workflows to run")
+    parser.add_argument("--first-token", type=float, default=0.0, help="Mock delay before the first chunk (s)")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Mock delay between chunks (s)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of model calls that fail with a 429")
+    args = parser.parse_args()
+
+    # Read by MockChatClient.from_env() in every script
+    os.environ.update({
+        "MOCK_CHAT_CLIENT": "1",
+        "MOCK_CHAT_RULES": os.path.join(HERE, "mock_rules.json"),
+        "MOCK_FIRST_TOKEN": str(args.first_token),
+        "MOCK_CHUNK_DELAY": str(args.chunk_delay),
+        "MOCK_RATE_LIMIT": str(args.rate_limit),
+    })
+
+    print(f"⏱️  {args.runs} runs per workflow, first token {args.first_token}s, "
+          f"chunk delay {args.chunk_delay}s, 429 rate {args.rate_limit:g}...", flush=True)
+    results = {name: asyncio.run(measure(name, args.runs)) for name in args.workflows}
+
+    print("=" * 84)
+    print(f"{'workflow':<12}{'calls/run':>10}{'run p50':>12}{'run p95':>12}"
+          f"{'overhead p50':>15}{'per call':>11}{'failed':>9}")
+    print("=" * 84)
+    for name, stats in results.items():
+        if not stats["times"]:
+            print(f"{name:<12}{'':>10}{'':>12}{'':>12}{'':>15}{'':>11}{stats['failed']:>9}")
+            continue
+        calls = statistics.mean(stats["calls"])
+        overhead = _ms(stats["overheads"], 50)
+        print(f"{name:<12}{calls:>10.1f}{_ms(stats['times'], 50):>9.1f} ms{_ms(stats['times'], 95):>9.1f} ms"
+              f"{overhead:>12.1f} ms{overhead / calls:>8.2f} ms{stats['failed']:>9}")
+    print("=" * 84)
+    print("overhead = run time minus the latency the mock simulated; per call = overhead / model calls")
+
+
+if __name__ == "__main__":
+    main()